@@ -5,21 +5,9 @@ in active or interactive mode
 """
 import cmd
 import models
-from models.engine.file_storage import FileStorage
-from models.base_model import BaseModel
-from models.user import User
-from models.state import State
-from models.city import City
-from models.place import Place
-from models.amenity import Amenity
-from models.review import Review
+from models.base_model import classes
 import json
 
-my_classes = {
-    "BaseModel": BaseModel, "User": User, "State": State, "City": City,
-    "Place": Place, "Amenity": Amenity, "Review": Review
-}
-
 
 class HBNBCommand(cmd.Cmd):
     """This class is the command interpreter for the airBnB clone app
@@ -31,10 +19,12 @@ class HBNBCommand(cmd.Cmd):
 
     def do_quit(self, args):
         """Quit command to exit the program"""
+        models.storage.flush()
         return True
 
     def do_EOF(self, args):
         """Quit command to exit the program"""
+        models.storage.flush()
         return True
 
     def emptyline(self) -> bool:
@@ -52,10 +42,10 @@ class HBNBCommand(cmd.Cmd):
         if not args or args == "":
             print("** class name missing **")
             return
-        if args not in my_classes:
+        if args not in classes:
             print("** class doesn't exist **")
             return
-        new_instance = my_classes[args]()
+        new_instance = classes[args]()
         new_instance.save()
         print(new_instance.id)
 
@@ -71,7 +61,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
             return
         args = args.split(" ")
-        if args[0] not in my_classes:
+        if args[0] not in classes:
             print("** class doesn't exist **")
             return
         if len(args) < 2:
@@ -95,7 +85,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
             return
         args = args.split(" ")
-        if args[0] not in my_classes:
+        if args[0] not in classes:
             print("** class doesn't exist **")
             return
         if len(args) < 2:
@@ -105,8 +95,7 @@ class HBNBCommand(cmd.Cmd):
         if key not in models.storage.all():
             print("** no instance found **")
             return
-        # del not pop to make sure never trust garbage collector
-        del models.storage.all()[key]
+        models.storage.delete(models.storage.all()[key])
         models.storage.save()
 
     def do_all(self, args):
@@ -118,12 +107,11 @@ class HBNBCommand(cmd.Cmd):
         if not args or args == "":
             print([str(obj) for obj in models.storage.all().values()])
             return
-        if args not in my_classes:
+        if args not in classes:
             print("** class doesn't exist **")
             return
         else:
-            print([str(obj) for obj in models.storage.all().values()
-                   if type(obj).__name__ == args])
+            print([str(obj) for obj in models.storage.all(args).values()])
 
     def do_update(self, args: str):
         """This method updates an instance
@@ -135,7 +123,7 @@ class HBNBCommand(cmd.Cmd):
             print("** class name missing **")
             return
         args = args.split(" ")
-        if args[0] not in my_classes:
+        if args[0] not in classes:
             print("** class doesn't exist **")
             return
         if len(args) < 2:
@@ -160,9 +148,22 @@ class HBNBCommand(cmd.Cmd):
             value = float(value)
         else:
             value = str(value)
-        setattr(models.storage.all()[key], attr, value)
+        try:
+            setattr(models.storage.all()[key], attr, value)
+        except ValueError as error:
+            print(f"** {error} **")
+            return
         models.storage.save()
 
+    def do_compact(self, args):
+        """This method folds the storage journal into a new file.json
+        in the background"""
+        models.storage.compact()
+
+    def do_sync(self, args):
+        """This method waits until every save is written to the files"""
+        models.storage.flush()
+
     def do_count(self, args: str) -> int:
         """This method counts the number of instances of a class
 
@@ -172,14 +173,13 @@ class HBNBCommand(cmd.Cmd):
             int: the number of instances of the class
         """
         if not args or args == "":
-            print(len(models.storage.all()))
+            print(models.storage.count())
             return
-        if args not in my_classes:
+        if args not in classes:
             print("** class doesn't exist **")
             return
         else:
-            print(len([obj for obj in models.storage.all().values()
-                       if type(obj).__name__ == args]))
+            print(models.storage.count(args))
 
     def default(self, arg: str):
         """method handles the default behavior of the command interpreter"""
@@ -215,7 +215,7 @@ class HBNBCommand(cmd.Cmd):
                 ins_id = arg.find("(")
                 ins_id = arg[ins_id + 2:arg.find(",") - 1]
                 cls_name = arg[:arg.find(".")]
-                if cls_name not in my_classes:
+                if cls_name not in classes:
                     print("** class doesn't exist **")
                     return
                 if ins_id.strip() == "None" or ins_id.strip()\
@@ -229,9 +229,13 @@ class HBNBCommand(cmd.Cmd):
                     if key not in models.storage.all():
                         print("** no instance found **")
                         return
-                    for k, v in eval_dict.items():
-                        setattr(models.storage.all()[key], k, v)
-                    models.storage.save()
+                    # every attribute is updated, or none of them
+                    try:
+                        with models.storage.transaction():
+                            for k, v in eval_dict.items():
+                                setattr(models.storage.all()[key], k, v)
+                    except ValueError as error:
+                        print(f"** {error} **")
                     return
                 # how to count how many " in a string
                 if arg.count('"') == 2:
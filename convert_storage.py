@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""This script converts the storage file between file.json
+and the binary format of models/engine/binary_format.py
+
+Usage:
+    ./convert_storage.py to-binary file.json file.hbnb
+    ./convert_storage.py to-json file.hbnb file.json
+
+It only reads the files given, the models package is not imported
+since its import reloads the storage of the current directory
+"""
+import importlib
+import os
+import sys
+from types import ModuleType
+
+
+def converters() -> dict:
+    """This function returns the converters of the binary format
+    by command, imported without running models/__init__.py"""
+    if "models" not in sys.modules:
+        # a bare package is enough for the modules of models.engine
+        package = ModuleType("models")
+        package.__path__ = [os.path.join(
+            os.path.dirname(os.path.abspath(__file__)), "models")]
+        sys.modules["models"] = package
+    binary_format = importlib.import_module("models.engine.binary_format")
+    return {"to-binary": binary_format.json_to_binary,
+            "to-json": binary_format.binary_to_json}
+
+
+def main(argv: list) -> int:
+    """This function runs the command of the arguments
+
+    Returns:
+        int: the exit status
+    """
+    commands = converters()
+    if len(argv) != 4 or argv[1] not in commands:
+        print(__doc__.split("Usage:")[1].split("\n\n")[0].rstrip())
+        return 1
+    commands[argv[1]](argv[2], argv[3])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
@@ -1,9 +1,96 @@
 #!/usr/bin/python3
 """This is to make a singletos instance of the FileStorage
 class and reload the objects from the file to storage automatically
-when the module is imported"""
+when the module is imported
+
+Environment:
+    HBNB_TYPE_STORAGE: set to column to keep the objects in the columns
+    of models/engine/column_storage.py, or to db to keep them in the
+    sqlite database of models/engine/db_storage.py instead of FileStorage
+    HBNB_FILE_JOURNAL: set to 1 to append changes to a journal
+    instead of rewriting file.json on every save
+    HBNB_FILE_COMPACT_SIZE: journal size in bytes that starts a compaction
+    HBNB_FILE_COMPACT_RATIO: journal to file.json size ratio
+    that starts a compaction
+    HBNB_FILE_UNIQUE: set to 1 to refuse two users with the same email
+    HBNB_FILE_LAZY: set to 1 to build the reloaded models on first use
+    HBNB_FILE_BACKGROUND: set to 1 to write the saves in a thread
+    HBNB_FILE_QUEUE_SIZE: the number of background writes that can wait
+    HBNB_FILE_MAPPED: set to 1 to map file.json in memory and only
+    decode the objects used, see models/engine/mapped_file.py
+    HBNB_FILE_WORKERS: the number of processes that build the models
+    of file.json (or of the shards) on reload and dump them to
+    file.json on save, see models/engine/parallel.py
+    HBNB_FILE_SHARED: set to 1 to share file.json with other processes,
+    saves are locked and merge the saves of the other processes
+    HBNB_FILE_FORMAT: json (the default) or binary to save the objects
+    to file.hbnb in the format of models/engine/binary_format.py
+    HBNB_FILE_COMPRESSION: none (the default), gzip, zlib or lzma,
+    the codec of the files written, see models/engine/compression.py
+    HBNB_FILE_COMPRESSION_LEVEL: from 0 (fastest) to 9 (smallest)
+    HBNB_FILE_SHARDS: the number of files of each class in file.json.d,
+    used instead of file.json when set
+    HBNB_FILE_DURABILITY: none, flush (the default), fsync or group,
+    how far a save goes before it returns, see models/engine/durable.py
+    HBNB_FILE_GROUP_INTERVAL: the seconds between two fsyncs
+    with the group durability
+    HBNB_FILE_COMMIT_SIZE: group commit, only write once this many
+    objects changed since the last write
+    HBNB_FILE_COMMIT_DELAY: group commit, only write once this many
+    seconds passed since the first save not written
+"""
+from os import getenv
 from models.engine.file_storage import FileStorage
 
 
-storage = FileStorage()
+if getenv("HBNB_TYPE_STORAGE") == "column":
+    from models.engine.column_storage import ColumnStorage
+    storage = ColumnStorage()
+elif getenv("HBNB_TYPE_STORAGE") == "db":
+    from models.engine.db_storage import DBStorage
+    storage = DBStorage()
+else:
+    storage = FileStorage()
+    storage.configure(journal=getenv("HBNB_FILE_JOURNAL") == "1",
+                      unique=getenv("HBNB_FILE_UNIQUE") == "1",
+                      lazy=getenv("HBNB_FILE_LAZY") == "1")
+    if getenv("HBNB_FILE_COMPACT_SIZE"):
+        storage.configure(
+            compact_size=int(getenv("HBNB_FILE_COMPACT_SIZE")))
+    if getenv("HBNB_FILE_DURABILITY"):
+        storage.configure(durability=getenv("HBNB_FILE_DURABILITY"))
+    if getenv("HBNB_FILE_GROUP_INTERVAL"):
+        storage.configure(
+            group_interval=float(getenv("HBNB_FILE_GROUP_INTERVAL")))
+    if getenv("HBNB_FILE_COMMIT_SIZE"):
+        storage.configure(
+            commit_size=int(getenv("HBNB_FILE_COMMIT_SIZE")))
+    if getenv("HBNB_FILE_COMMIT_DELAY"):
+        storage.configure(
+            commit_delay=float(getenv("HBNB_FILE_COMMIT_DELAY")))
+    if getenv("HBNB_FILE_BACKGROUND") == "1":
+        storage.configure(background=True)
+    if getenv("HBNB_FILE_QUEUE_SIZE"):
+        storage.configure(queue_size=int(getenv("HBNB_FILE_QUEUE_SIZE")))
+    if getenv("HBNB_FILE_MAPPED") == "1":
+        storage.configure(mapped=True)
+    if getenv("HBNB_FILE_SHARED") == "1":
+        storage.configure(shared=True)
+    if getenv("HBNB_FILE_FORMAT"):
+        storage.configure(format=getenv("HBNB_FILE_FORMAT"))
+    if getenv("HBNB_FILE_COMPRESSION"):
+        storage.configure(compression=getenv("HBNB_FILE_COMPRESSION"))
+    if getenv("HBNB_FILE_COMPRESSION_LEVEL"):
+        storage.configure(compression_level=int(
+            getenv("HBNB_FILE_COMPRESSION_LEVEL")))
+    if getenv("HBNB_FILE_SHARDS"):
+        storage.configure(shards=int(getenv("HBNB_FILE_SHARDS")))
+    if getenv("HBNB_FILE_COMPACT_RATIO"):
+        storage.configure(
+            compact_ratio=float(getenv("HBNB_FILE_COMPACT_RATIO")))
+    if getenv("HBNB_FILE_WORKERS"):
+        storage.configure(workers=int(getenv("HBNB_FILE_WORKERS")))
+# defining the models registers them by name for reload() and the console
+from models import base_model, user, state, city  # noqa: F401
+from models import place, amenity, review  # noqa: F401
 storage.reload()
@@ -4,9 +4,24 @@ from uuid import uuid4
 from datetime import datetime
 from models import storage
 
+# every model class by name, filled in as the model classes are defined
+classes = {}
+
 
 class BaseModel:
-    """This class is the parent class for all models in the airBnB clone app"""
+    """This class is the parent class for all models in the airBnB clone app
+
+    Attributes:
+        __dict_cache (dict): the last to_dict() of the model, None once
+        an attribute changed; a slot, so it is not in __dict__
+    """
+    __slots__ = ("__dict__", "__weakref__", "__dict_cache")
+
+    def __init_subclass__(cls, **kwargs) -> None:
+        """This method registers every model class in classes
+        so the storage and the console can find it by name"""
+        super().__init_subclass__(**kwargs)
+        classes[cls.__name__] = cls
 
     def __init__(self, *args: tuple, **kwargs: dict) -> None:
         """This method initializes the base model
@@ -18,17 +33,47 @@ class BaseModel:
             but updated when the model is modified
         """
         if kwargs:
-            for key, value in kwargs.items():
-                if key in ["created_at", "updated_at"]:
-                    value = datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f")
-                if key != "__class__":
-                    setattr(self, key, value)
+            kwargs.pop("__class__", None)
+            for key in ("created_at", "updated_at"):
+                if key in kwargs and not isinstance(kwargs[key], datetime):
+                    # fromisoformat is much faster than strptime
+                    # and also reads isoformat() without microseconds,
+                    # the binary storage format gives datetime objects
+                    kwargs[key] = datetime.fromisoformat(kwargs[key])
+            # the model is not in the storage yet, so there is nothing
+            # to check or mark as modified, __setattr__ is skipped
+            self.__dict__.update(kwargs)
         else:
             self.id = str(uuid4())
             self.created_at = datetime.now()
             self.updated_at = datetime.now()
             storage.new(self)
 
+    def __setattr__(self, name: str, value) -> None:
+        """This method sets an attribute and marks the model as modified
+        so the storage serializes it again on the next save
+
+        Raises:
+            ValueError: if the value of a unique field is already used
+        """
+        storage.check(self, name, value)
+        super().__setattr__(name, value)
+        object.__setattr__(self, "_BaseModel__dict_cache", None)
+        storage.touch(self)
+
+    def __delattr__(self, name: str) -> None:
+        """This method deletes an attribute and marks the model
+        as modified, the attribute goes back to its class value"""
+        storage.check(self, name, getattr(type(self), name, ""))
+        super().__delattr__(name)
+        object.__setattr__(self, "_BaseModel__dict_cache", None)
+        storage.touch(self)
+
+    def __getstate__(self) -> dict:
+        """This method returns the attributes to pickle or copy,
+        without the kept dict"""
+        return self.__dict__
+
     def __str__(self) -> str:
         """This method returns the string representation of the model"""
         return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
@@ -40,9 +85,24 @@ class BaseModel:
         storage.save()
 
     def to_dict(self) -> dict:
-        """This method returns a dictionary representation of the model"""
-        model_dict = self.__dict__.copy()
-        model_dict["__class__"] = self.__class__.__name__
-        model_dict["created_at"] = self.created_at.isoformat()
-        model_dict["updated_at"] = self.updated_at.isoformat()
-        return model_dict
+        """This method returns a dictionary representation of the model
+
+        The dict is kept until an attribute is set or deleted, so the
+        saves and exports of a model not modified since only copy it.
+        Changes made in place (like appending to Place.amenity_ids)
+        are in the kept dict too, it holds the same values.
+        """
+        try:
+            model_dict = self.__dict_cache
+        except AttributeError:
+            model_dict = None
+        if model_dict is None:
+            model_dict = self.__dict__.copy()
+            model_dict["__class__"] = self.__class__.__name__
+            model_dict["created_at"] = self.created_at.isoformat()
+            model_dict["updated_at"] = self.updated_at.isoformat()
+            object.__setattr__(self, "_BaseModel__dict_cache", model_dict)
+        return model_dict.copy()
+
+
+classes["BaseModel"] = BaseModel
@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+"""This module contains the binary format of the file storage,
+a smaller and faster to read alternative to file.json
+
+A file starts with a header: the magic bytes HBNB, the version of
+the format (1 byte) and the number of classes (4 bytes). Then each
+class has a section holding its objects column by column:
+
+    the class name, the number of objects and the number of fields,
+    the keys of the objects like a s column (below),
+    then for every field, in the order they were first seen:
+        the field name and its kind, one byte:
+            q: int, 8 bytes each
+            d: float, 8 bytes each
+            t: created_at / updated_at, microseconds since 1970, 8 bytes
+            s: str, the utf-8 length of each (4 bytes) then the text
+            j: any other value, the values as one json list
+        a byte telling if every object has the field, if not
+        a byte per object telling which ones do
+        the values of the objects that have the field
+
+All numbers are little endian and every name is a 4 bytes length
+followed by the utf-8 text, so field and class names are written once
+per class instead of once per object like in file.json.
+
+The converters below are run by convert_storage.py, at the root
+of the repository.
+"""
+import mmap
+import os
+from array import array
+from datetime import datetime, timedelta
+from itertools import accumulate, repeat
+from json import dumps, loads
+from struct import Struct
+from models.engine.compression import codec_of, open_binary, open_text
+from models.engine.json_stream import iter_items
+from models.engine.model_info import EPOCH, MICROSECOND, TIMESTAMPS
+
+MAGIC = b"HBNB"
+VERSION = 1
+
+_HEADER = Struct("<4sBI")
+_SECTION = Struct("<II")
+_UINT = Struct("<I")
+_INT64 = 1 << 63
+
+
+def _pack_text(text: str) -> bytes:
+    """This function returns a length-prefixed utf-8 string"""
+    data = text.encode()
+    return _UINT.pack(len(data)) + data
+
+
+def _kind(name: str, values: list) -> str:
+    """This function returns the kind of the column of a field"""
+    if name in TIMESTAMPS and all(type(value) is datetime
+                                  for value in values):
+        return "t"
+    if all(type(value) is int and -_INT64 <= value < _INT64
+           for value in values):
+        return "q"
+    if all(type(value) is float for value in values):
+        return "d"
+    if all(type(value) is str for value in values):
+        return "s"
+    return "j"
+
+
+def _pack_column(kind: str, values: list) -> bytes:
+    """This function returns the values of a column"""
+    if kind == "t":
+        values = [(value - EPOCH) // MICROSECOND for value in values]
+    if kind in ("q", "t"):
+        return array("q", values).tobytes()
+    if kind == "d":
+        return array("d", values).tobytes()
+    if kind == "j":
+        # one json text is much faster to read than one per value
+        return _pack_text(dumps(values))
+    data = [value.encode() for value in values]
+    lengths = array("I", [len(value) for value in data])
+    blob = b"".join(data)
+    return lengths.tobytes() + _UINT.pack(len(blob)) + blob
+
+
+def encode(items) -> bytes:
+    """This function encodes the objects of a storage
+
+    Args:
+        items: the keys and the dicts of the objects, like the
+        entries of file.json, the timestamps can be datetime objects
+        or isoformat strings
+    Returns:
+        bytes: the content of the binary file
+    """
+    sections = {}
+    for key, obj_dict in items:
+        name = obj_dict.get("__class__", key.split(".")[0])
+        sections.setdefault(name, ([], []))
+        sections[name][0].append(key)
+        sections[name][1].append(obj_dict)
+    chunks = [_HEADER.pack(MAGIC, VERSION, len(sections))]
+    for name, (keys, objects) in sections.items():
+        fields = {}
+        for obj_dict in objects:
+            for field in obj_dict:
+                if field != "__class__":
+                    fields.setdefault(field, None)
+        chunks.append(_pack_text(name))
+        chunks.append(_SECTION.pack(len(objects), len(fields)))
+        chunks.append(_pack_column("s", keys))
+        for field in fields:
+            present = bytes(field in obj_dict for obj_dict in objects)
+            values = [obj_dict[field] for obj_dict in objects
+                      if field in obj_dict]
+            if field in TIMESTAMPS:
+                values = [datetime.fromisoformat(value)
+                          if type(value) is str else value
+                          for value in values]
+            kind = _kind(field, values)
+            chunks.append(_pack_text(field))
+            chunks.append(kind.encode())
+            if len(values) == len(objects):
+                chunks.append(b"\1")
+            else:
+                chunks.append(b"\0" + present)
+            chunks.append(_pack_column(kind, values))
+    return b"".join(chunks)
+
+
+class _Reader:
+    """This class reads the parts of a binary file one after the other
+
+    Attributes:
+        data (bytes): the content of the file
+        pos (int): the position of the next part
+    """
+
+    def __init__(self, data) -> None:
+        """This method initializes the reader at the start of data"""
+        self.data = data
+        self.pos = 0
+
+    def unpack(self, layout: Struct) -> tuple:
+        """This method reads numbers"""
+        return layout.unpack(self.take(layout.size))
+
+    def take(self, size: int):
+        """This method reads size bytes"""
+        if self.pos + size > len(self.data):
+            raise ValueError("truncated binary storage file")
+        chunk = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return chunk
+
+    def text(self) -> str:
+        """This method reads a length-prefixed string"""
+        size, = self.unpack(_UINT)
+        return bytes(self.take(size)).decode()
+
+    def column(self, kind: str, count: int) -> list:
+        """This method reads the values of a column"""
+        if kind in ("q", "t", "d"):
+            values = array("d" if kind == "d" else "q")
+            values.frombytes(self.take(count * 8))
+            if kind == "t":
+                deltas = map(timedelta, repeat(0), repeat(0), values)
+                return list(map(EPOCH.__add__, deltas))
+            return values.tolist()
+        if kind == "j":
+            return loads(self.text())
+        lengths = array("I")
+        lengths.frombytes(self.take(count * 4))
+        size, = self.unpack(_UINT)
+        blob = bytes(self.take(size))
+        text = blob.decode()
+        if len(text) != len(blob):
+            # not all ascii, the lengths are in bytes and not characters
+            text = blob
+        ends = list(accumulate(lengths))
+        values = [text[end - length:end]
+                  for end, length in zip(ends, lengths)]
+        if text is blob:
+            values = [value.decode() for value in values]
+        return values
+
+
+def decode(data):
+    """This function yields the objects of a binary file
+
+    Args:
+        data (bytes): the content of the file
+    Yields:
+        tuple: the key and the dict of each object, with the timestamps
+        as datetime objects
+    Raises:
+        ValueError: if data is not a binary storage file
+        of a version this module reads
+    """
+    reader = _Reader(data)
+    if len(data) < _HEADER.size:
+        raise ValueError("not a binary storage file")
+    magic, version, sections = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise ValueError("not a binary storage file")
+    if version != VERSION:
+        raise ValueError(f"unsupported binary storage version: {version}")
+    for i in range(sections):
+        name = reader.text()
+        count, field_count = reader.unpack(_SECTION)
+        keys = reader.column("s", count)
+        names = []
+        columns = []
+        partial = []
+        for j in range(field_count):
+            field = reader.text()
+            kind = bytes(reader.take(1)).decode()
+            if reader.take(1)[0]:
+                names.append(field)
+                columns.append(reader.column(kind, count))
+                continue
+            present = bytes(reader.take(count))
+            values = reader.column(kind, sum(present))
+            partial.append((field, present, values))
+        # the fields every object has are zipped at once
+        if columns:
+            rows = [dict(zip(names, row)) for row in zip(*columns)]
+        else:
+            rows = [{} for row in range(count)]
+        for field, present, values in partial:
+            have = [row for row, flag in zip(rows, present) if flag]
+            for row, value in zip(have, values):
+                row[field] = value
+        for key, row in zip(keys, rows):
+            row["__class__"] = name
+            yield key, row
+
+
+def read(path: str):
+    """This function yields the objects of a binary file by its path,
+    decoded from the file mapped in memory unless it is compressed"""
+    if codec_of(path) == "none" and os.path.getsize(path):
+        with open(path, "rb") as file:
+            data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        with data:
+            yield from decode(data)
+        return
+    with open_binary(path) as file:
+        data = file.read()
+    yield from decode(data)
+
+
+def json_to_binary(json_path: str, binary_path: str) -> None:
+    """This function converts a file.json to the binary format"""
+    with open_text(json_path) as file:
+        data = encode(iter_items(file))
+    with open(binary_path, "wb") as file:
+        file.write(data)
+
+
+def binary_to_json(binary_path: str, json_path: str) -> None:
+    """This function converts a binary file to a file.json"""
+    parts = []
+    for key, obj_dict in read(binary_path):
+        for field in TIMESTAMPS:
+            if type(obj_dict.get(field)) is datetime:
+                obj_dict[field] = obj_dict[field].isoformat()
+        parts.append(f"{dumps(key)}: {dumps(obj_dict)}")
+    with open(json_path, "w") as file:
+        file.write("{" + ", ".join(parts) + "}")
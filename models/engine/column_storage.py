@@ -0,0 +1,430 @@
+#!/usr/bin/python3
+"""This module contains the columnar storage engine for the airBnB clone app
+
+It reads and writes the same file.json as FileStorage, but keeps
+the objects of each model class as columns: arrays for the int and
+float attributes and the timestamps, lists for the other attributes
+and interned strings for the ids. all() hands out Row proxies that
+read and write the columns, and column() gives the raw column so
+scans and aggregates run over an array instead of objects.
+
+A model object made by the caller (like Place()) is copied to its row
+by new() and on every assignment, the row is the stored object.
+"""
+from array import array
+from collections.abc import Mapping
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from json import dumps
+from sys import intern
+from models.engine.compression import open_text
+from models.engine.json_stream import iter_items
+from models.engine.model_info import (EPOCH, MICROSECOND, TIMESTAMPS,
+                                      class_name, declared)
+
+
+class Table:
+    """This class holds the objects of one model class as columns
+
+    Attributes:
+        cls (type): the model class
+        ids (list): the id of every row
+        rows (dict): the row of every id
+        kinds (dict): the kind of every column, "int", "float",
+        "time" (microseconds in an int array) or "object" (a list)
+        columns (dict): the column of every attribute
+        present (dict): a byte per row telling if the attribute was set,
+        unset attributes read as their class value
+        extra (dict): the attributes without a column, row -> {name: value}
+    """
+
+    def __init__(self, cls: type) -> None:
+        """This method initializes an empty table for a model class"""
+        self.cls = cls
+        self.ids = []
+        self.rows = {}
+        self.defaults = declared(cls)
+        self.kinds = {name: "time" for name in TIMESTAMPS}
+        for name, value in self.defaults.items():
+            if type(value) is int:
+                self.kinds[name] = "int"
+            elif type(value) is float:
+                self.kinds[name] = "float"
+            else:
+                self.kinds[name] = "object"
+        self.columns = {}
+        self.present = {}
+        for name, kind in self.kinds.items():
+            if kind == "object":
+                self.columns[name] = []
+            else:
+                self.columns[name] = array("d" if kind == "float" else "q")
+            self.present[name] = bytearray()
+        self.extra = {}
+
+    def __len__(self) -> int:
+        """This method returns the number of rows"""
+        return len(self.ids)
+
+    def append(self, obj_id: str, attrs: dict) -> None:
+        """This method adds a row
+
+        Args:
+            obj_id (str): the id of the object
+            attrs (dict): the other attributes of the object
+        """
+        row = len(self.ids)
+        self.ids.append(intern(obj_id))
+        self.rows[self.ids[row]] = row
+        for name, kind in self.kinds.items():
+            self.columns[name].append(
+                self.defaults.get(name) if kind == "object" else 0)
+            self.present[name].append(0)
+        for name, value in attrs.items():
+            self.set(row, name, value)
+
+    def set(self, row: int, name: str, value) -> None:
+        """This method sets an attribute of a row"""
+        if name == "id":
+            del self.rows[self.ids[row]]
+            self.ids[row] = intern(value)
+            self.rows[self.ids[row]] = row
+            return
+        kind = self.kinds.get(name)
+        if kind is None:
+            self.extra.setdefault(row, {})[name] = value
+            return
+        if kind == "time" and isinstance(value, datetime) and \
+                value.tzinfo is None:
+            value = (value - EPOCH) // MICROSECOND
+        elif kind == "int" and type(value) is int and \
+                -2 ** 63 <= value < 2 ** 63:
+            pass
+        elif kind == "float" and type(value) is float:
+            pass
+        elif kind != "object":
+            self.to_object(name)
+        self.columns[name][row] = value
+        self.present[name][row] = 1
+
+    def get(self, row: int, name: str):
+        """This method returns an attribute of a row
+
+        Raises:
+            AttributeError: if the row has no such attribute
+        """
+        if name == "id":
+            return self.ids[row]
+        kind = self.kinds.get(name)
+        if kind is None:
+            try:
+                return self.extra[row][name]
+            except KeyError:
+                raise AttributeError(f"'{self.cls.__name__}' object "
+                                     f"has no attribute '{name}'") from None
+        if not self.present[name][row]:
+            if name in self.defaults:
+                return self.defaults[name]
+            raise AttributeError(f"'{self.cls.__name__}' object "
+                                 f"has no attribute '{name}'")
+        value = self.columns[name][row]
+        if kind == "time":
+            return EPOCH + timedelta(microseconds=value)
+        return value
+
+    def attributes(self, row: int) -> dict:
+        """This method returns the attributes set on a row,
+        like __dict__ does for a regular model"""
+        attrs = {"id": self.ids[row]}
+        for name in self.kinds:
+            if self.present[name][row]:
+                attrs[name] = self.get(row, name)
+        attrs.update(self.extra.get(row, {}))
+        return attrs
+
+    def remove(self, row: int) -> None:
+        """This method removes a row, moving the last row in its place"""
+        last = len(self.ids) - 1
+        del self.rows[self.ids[row]]
+        for name in self.kinds:
+            column = self.columns[name]
+            present = self.present[name]
+            column[row] = column[last]
+            present[row] = present[last]
+            column.pop()
+            present.pop()
+        extra = self.extra.pop(last, None)
+        self.extra.pop(row, None)
+        if row != last:
+            self.ids[row] = self.ids[last]
+            self.rows[self.ids[row]] = row
+            if extra is not None:
+                self.extra[row] = extra
+        self.ids.pop()
+
+    def to_object(self, name: str) -> None:
+        """This method turns an array column into a list column
+        so it can hold a value of any type"""
+        kind = self.kinds[name]
+        values = list(self.columns[name])
+        if kind == "time":
+            values = [EPOCH + timedelta(microseconds=value)
+                      for value in values]
+        self.columns[name] = values
+        self.kinds[name] = "object"
+
+
+class Row:
+    """This class is a lightweight proxy to a row of a table
+
+    It reads and writes the columns and behaves like a model:
+    str(), to_dict(), save(), getattr and setattr work the same way,
+    and __class__ is the model class
+    """
+    __slots__ = ("_table", "_id")
+
+    def __init__(self, table: Table, obj_id: str) -> None:
+        """This method initializes the proxy to the row of obj_id"""
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_id", obj_id)
+
+    @property
+    def __class__(self):
+        """This method returns the model class of the row"""
+        return self._table.cls
+
+    def __getattr__(self, name: str):
+        """This method reads an attribute from the columns"""
+        table = self._table
+        try:
+            row = table.rows[self._id]
+        except KeyError:
+            raise AttributeError(f"'{table.cls.__name__}' object "
+                                 f"was deleted") from None
+        return table.get(row, name)
+
+    def __setattr__(self, name: str, value) -> None:
+        """This method writes an attribute to the columns"""
+        table = self._table
+        table.set(table.rows[self._id], name, value)
+        if name == "id":
+            object.__setattr__(self, "_id", table.ids[table.rows[value]])
+
+    def __eq__(self, other) -> bool:
+        """This method compares a proxy with another proxy
+        or a model object by class and id"""
+        try:
+            return self.__class__ is other.__class__ and \
+                self._id == other.id
+        except AttributeError:
+            return False
+
+    def __hash__(self) -> int:
+        """This method hashes a proxy by class and id"""
+        return hash((self._table.cls, self._id))
+
+    def __str__(self) -> str:
+        """This method returns the string representation of the model"""
+        attrs = self._table.attributes(self._table.rows[self._id])
+        return f"[{self._table.cls.__name__}] ({self._id}) {attrs}"
+
+    def save(self) -> None:
+        """This method updates the updated_at attribute to the current time
+        """
+        from models import storage
+        self.updated_at = datetime.now()
+        storage.save()
+
+    def to_dict(self) -> dict:
+        """This method returns a dictionary representation of the model"""
+        model_dict = self._table.attributes(self._table.rows[self._id])
+        model_dict["__class__"] = self._table.cls.__name__
+        model_dict["created_at"] = self.created_at.isoformat()
+        model_dict["updated_at"] = self.updated_at.isoformat()
+        return model_dict
+
+
+class Rows(Mapping):
+    """This class is the read-only mapping returned by ColumnStorage.all()
+
+    It makes the Row proxies on demand, so `key in` and [key]
+    do not build a proxy for every object
+    """
+
+    def __init__(self, tables: list) -> None:
+        """This method initializes the mapping over some tables"""
+        self.tables = tables
+
+    def __getitem__(self, key: str) -> Row:
+        """This method returns the proxy of a key"""
+        name, _, obj_id = key.partition(".")
+        for table in self.tables:
+            if table.cls.__name__ == name and obj_id in table.rows:
+                return Row(table, table.ids[table.rows[obj_id]])
+        raise KeyError(key)
+
+    def __iter__(self):
+        """This method yields the keys"""
+        for table in self.tables:
+            name = table.cls.__name__
+            for obj_id in list(table.ids):
+                yield f"{name}.{obj_id}"
+
+    def __len__(self) -> int:
+        """This method returns the number of objects"""
+        return sum(len(table) for table in self.tables)
+
+
+class ColumnStorage:
+    """This class is the columnar storage engine for the airBnB clone app
+
+    Attributes:
+        __file_path (str): the path to the file where the objects are stored
+        __tables (dict): the table of every model class, name -> Table
+    """
+    __file_path = "file.json"
+
+    def __init__(self) -> None:
+        """This method initializes an empty storage"""
+        self.__tables = {}
+
+    def __table(self, name: str) -> Table:
+        """This method returns the table of a class name, creating it"""
+        table = self.__tables.get(name)
+        if table is None:
+            from models.base_model import classes
+            table = self.__tables[name] = Table(classes[name])
+        return table
+
+    def all(self, cls=None):
+        """This method returns all objects in storage
+
+        Args:
+            cls (type or str): only return the objects of this class
+        Returns:
+            Rows: the proxies of the objects, key -> Row
+        """
+        if cls is None:
+            return Rows(list(self.__tables.values()))
+        table = self.__tables.get(class_name(cls))
+        return Rows([table] if table is not None else [])
+
+    def count(self, cls=None):
+        """This method returns the number of objects in storage
+
+        Args:
+            cls (type or str): only count the objects of this class
+        """
+        if cls is None:
+            return sum(len(table) for table in self.__tables.values())
+        table = self.__tables.get(class_name(cls))
+        return len(table) if table is not None else 0
+
+    def column(self, cls, name):
+        """This method returns the values of an attribute for every
+        object of a class, in storage order
+
+        Int and float attributes are an array, so sum(), min(), max()
+        and friends run without making an object per row, created_at
+        and updated_at are an array of microseconds since 1970.
+        Objects where the attribute was never set hold its class value.
+
+        Args:
+            cls (type or str): the model class
+            name (str): the attribute
+        Returns:
+            array or list: the column, it must not be modified
+        Raises:
+            KeyError: if the attribute is not declared by the class
+        """
+        table = self.__table(class_name(cls))
+        if name == "id":
+            return table.ids
+        return table.columns[name]
+
+    def new(self, obj):
+        """This method adds a new object to storage"""
+        if type(obj) is Row:
+            return
+        table = self.__table(obj.__class__.__name__)
+        attrs = dict(vars(obj))
+        obj_id = attrs.pop("id")
+        row = table.rows.get(obj_id)
+        if row is not None:
+            table.remove(row)
+        table.append(obj_id, attrs)
+
+    def touch(self, obj):
+        """This method copies the attributes of a model object
+        to its row, proxies write to the columns directly"""
+        if type(obj) is Row:
+            return
+        table = self.__tables.get(obj.__class__.__name__)
+        obj_id = getattr(obj, "id", None)
+        if table is not None and obj_id in table.rows:
+            row = table.rows[obj_id]
+            for name, value in vars(obj).items():
+                table.set(row, name, value)
+
+    def check(self, obj, name, value):
+        """This method accepts every value, the columnar storage
+        has no unique fields"""
+
+    def delete(self, obj=None):
+        """This method deletes an object from storage"""
+        if obj is None:
+            return
+        table = self.__tables.get(obj.__class__.__name__)
+        if table is not None and obj.id in table.rows:
+            table.remove(table.rows[obj.id])
+
+    def clear(self):
+        """This method forgets every object in memory
+        without touching the file, reload() brings them back"""
+        self.__tables.clear()
+
+    def save(self):
+        """This method saves the objects in storage to a file"""
+        parts = []
+        for name, table in self.__tables.items():
+            for row, obj_id in enumerate(table.ids):
+                obj_dict = table.attributes(row)
+                obj_dict["__class__"] = name
+                for field in TIMESTAMPS:
+                    if field in obj_dict:
+                        obj_dict[field] = obj_dict[field].isoformat()
+                parts.append(f"{dumps(f'{name}.{obj_id}')}: "
+                             f"{dumps(obj_dict)}")
+        with open(ColumnStorage.__file_path, "w") as file:
+            file.write("{" + ", ".join(parts) + "}")
+
+    def flush(self):
+        """This method does nothing, save() writes right away"""
+
+    @contextmanager
+    def transaction(self):
+        """This method saves the changes of a block of code when it ends,
+        the objects are not restored if the block raises"""
+        yield self
+        self.save()
+
+    def compact(self, wait=False):
+        """This method does nothing, save() always rewrites the file"""
+
+    def reload(self):
+        """This method reloads the objects from the file to storage"""
+        try:
+            with open_text(ColumnStorage.__file_path) as file:
+                for key, obj_dict in iter_items(file):
+                    table = self.__table(obj_dict.pop("__class__"))
+                    obj_id = obj_dict.pop("id")
+                    for field in TIMESTAMPS:
+                        if field in obj_dict:
+                            obj_dict[field] = datetime.fromisoformat(
+                                obj_dict[field])
+                    row = table.rows.get(obj_id)
+                    if row is not None:
+                        table.remove(row)
+                    table.append(obj_id, obj_dict)
+        except FileNotFoundError:
+            pass
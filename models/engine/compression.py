@@ -0,0 +1,183 @@
+#!/usr/bin/python3
+"""This module contains the compression of the storage files
+
+file.json is mostly the same keys and timestamps over and over,
+so it compresses well, and a compressed file is fewer bytes to write
+on every save and to read on every reload. The codecs are the ones
+of the standard library:
+    "none": the file is written as it is
+    "gzip": deflate with a gzip header, like gzip file.json
+    "zlib": deflate with a zlib header
+    "lzma": xz, smaller files but slower saves
+
+The files are compressed and decompressed a chunk at a time, so neither
+the whole compressed file nor the whole text is ever held in memory.
+The codec of a file is found from its first bytes when it is read,
+so the codec can be changed at any time and a plain file.json
+is still read.
+"""
+import io
+import lzma
+import zlib
+
+CODECS = ("none", "gzip", "zlib", "lzma")
+
+_CHUNK_SIZE = 1 << 16
+_GZIP_MAGIC = b"\x1f\x8b"
+_XZ_MAGIC = b"\xfd7zXZ\x00"
+
+
+def check_compression(codec: str, level=None) -> None:
+    """This function refuses an unknown codec or level
+
+    Args:
+        codec (str): one of CODECS
+        level (int): the compression level, 0 (fastest) to 9 (smallest),
+        None for the default of the codec
+    Raises:
+        ValueError: if codec is not in CODECS or level is not
+        None or an int from 0 to 9
+    """
+    if codec not in CODECS:
+        raise ValueError(f"unknown compression: {codec}")
+    if level is not None and (type(level) is not int or
+                              not 0 <= level <= 9):
+        raise ValueError(f"unknown compression level: {level}")
+
+
+def detect(head: bytes) -> str:
+    """This function returns the codec of a file from its first bytes
+
+    Args:
+        head (bytes): the first 6 bytes of the file, or fewer
+    Returns:
+        str: one of CODECS, "none" if the file is not compressed
+    """
+    if head.startswith(_GZIP_MAGIC):
+        return "gzip"
+    if head.startswith(_XZ_MAGIC):
+        return "lzma"
+    # json text never starts with the byte 0x78 ("x")
+    if len(head) >= 2 and head[0] == 0x78 and \
+            (head[0] << 8 | head[1]) % 31 == 0:
+        return "zlib"
+    return "none"
+
+
+def codec_of(path: str) -> str:
+    """This function returns the codec of a file from its first bytes
+
+    Raises:
+        FileNotFoundError: if the file does not exist
+    """
+    with open(path, "rb") as file:
+        return detect(file.read(len(_XZ_MAGIC)))
+
+
+def _compressor(codec: str, level=None):
+    """This function returns a new compressor of a codec"""
+    if codec == "lzma":
+        return lzma.LZMACompressor(preset=6 if level is None else level)
+    level = zlib.Z_DEFAULT_COMPRESSION if level is None else level
+    # the window bits pick the header, 16 + 15 is gzip and 15 is zlib
+    bits = 31 if codec == "gzip" else 15
+    return zlib.compressobj(level, zlib.DEFLATED, bits)
+
+
+def _decompressor(codec: str):
+    """This function returns a new decompressor of a codec"""
+    if codec == "lzma":
+        return lzma.LZMADecompressor()
+    return zlib.decompressobj(31 if codec == "gzip" else 15)
+
+
+def compress(chunks, codec: str = "none", level=None):
+    """This function compresses text or bytes a chunk at a time
+
+    Args:
+        chunks: the str or bytes to compress, in order
+        codec (str): one of CODECS
+        level (int): the compression level, None for the default
+    Yields:
+        bytes: the compressed data
+    """
+    compressor = None if codec == "none" else _compressor(codec, level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        if compressor is None:
+            yield chunk
+        else:
+            yield compressor.compress(chunk)
+    if compressor is not None:
+        yield compressor.flush()
+
+
+class _DecompressReader(io.RawIOBase):
+    """This class reads a compressed file as its decompressed bytes
+
+    Attributes:
+        file: the compressed file
+        decompressor: the decompressor of its codec
+        data (memoryview): the decompressed bytes not read yet
+    """
+
+    def __init__(self, file, codec: str) -> None:
+        """This method initializes the reader at the start of file"""
+        self.file = file
+        self.decompressor = _decompressor(codec)
+        self.data = memoryview(b"")
+
+    def readable(self) -> bool:
+        """This method tells that the reader can be read"""
+        return True
+
+    def readinto(self, buffer) -> int:
+        """This method decompresses the next bytes into buffer
+
+        Raises:
+            EOFError: if the file ends before its compressed stream does
+        """
+        while not self.data:
+            if self.decompressor.eof:
+                return 0
+            chunk = self.file.read(_CHUNK_SIZE)
+            if not chunk:
+                raise EOFError("compressed file ended before the "
+                               "end-of-stream marker was reached")
+            self.data = memoryview(self.decompressor.decompress(chunk))
+        size = min(len(buffer), len(self.data))
+        buffer[:size] = self.data[:size]
+        self.data = self.data[size:]
+        return size
+
+    def close(self) -> None:
+        """This method closes the compressed file"""
+        self.file.close()
+        super().close()
+
+
+def open_binary(path: str):
+    """This function opens a file for reading its decompressed bytes,
+    whatever its codec
+
+    Returns:
+        a binary file, to be closed by the caller
+    """
+    file = open(path, "rb")
+    head = file.read(len(_XZ_MAGIC))
+    file.seek(0)
+    codec = detect(head)
+    if codec == "none":
+        return file
+    return io.BufferedReader(_DecompressReader(file, codec), _CHUNK_SIZE)
+
+
+def open_text(path: str):
+    """This function opens a file for reading its decompressed text,
+    whatever its codec
+
+    Returns:
+        a text file, to be closed by the caller
+    """
+    return io.TextIOWrapper(open_binary(path), encoding="utf-8")
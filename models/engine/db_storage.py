@@ -0,0 +1,297 @@
+#!/usr/bin/python3
+"""This module contains the sqlite storage engine for the airBnB clone app
+
+It has the same interface as FileStorage, but saves the objects to
+a sqlite database with one table per model class instead of
+rewriting file.json: save() only writes the objects created, modified
+or deleted since the last save, in a single transaction, so a failed
+save leaves the database as it was.
+
+Every attribute declared by a model class has a column, the attributes
+added later (and the values that are not a str, int or float, like
+Place.amenity_ids) are kept as json in the extra column.
+The foreign keys of FOREIGN_KEYS and the fields of UNIQUE_KEYS
+are indexed, children() and get_by() look them up in the database.
+"""
+import sqlite3
+from contextlib import contextmanager
+from json import dumps, loads
+from models.engine.file_storage import FOREIGN_KEYS, UNIQUE_KEYS
+from models.engine.model_info import class_name, declared
+
+# the columns every table starts with
+_FIXED = ("id", "created_at", "updated_at")
+# the types sqlite keeps as they are, the others go to the extra column
+_SCALARS = (str, int, float)
+
+
+def _columns(cls: type) -> tuple:
+    """This function returns the columns of the table of a model class"""
+    return _FIXED + tuple(name for name in declared(cls)
+                          if name not in _FIXED)
+
+
+class DBStorage:
+    """This class is the sqlite storage engine for the airBnB clone app
+
+    Attributes:
+        __db_path (str): the path to the database
+        __connection (Connection): the connection to the database,
+        opened by reload() or the first save()
+        __objects (dict): the objects stored in the storage
+        __pending (dict): the changes not saved yet, key -> object
+        (or None when the object was deleted)
+        __tables (dict): the columns of every table, class name -> columns
+        __classes (dict): the model classes by name, see models.base_model
+    """
+    __db_path = "file.db"
+    __connection = None
+    __objects = {}
+    __pending = {}
+    __tables = {}
+    __classes = {}
+
+    def all(self, cls=None):
+        """This method returns all objects in storage
+
+        Args:
+            cls (type or str): only return the objects of this class
+        Returns:
+            dict: the objects, key -> object
+        """
+        if cls is None:
+            return DBStorage.__objects
+        prefix = f"{class_name(cls)}."
+        return {key: obj for key, obj in DBStorage.__objects.items()
+                if key.startswith(prefix)}
+
+    def count(self, cls=None):
+        """This method returns the number of objects in storage
+
+        Args:
+            cls (type or str): only count the objects of this class
+        """
+        if cls is None:
+            return len(DBStorage.__objects)
+        return len(self.all(cls))
+
+    def children(self, parent_cls, parent_id, cls):
+        """This method returns the objects of a class
+        that point to a parent object, like the cities of a state
+
+        Args:
+            parent_cls (type or str): the class of the parent
+            parent_id (str): the id of the parent
+            cls (type or str): the class of the children
+        Returns:
+            dict: the children, key -> object
+        Raises:
+            ValueError: if cls has no foreign key to parent_cls
+        """
+        parent_name = class_name(parent_cls)
+        name = class_name(cls)
+        fields = [field for field, parent in
+                  FOREIGN_KEYS.get(name, {}).items() if parent == parent_name]
+        if not fields:
+            raise ValueError(f"{name} has no foreign key to {parent_name}")
+        return self.__find(name, fields, parent_id)
+
+    def get_by(self, cls, **fields):
+        """This method finds an object by a unique field,
+        like storage.get_by(User, email="airbnb@mail.com")
+
+        Args:
+            cls (type or str): the class of the object
+            fields: one unique field and its value
+        Returns:
+            the object, or None if no object has this value
+        Raises:
+            ValueError: if the field is not a unique field of cls
+        """
+        name = class_name(cls)
+        if len(fields) != 1:
+            raise ValueError("get_by takes exactly one field")
+        (field, value), = fields.items()
+        if field not in UNIQUE_KEYS.get(name, ()):
+            raise ValueError(f"{name}.{field} is not a unique field")
+        same = self.__find(name, [field], value)
+        return next(iter(same.values()), None)
+
+    def __find(self, name, fields, value):
+        """This method returns the objects of a class that have
+        a value in one of the fields, the saved ones are found through
+        the indexes of the database and the pending ones in memory"""
+        keys = set()
+        if name in DBStorage.__tables:
+            where = " OR ".join(f'"{field}" = ?' for field in fields)
+            cursor = self.__connect().execute(
+                f'SELECT id FROM "{name}" WHERE {where}',
+                [value] * len(fields))
+            keys.update(f"{name}.{obj_id}" for obj_id, in cursor)
+        prefix = f"{name}."
+        for key, obj in DBStorage.__pending.items():
+            if not key.startswith(prefix):
+                continue
+            if obj is not None and any(getattr(obj, field, "") == value
+                                       for field in fields):
+                keys.add(key)
+            else:
+                keys.discard(key)
+        return {key: DBStorage.__objects[key] for key in keys
+                if key in DBStorage.__objects}
+
+    def check(self, obj, name, value):
+        """This method accepts every value, the sqlite storage
+        does not refuse duplicate values of the unique fields"""
+
+    def new(self, obj):
+        """This method adds a new object to storage"""
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        DBStorage.__objects[key] = obj
+        DBStorage.__pending[key] = obj
+
+    def touch(self, obj):
+        """This method marks an object of the storage as modified
+        so the next save() writes its new state
+
+        BaseModel calls it on every attribute assignment, changes made
+        in place (like appending to Place.amenity_ids) must call it
+        """
+        key = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if DBStorage.__objects.get(key) is obj:
+            DBStorage.__pending[key] = obj
+
+    def delete(self, obj=None):
+        """This method deletes an object from storage"""
+        if obj is None:
+            return
+        key = f"{obj.__class__.__name__}.{obj.id}"
+        if DBStorage.__objects.pop(key, None) is not None:
+            DBStorage.__pending[key] = None
+
+    def clear(self):
+        """This method forgets every object in memory
+        without touching the database, reload() brings them back"""
+        DBStorage.__objects.clear()
+        DBStorage.__pending.clear()
+
+    def close(self):
+        """This method closes the connection to the database,
+        the next save() or reload() opens it again"""
+        if DBStorage.__connection is not None:
+            DBStorage.__connection.close()
+            DBStorage.__connection = None
+
+    def __connect(self):
+        """This method returns the connection to the database,
+        opening it and creating the tables of the model classes if needed"""
+        if DBStorage.__connection is None:
+            from models.base_model import classes
+            DBStorage.__classes = classes
+            DBStorage.__connection = sqlite3.connect(DBStorage.__db_path)
+            DBStorage.__tables = {}
+            with DBStorage.__connection:
+                for name, cls in classes.items():
+                    self.__create(name, _columns(cls))
+        return DBStorage.__connection
+
+    def __create(self, name, columns):
+        """This method creates the table of a class, or adds the columns
+        of the attributes declared since it was created"""
+        connection = DBStorage.__connection
+        connection.execute(f'CREATE TABLE IF NOT EXISTS "{name}" '
+                           '(id TEXT PRIMARY KEY, extra TEXT)')
+        existing = [row[1] for row in
+                    connection.execute(f'PRAGMA table_info("{name}")')]
+        # the columns have no type so sqlite keeps the values as they are
+        for column in columns:
+            if column not in existing:
+                connection.execute(
+                    f'ALTER TABLE "{name}" ADD COLUMN "{column}"')
+        for field in dict.fromkeys(tuple(FOREIGN_KEYS.get(name, ())) +
+                                   UNIQUE_KEYS.get(name, ())):
+            connection.execute(f'CREATE INDEX IF NOT EXISTS '
+                               f'"{name}_{field}" ON "{name}" ("{field}")')
+        DBStorage.__tables[name] = columns
+
+    def __row(self, name, obj):
+        """This method returns the values of the columns of an object"""
+        obj_dict = obj.to_dict()
+        del obj_dict["__class__"]
+        values = []
+        for column in DBStorage.__tables[name]:
+            value = obj_dict.get(column)
+            if type(value) in _SCALARS:
+                del obj_dict[column]
+                values.append(value)
+            else:
+                values.append(None)
+        values.append(dumps(obj_dict) if obj_dict else None)
+        return values
+
+    def save(self):
+        """This method writes the changes made since the last save
+        to the database in a single transaction"""
+        connection = self.__connect()
+        with connection:
+            for key, obj in DBStorage.__pending.items():
+                name, obj_id = key.split(".", 1)
+                if name not in DBStorage.__tables:
+                    if obj is None:
+                        # never saved, its class may not be registered now
+                        continue
+                    self.__create(name, _columns(type(obj)))
+                if obj is None:
+                    connection.execute(f'DELETE FROM "{name}" WHERE id = ?',
+                                       (obj_id,))
+                    continue
+                columns = DBStorage.__tables[name] + ("extra",)
+                names = ", ".join(f'"{column}"' for column in columns)
+                marks = ", ".join("?" * len(columns))
+                connection.execute(f'INSERT OR REPLACE INTO "{name}" '
+                                   f'({names}) VALUES ({marks})',
+                                   self.__row(name, obj))
+        DBStorage.__pending.clear()
+
+    def flush(self):
+        """This method does nothing, save() writes right away"""
+
+    @contextmanager
+    def transaction(self):
+        """This method saves the changes of a block of code when it ends,
+        the objects are not restored if the block raises"""
+        yield self
+        self.save()
+
+    def compact(self, wait=False):
+        """This method gives the space of the deleted rows back
+        to the file system
+
+        Args:
+            wait (bool): unused, the database is compacted right away
+        """
+        self.__connect().execute("VACUUM")
+
+    def reload(self):
+        """This method reloads the objects from the database to storage"""
+        try:
+            connection = self.__connect()
+        except ImportError:
+            return
+        with connection:
+            for name, cls in DBStorage.__classes.items():
+                if name not in DBStorage.__tables:
+                    self.__create(name, _columns(cls))
+        for name, columns in DBStorage.__tables.items():
+            cls = DBStorage.__classes[name]
+            names = ", ".join(f'"{column}"' for column in columns)
+            cursor = connection.execute(
+                f'SELECT {names}, extra FROM "{name}"')
+            for row in cursor:
+                obj_dict = {column: value for column, value
+                            in zip(columns, row) if value is not None}
+                if row[-1] is not None:
+                    obj_dict.update(loads(row[-1]))
+                obj_dict["__class__"] = name
+                obj = cls(**obj_dict)
+                DBStorage.__objects[f"{name}.{obj.id}"] = obj
@@ -0,0 +1,159 @@
+#!/usr/bin/python3
+"""This module contains the crash-safe writes of the file storage
+
+A file is never rewritten in place: the new content goes to a temporary
+file in the same directory, which is renamed over the old one, so a
+crash in the middle of a save leaves the old file or the new one
+on disk, never a truncated one, and other processes never read
+a file being written.
+
+How far the data goes before save() returns is the durability level:
+    "none": the data is left to the operating system
+    "flush": the buffers of Python are flushed before the rename
+    "fsync": the file and its directory are fsynced on every save
+    "group": the files written are fsynced together by a timer
+    every group interval seconds, and when the program exits
+"""
+import atexit
+import os
+from threading import Lock, Timer, get_ident
+from models.engine.compression import compress
+
+DURABILITY = ("none", "flush", "fsync", "group")
+
+
+def fsync_path(path: str) -> None:
+    """This function fsyncs a file or a directory by its path"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except (FileNotFoundError, PermissionError):
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        # some systems cannot fsync a directory
+        pass
+    finally:
+        os.close(fd)
+
+
+class GroupSync:
+    """This class fsyncs the files written since the last sync
+    all at once, some time after the first of them was written
+
+    Attributes:
+        paths (set): the files written and not fsynced yet
+        lock (Lock): protects paths and timer
+        timer (Timer): the pending sync, if any
+    """
+
+    def __init__(self) -> None:
+        """This method initializes the group with nothing to sync"""
+        self.paths = set()
+        self.lock = Lock()
+        self.timer = None
+
+    def schedule(self, path: str, interval: float) -> None:
+        """This method adds a file to the next sync
+
+        Args:
+            path (str): the file written
+            interval (float): the seconds to wait before the sync
+            when none is pending
+        """
+        with self.lock:
+            self.paths.add(path)
+            if self.timer is None:
+                self.timer = Timer(interval, self.sync)
+                self.timer.daemon = True
+                self.timer.start()
+
+    def sync(self) -> None:
+        """This method fsyncs the files written now"""
+        with self.lock:
+            paths, self.paths = self.paths, set()
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+        for directory in {os.path.dirname(path) or "." for path in paths}:
+            fsync_path(directory)
+        for path in paths:
+            fsync_path(path)
+
+
+group = GroupSync()
+atexit.register(group.sync)
+
+
+def check_durability(durability: str) -> None:
+    """This function refuses an unknown durability level
+
+    Raises:
+        ValueError: if durability is not in DURABILITY
+    """
+    if durability not in DURABILITY:
+        raise ValueError(f"unknown durability: {durability}")
+
+
+def sync_file(file, path: str, durability: str,
+              interval: float = 1.0) -> None:
+    """This function makes the data written to an open file
+    as durable as the durability level asks
+
+    Args:
+        file: the open file
+        path (str): the path to the file
+        durability (str): one of DURABILITY
+        interval (float): the seconds between two group syncs
+    """
+    if durability == "none":
+        return
+    file.flush()
+    if durability == "fsync":
+        os.fsync(file.fileno())
+    elif durability == "group":
+        group.schedule(path, interval)
+
+
+def write_atomic(path: str, text, durability: str = "flush",
+                 interval: float = 1.0, compression: str = "none",
+                 level=None) -> None:
+    """This function replaces the content of a file
+    so that it is never seen half written
+
+    Args:
+        path (str): the file to write
+        text (str, bytes or list): the new content, or its chunks
+        in order, written one after the other
+        durability (str): one of DURABILITY
+        interval (float): the seconds between two group syncs
+        compression (str): the codec of the file,
+        see models.engine.compression
+        level (int): the compression level, None for the default
+    """
+    directory = os.path.dirname(path) or "."
+    # one temporary file per writer, in the directory of the file
+    # because a rename to another file system is not atomic
+    tmp_path = f"{path}.{os.getpid()}.{get_ident()}.tmp"
+    try:
+        if isinstance(text, (str, bytes)):
+            text = [text]
+        with open(tmp_path, "wb") as file:
+            for data in compress(text, compression, level):
+                file.write(data)
+            if durability != "none":
+                file.flush()
+            if durability == "fsync":
+                os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+    if durability == "fsync":
+        # the rename itself is only durable once the directory is
+        fsync_path(directory)
+    elif durability == "group":
+        group.schedule(path, interval)
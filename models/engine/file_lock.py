@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""This module contains the lock shared by the processes
+using the same file storage
+
+The lock is an advisory lock (flock) on a lock file next to file.json.
+The lock file also holds the generation of file.json, a number
+incremented by every save, so a process can tell that another one
+wrote file.json by reading a few bytes instead of the whole file.
+Where flock does not exist (Windows) the lock does nothing
+and only the generation is kept.
+"""
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def read_generation(path: str) -> int:
+    """This function reads the generation of a lock file without locking
+
+    Returns:
+        int: the generation, 0 if the file is empty or does not exist yet
+    """
+    try:
+        with open(path, "r") as file:
+            text = file.read()
+    except FileNotFoundError:
+        return 0
+    # a file being rewritten reads as empty for a moment,
+    # the new generation is seen by the next read
+    return int(text) if text else 0
+
+
+class FileLock:
+    """This class is an advisory lock on a lock file
+
+    Attributes:
+        path (str): the path to the lock file
+        file: the lock file while the lock is held
+    """
+
+    def __init__(self, path: str) -> None:
+        """This method initializes the lock
+
+        Args:
+            path (str): the path to the lock file
+        """
+        self.path = path
+        self.file = None
+
+    @contextmanager
+    def hold(self, shared: bool = False):
+        """This method holds the lock during a block of code
+
+        Args:
+            shared (bool): take a shared lock, for reading,
+            instead of an exclusive one
+        """
+        self.file = open(self.path, "a+")
+        try:
+            if fcntl is not None:
+                fcntl.flock(self.file.fileno(),
+                            fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+            yield self
+        finally:
+            # closing the file releases the lock
+            self.file.close()
+            self.file = None
+
+    def generation(self) -> int:
+        """This method returns the generation, the lock must be held"""
+        self.file.seek(0)
+        text = self.file.read()
+        return int(text) if text else 0
+
+    def bump(self) -> int:
+        """This method increments the generation, the lock must be held
+        exclusively
+
+        Returns:
+            int: the new generation
+        """
+        generation = self.generation() + 1
+        self.file.seek(0)
+        self.file.truncate()
+        self.file.write(str(generation))
+        self.file.flush()
+        return generation
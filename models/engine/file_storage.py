@@ -1,6 +1,45 @@
 #!/usr/bin/python3
 """This module contains the file storage class for the airBnB clone app"""
-from json import dump, load, dumps, loads
+import atexit
+import os
+from contextlib import contextmanager, nullcontext
+from json import dumps
+from threading import Lock, RLock, Thread, Timer
+from time import monotonic
+from zlib import crc32
+from models.engine import binary_format
+from models.engine.compression import (check_compression, codec_of,
+                                       open_text)
+from models.engine.durable import (check_durability, fsync_path,
+                                   write_atomic)
+from models.engine.file_lock import FileLock, read_generation
+from models.engine.journal import Journal, compact
+from models.engine.json_stream import iter_items
+from models.engine.lazy_objects import LazyObjects
+from models.engine.mapped_file import MappedFile, write_parts_index
+from models.engine.model_info import class_name
+from models.engine.parallel import (can_fork, iter_file, read_files,
+                                    read_mapped, serialize)
+from models.engine.writer import Writer
+
+# the relationship fields of the models, class name -> {field: parent class}
+FOREIGN_KEYS = {
+    "City": {"state_id": "State"},
+    "Place": {"city_id": "City", "user_id": "User"},
+    "Review": {"place_id": "Place", "user_id": "User"},
+}
+# the fields that identify an object, class name -> fields
+UNIQUE_KEYS = {
+    "User": ("email",),
+}
+# the fields FileStorage keeps an index of, class name -> fields
+INDEXED_FIELDS = {
+    name: tuple(FOREIGN_KEYS.get(name, ())) + UNIQUE_KEYS.get(name, ())
+    for name in set(FOREIGN_KEYS) | set(UNIQUE_KEYS)
+}
+# the types of the field values FileStorage indexes, an object with
+# any other value (like a list) is left out of the index of the field
+INDEXED_TYPES = (str, int, float)
 
 
 class FileStorage:
@@ -8,45 +47,1142 @@ class FileStorage:
 
     Attributes:
         __file_path (str): the path to the file where the objects are stored
-        __objects (dict): the objects stored in the storage
+        __shard_path (str): the directory of the per class files
+        used instead of file.json when the shards option is set
+        __journal_path (str): the path to the journal of changes
+        made since file.json was last written
+        __binary_path (str): the path to the file where the objects
+        are stored in the binary format, used instead of file.json
+        __lock_path (str): the path to the lock file of the processes
+        sharing file.json, which holds the generation of file.json
+        __objects (LazyObjects): the objects stored in the storage
+        __by_class (dict): the same objects grouped by class name,
+        class name -> {key: object}
+        __indexes (dict): the index of INDEXED_FIELDS,
+        (class name, field) -> {value: {key: object}}
+        __links (dict): the indexed field values of each object,
+        key -> {field: value}
+        __pending (dict): the changes not saved yet, key -> object
+        (or None when the object was deleted)
+        __cache (dict): the json of the objects not modified
+        since they were last saved, key -> json string
+        __dirty (set): the names of the shard files to rewrite
+        on the next save even if none of their objects changed
+        __loaded (set): the class names read from the shards,
+        None once every class was read
+        __batches (int): the number of batch() blocks being run
+        __undo (dict): the state of the objects changed by the running
+        transaction before their first change, key -> (object, attributes),
+        None outside a transaction
+        __restoring (bool): True while a rollback restores the objects
+        __deferred (float): the time of the first save() not written yet,
+        None when every save was written
+        __timer (Timer): writes the saves deferred by commit_delay
+        once the delay passed, if no save() did it before
+        __job_id (int): the id of the last write
+        __dumping (dict): the id of the last write dumping each object,
+        key -> job id, so the json of an older write is not kept
+        __writer (Writer): the background writer, once started
+        __generation (int): the generation of file.json last read
+        or written by this process, with the shared option
+        __options (dict): the storage options, see configure()
+        __lock (Lock): serializes journal writes and rotations
+        __saving (RLock): serializes the saves of the timer thread
+        with the other saves and the changes of new(), touch(),
+        delete() and clear()
+        __compactor (Thread): the running compaction, if any
+        __classes (dict): the model classes by name, see models.base_model
     """
     __file_path = "file.json"
-    __objects = {}
+    __shard_path = "file.json.d"
+    __journal_path = "file.json.journal"
+    __lock_path = "file.json.lock"
+    __binary_path = "file.hbnb"
+    __objects = LazyObjects(None)
+    __by_class = {}
+    __indexes = {}
+    __links = {}
+    __pending = {}
+    __cache = {}
+    __dirty = set()
+    __loaded = set()
+    __batches = 0
+    __undo = None
+    __restoring = False
+    __job_id = 0
+    __dumping = {}
+    __writer = None
+    __generation = None
+    __deferred = None
+    __timer = None
+    __options = {"journal": False, "compact_size": 16 * 1024 * 1024,
+                 "compact_ratio": 1.0, "unique": False, "lazy": False,
+                 "shards": None, "durability": "flush",
+                 "group_interval": 1.0, "commit_size": None,
+                 "commit_delay": None, "background": False,
+                 "queue_size": 8, "shared": False, "format": "json",
+                 "compression": "none", "compression_level": None,
+                 "mapped": False, "workers": None}
+    __lock = Lock()
+    __saving = RLock()
+    __compactor = None
+    __classes = {}
+
+    def configure(self, **options):
+        """This method changes the storage options
+
+        Args:
+            journal (bool): append each change to the journal on save()
+            instead of rewriting file.json
+            compact_size (int): compact once the journal reaches
+            this many bytes, None to disable
+            compact_ratio (float): compact once the journal is this
+            many times bigger than file.json, None to disable
+            unique (bool): refuse two objects with the same value
+            of a field in UNIQUE_KEYS, like two users with one email
+            lazy (bool): reload() keeps the saved dicts and only
+            builds a model the first time it is used
+            shards (int): save each class to its own files
+            in file.json.d instead of file.json, split in this many
+            files by id, None to use file.json
+            durability (str): how far a save goes before it returns,
+            "none", "flush", "fsync" or "group", see models.engine.durable
+            group_interval (float): the seconds between two fsyncs
+            of the files written, with the "group" durability
+            commit_size (int): group commit, save() only writes once
+            this many objects changed since the last write, None to disable
+            commit_delay (float): group commit, the saves are written
+            once this many seconds passed since the first save not
+            written, by a timer if no save() comes, None to disable
+            background (bool): save() hands the write to a thread
+            and returns, flush() waits for the writes
+            queue_size (int): the number of background writes
+            that can wait before save() waits too
+            shared (bool): lock file.json against the other processes
+            using it, and merge their saves into this storage
+            format (str): "json" to save to file.json, or "binary"
+            to save to file.hbnb, see models.engine.binary_format
+            compression (str): the codec of the files written, "none",
+            "gzip", "zlib" or "lzma", see models.engine.compression
+            compression_level (int): from 0 (fastest) to 9 (smallest),
+            None for the default of the codec
+            mapped (bool): reload() maps file.json in memory and
+            only decodes an object the first time it is used,
+            see models.engine.mapped_file
+            workers (int): reload() builds the models and save()
+            dumps them in this many processes, None to do it
+            in this one, see models.engine.parallel
+        Raises:
+            ValueError: if an option, a durability or a compression
+            is unknown,
+            if both the journal and the shards are on, or if shared
+            is on with the journal, the shards or the background writes,
+            or if the format is unknown or binary with the journal,
+            the shards or shared, or if mapped is on with the shards,
+            the binary format or a compression, or if workers is not
+            a positive int or is set with lazy, mapped or the binary format
+        """
+        for name in options:
+            if name not in FileStorage.__options:
+                raise ValueError(f"unknown storage option: {name}")
+        if "durability" in options:
+            check_durability(options["durability"])
+        merged = {**FileStorage.__options, **options}
+        check_compression(merged["compression"], merged["compression_level"])
+        if merged["journal"] and merged["shards"] is not None:
+            raise ValueError("the journal does not support sharded files")
+        if merged["shared"] and (merged["journal"] or merged["background"]
+                                 or merged["shards"] is not None):
+            raise ValueError("a shared file.json does not support the "
+                             "journal, the shards or background writes")
+        if merged["format"] not in ("json", "binary"):
+            raise ValueError(f"unknown storage format: {merged['format']}")
+        if merged["format"] == "binary" and (
+                merged["journal"] or merged["shared"]
+                or merged["shards"] is not None):
+            raise ValueError("the binary format does not support "
+                             "the journal, the shards or shared")
+        if merged["mapped"] and (merged["shards"] is not None or
+                                 merged["format"] != "json" or
+                                 merged["compression"] != "none"):
+            raise ValueError("a mapped file.json does not support the "
+                             "shards, the binary format or a compression")
+        workers = merged["workers"]
+        if workers is not None and (type(workers) is not int or workers < 1):
+            raise ValueError(f"workers must be a positive int: {workers}")
+        if workers is not None and (merged["lazy"] or merged["mapped"] or
+                                    merged["format"] != "json"):
+            raise ValueError("the workers do not support lazy, mapped "
+                             "or the binary format")
+        FileStorage.__options.update(options)
+
+    def all(self, cls=None):
+        """This method returns all objects in storage
+
+        Args:
+            cls (type or str): only return the objects of this class
+        Returns:
+            dict: the objects, key -> object
+        """
+        self.__refresh()
+        if cls is None:
+            return FileStorage.__objects
+        name = class_name(cls)
+        FileStorage.__objects.materialize(name)
+        return dict(FileStorage.__by_class.get(name, {}))
+
+    def count(self, cls=None):
+        """This method returns the number of objects in storage
+
+        Args:
+            cls (type or str): only count the objects of this class
+        """
+        self.__refresh()
+        if cls is None:
+            return len(FileStorage.__objects)
+        name = class_name(cls)
+        return len(FileStorage.__by_class.get(name, {})) + \
+            FileStorage.__objects.count_raw(name)
+
+    def children(self, parent_cls, parent_id, cls):
+        """This method returns the objects of a class
+        that point to a parent object, like the cities of a state
+
+        Args:
+            parent_cls (type or str): the class of the parent
+            parent_id (str): the id of the parent
+            cls (type or str): the class of the children
+        Returns:
+            dict: the children, key -> object
+        Raises:
+            ValueError: if cls has no foreign key to parent_cls
+        """
+        parent_name = class_name(parent_cls)
+        name = class_name(cls)
+        fields = [field for field, parent in
+                  FOREIGN_KEYS.get(name, {}).items() if parent == parent_name]
+        if not fields:
+            raise ValueError(f"{name} has no foreign key to {parent_name}")
+        self.__refresh()
+        FileStorage.__objects.materialize(name)
+        result = {}
+        if not isinstance(parent_id, INDEXED_TYPES):
+            return result
+        for field in fields:
+            index = FileStorage.__indexes.get((name, field), {})
+            result.update(index.get(parent_id, {}))
+        return result
+
+    def get_by(self, cls, **fields):
+        """This method finds an object by a unique field,
+        like storage.get_by(User, email="airbnb@mail.com")
+
+        Args:
+            cls (type or str): the class of the object
+            fields: one unique field and its value
+        Returns:
+            the object, or None if no object has this value
+        Raises:
+            ValueError: if the field is not a unique field of cls
+        """
+        name = class_name(cls)
+        if len(fields) != 1:
+            raise ValueError("get_by takes exactly one field")
+        (field, value), = fields.items()
+        if field not in UNIQUE_KEYS.get(name, ()):
+            raise ValueError(f"{name}.{field} is not a unique field")
+        self.__refresh()
+        if not isinstance(value, INDEXED_TYPES):
+            return None
+        FileStorage.__objects.materialize(name)
+        same = FileStorage.__indexes.get((name, field), {}).get(value, {})
+        return next(iter(same.values()), None)
+
+    def check(self, obj, name, value):
+        """This method refuses a value of a unique field
+        already used by another object of the same class
 
-    def all(self):
-        """This method returns all objects in storage"""
-        return FileStorage.__objects
+        It only checks objects in storage when the unique option is on,
+        empty values (the class defaults) are never checked
+
+        Args:
+            obj: the object about to be modified
+            name (str): the attribute about to be set
+            value: the new value
+        Raises:
+            ValueError: if another object already uses the value
+        """
+        cls_name = obj.__class__.__name__
+        key = f"{cls_name}.{getattr(obj, 'id', None)}"
+        if FileStorage.__undo is not None and \
+                dict.get(FileStorage.__objects, key) is obj:
+            self.__remember(key)
+        if not FileStorage.__options["unique"] or value == "" or \
+                FileStorage.__restoring or \
+                name not in UNIQUE_KEYS.get(cls_name, ()):
+            return
+        # models being built are checked when they are added by new()
+        if dict.get(FileStorage.__objects, key) is obj:
+            self.__check_unique(key, name, value)
 
     def new(self, obj):
         """This method adds a new object to storage"""
+        name = obj.__class__.__name__
+        key = f"{name}.{obj.id}"
+        # the commit_delay timer may be saving from its own thread
+        with FileStorage.__saving:
+            if FileStorage.__options["unique"]:
+                for field in UNIQUE_KEYS.get(name, ()):
+                    value = getattr(obj, field, "")
+                    if value != "":
+                        self.__check_unique(key, field, value)
+            if FileStorage.__undo is not None:
+                self.__remember(key)
+            self.__add(key, obj)
+            FileStorage.__pending[key] = obj
+            FileStorage.__cache.pop(key, None)
+
+    def touch(self, obj):
+        """This method marks an object of the storage as modified
+        so the next save() records its new state
+
+        BaseModel calls it on every attribute assignment, changes made
+        in place (like appending to Place.amenity_ids) must call it
+        """
+        key = f"{obj.__class__.__name__}.{getattr(obj, 'id', None)}"
+        if dict.get(FileStorage.__objects, key) is not obj:
+            return
+        with FileStorage.__saving:
+            FileStorage.__pending[key] = obj
+            FileStorage.__cache.pop(key, None)
+            if obj.__class__.__name__ in INDEXED_FIELDS:
+                self.__link(key, obj)
+
+    def delete(self, obj=None):
+        """This method deletes an object from storage"""
+        if obj is None:
+            return
         key = f"{obj.__class__.__name__}.{obj.id}"
+        with FileStorage.__saving:
+            if FileStorage.__undo is not None:
+                self.__remember(key)
+            if self.__remove(key) is not None:
+                FileStorage.__pending[key] = None
+                FileStorage.__cache.pop(key, None)
+
+    def clear(self):
+        """This method forgets every object in memory
+        without touching the files, reload() brings them back"""
+        with FileStorage.__saving:
+            self.__drain()
+            FileStorage.__objects.clear()
+            FileStorage.__by_class.clear()
+            FileStorage.__indexes.clear()
+            FileStorage.__links.clear()
+            FileStorage.__pending.clear()
+            FileStorage.__cache.clear()
+            FileStorage.__loaded = set()
+
+    def __check_unique(self, key, field, value):
+        """This method raises ValueError if an object other than key
+        has this value of a unique field"""
+        if not isinstance(value, INDEXED_TYPES):
+            return
+        name = key.split(".")[0]
+        FileStorage.__objects.materialize(name)
+        same = FileStorage.__indexes.get((name, field), {}).get(value, {})
+        if any(other != key for other in same):
+            raise ValueError(f"{field} already exists")
+
+    def __add(self, key, obj):
+        """This method puts an object in storage and in its indexes"""
         FileStorage.__objects[key] = obj
+        name = obj.__class__.__name__
+        FileStorage.__by_class.setdefault(name, {})[key] = obj
+        if name in INDEXED_FIELDS:
+            self.__link(key, obj)
+
+    def __remove(self, key):
+        """This method takes an object out of storage and of its indexes
+
+        Returns:
+            the removed object (its saved dict if it was never built),
+            or None if the key is not in storage
+        """
+        obj_dict = FileStorage.__objects.drop_raw(key)
+        obj = FileStorage.__objects.pop(key, None)
+        FileStorage.__by_class.get(key.split(".")[0], {}).pop(key, None)
+        self.__unlink(key)
+        return obj if obj is not None else obj_dict
+
+    def __stash(self, key, obj_dict):
+        """This method keeps a saved dict in storage
+        to build its model the first time it is used"""
+        if key in FileStorage.__objects:
+            self.__remove(key)
+        FileStorage.__objects.put_raw(key, obj_dict)
+
+    def __build(self, key, obj_dict):
+        """This method builds the model of a saved dict and stores it"""
+        obj = self.__model(obj_dict)
+        self.__add(key, obj)
+        return obj
+
+    def __model(self, obj_dict):
+        """This method makes the model of a saved dict"""
+        return FileStorage.__classes[obj_dict["__class__"]](**obj_dict)
+
+    def __link(self, key, obj):
+        """This method moves an object to the right values
+        in the field indexes"""
+        name = obj.__class__.__name__
+        links = FileStorage.__links.setdefault(key, {})
+        for field in INDEXED_FIELDS[name]:
+            value = getattr(obj, field, "")
+            indexed = isinstance(value, INDEXED_TYPES)
+            index = FileStorage.__indexes.setdefault((name, field), {})
+            old = links.get(field)
+            if indexed and old == value and \
+                    index.get(value, {}).get(key) is obj:
+                continue
+            if old is not None:
+                same = index.get(old, {})
+                same.pop(key, None)
+                if not same:
+                    index.pop(old, None)
+            if not indexed:
+                links.pop(field, None)
+                continue
+            index.setdefault(value, {})[key] = obj
+            links[field] = value
+
+    def __unlink(self, key):
+        """This method takes an object out of the field indexes"""
+        links = FileStorage.__links.pop(key, None)
+        if not links:
+            return
+        name = key.split(".")[0]
+        for field, value in links.items():
+            index = FileStorage.__indexes.get((name, field), {})
+            same = index.get(value, {})
+            same.pop(key, None)
+            if not same:
+                index.pop(value, None)
+
+    @staticmethod
+    def __shard(key):
+        """This method returns the name of the shard file of a key"""
+        name, obj_id = key.split(".", 1)
+        shards = FileStorage.__options["shards"]
+        if shards == 1:
+            return f"{name}.json"
+        # crc32 and not hash(), which changes from one run to the next
+        return f"{name}.{crc32(obj_id.encode()) % shards}.json"
+
+    @contextmanager
+    def batch(self):
+        """This method defers the saves of a block of code
+        to a single write at the end of the block, like:
+
+            with storage.batch():
+                for row in rows:
+                    User(**row).save()
+
+        Blocks can be nested, the write happens when the outermost ends
+        """
+        FileStorage.__batches += 1
+        try:
+            yield self
+        finally:
+            FileStorage.__batches -= 1
+            if FileStorage.__batches == 0:
+                self.flush()
+
+    @contextmanager
+    def transaction(self):
+        """This method runs a block of code as a transaction, like:
+
+            with storage.transaction():
+                place = Place()
+                place.name = "Home"
+                review = Review()
+                review.place_id = place.id
+
+        The objects created, modified or deleted in the block are written
+        together in a single write when it ends. If the block raises,
+        the objects are restored as they were before the block and
+        nothing is written. Changes made in place (like appending
+        to Place.amenity_ids) are not restored.
+        A transaction inside another one is part of the outer one.
+        """
+        if FileStorage.__undo is not None:
+            yield self
+            return
+        FileStorage.__undo = {}
+        pending = dict(FileStorage.__pending)
+        deferred = FileStorage.__deferred
+        FileStorage.__batches += 1
+        try:
+            yield self
+        except BaseException:
+            undo, FileStorage.__undo = FileStorage.__undo, None
+            self.__rollback(undo, pending)
+            FileStorage.__deferred = deferred
+            raise
+        else:
+            FileStorage.__undo = None
+            if FileStorage.__pending and FileStorage.__deferred is None:
+                FileStorage.__deferred = monotonic()
+        finally:
+            FileStorage.__batches -= 1
+        if FileStorage.__batches == 0:
+            self.flush()
+
+    def __remember(self, key):
+        """This method records the state of an object before
+        its first change in the running transaction"""
+        undo = FileStorage.__undo
+        if key in undo:
+            return
+        obj = dict.get(FileStorage.__objects, key)
+        if obj is not None:
+            undo[key] = (obj, self.__attributes(obj))
+            return
+        # a saved dict not built yet, or nothing
+        group = FileStorage.__objects.raw.get(key.split(".")[0], {})
+        undo[key] = (None, group.get(key))
+
+    @staticmethod
+    def __attributes(obj):
+        """This method returns the attributes set on a model"""
+        return dict(vars(obj))
+
+    def __rollback(self, undo, pending):
+        """This method puts the objects back in the state
+        recorded by the transaction
+
+        Args:
+            undo (dict): the states recorded by __remember
+            pending (dict): the pending changes before the transaction
+        """
+        FileStorage.__restoring = True
+        try:
+            for key, (obj, attrs) in undo.items():
+                current = dict.get(FileStorage.__objects, key)
+                if obj is None or current is not obj:
+                    self.__remove(key)
+                if obj is None:
+                    if attrs is not None:
+                        FileStorage.__objects.put_raw(key, attrs)
+                    continue
+                now = self.__attributes(obj)
+                for name in now:
+                    if name not in attrs:
+                        delattr(obj, name)
+                for name, value in attrs.items():
+                    if name not in now or now[name] is not value:
+                        setattr(obj, name, value)
+                if current is not obj:
+                    self.__add(key, obj)
+                elif obj.__class__.__name__ in INDEXED_FIELDS:
+                    self.__link(key, obj)
+                FileStorage.__cache.pop(key, None)
+        finally:
+            FileStorage.__restoring = False
+        FileStorage.__pending.clear()
+        FileStorage.__pending.update(pending)
+
+    def flush(self):
+        """This method writes the saves deferred by batch()
+        or by the group commit, if any, and waits for the
+        background writes
+
+        Raises:
+            Exception: the error of a failed background write
+        """
+        with FileStorage.__saving:
+            if FileStorage.__deferred is not None:
+                self.__save()
+            self.__drain()
+
+    def __drain(self):
+        """This method waits for the background writes"""
+        if FileStorage.__writer is not None:
+            FileStorage.__writer.join()
+            self.__collect()
+
+    def __defer(self):
+        """This method decides if a save() waits for the next write
+
+        Returns:
+            bool: True if the save was deferred
+        """
+        if FileStorage.__deferred is None:
+            FileStorage.__deferred = monotonic()
+        if FileStorage.__batches:
+            return True
+        size = FileStorage.__options["commit_size"]
+        delay = FileStorage.__options["commit_delay"]
+        if size is None and delay is None:
+            return False
+        if size is not None and len(FileStorage.__pending) >= size:
+            return False
+        if delay is not None:
+            waited = monotonic() - FileStorage.__deferred
+            if waited >= delay:
+                return False
+            if FileStorage.__timer is None:
+                # the saves are written after the delay
+                # even if no other save() comes
+                FileStorage.__timer = Timer(delay - waited, self.__commit)
+                FileStorage.__timer.daemon = True
+                FileStorage.__timer.start()
+        return True
+
+    def __commit(self):
+        """This method writes the saves deferred by commit_delay,
+        called by the timer once the delay passed"""
+        with FileStorage.__saving:
+            FileStorage.__timer = None
+            # a batch running now writes them when it ends
+            if FileStorage.__deferred is not None and \
+                    not FileStorage.__batches:
+                self.__save()
 
     def save(self):
-        """This method saves the objects in storage to a file"""
-        with open(FileStorage.__file_path, "w") as file:
-            obj_dict = {key: obj.to_dict() for key, obj in
-                        FileStorage.__objects.items()}
-            dump(obj_dict, file)
-
-    def reload(self):
-        """This method reloads the objects from the file to storage"""
+        """This method saves the objects in storage to a file
+
+        In journal mode only the pending changes are appended
+        to the journal, otherwise file.json is rewritten
+        reusing the json of the objects not modified since the last save.
+        Inside batch() or with the group commit options the write
+        is deferred, see flush()
+        """
+        with FileStorage.__saving:
+            if not self.__defer():
+                self.__save()
+
+    def __save(self):
+        """This method writes the objects in storage to the files,
+        or hands the write to the background writer"""
+        FileStorage.__deferred = None
+        if FileStorage.__timer is not None:
+            FileStorage.__timer.cancel()
+            FileStorage.__timer = None
+        self.__collect()
+        FileStorage.__job_id += 1
+        job_id = FileStorage.__job_id
+        if FileStorage.__options["shared"]:
+            self.__save_shared(job_id)
+            return
+        if FileStorage.__options["shards"] is not None:
+            write = self.__save_shards(job_id)
+        elif FileStorage.__options["journal"]:
+            write = self.__save_journal()
+        elif FileStorage.__options["format"] == "binary":
+            write = self.__save_binary()
+        else:
+            write = self.__save_snapshot(job_id)
+        FileStorage.__pending.clear()
+        if not FileStorage.__options["background"]:
+            self.__merge(job_id, write())
+            return
+        if FileStorage.__writer is None:
+            FileStorage.__writer = Writer(
+                FileStorage.__options["queue_size"])
+        FileStorage.__writer.put(job_id, write)
+
+    def __save_shared(self, job_id):
+        """This method rewrites file.json holding the lock of the processes
+        sharing it, after merging the saves they made since
+        this process last read or wrote it"""
+        with FileLock(FileStorage.__lock_path).hold() as lock:
+            generation = lock.generation()
+            if generation != FileStorage.__generation:
+                self.__merge_file(generation)
+            write = self.__save_snapshot(job_id)
+            FileStorage.__pending.clear()
+            self.__merge(job_id, write())
+            FileStorage.__generation = lock.bump()
+
+    def __hold(self, shared):
+        """This method returns the lock of file.json to hold
+        with the shared option, or a lock that does nothing"""
+        if FileStorage.__options["shared"]:
+            return FileLock(FileStorage.__lock_path).hold(shared)
+        return nullcontext()
+
+    def __refresh(self):
+        """This method merges file.json into the storage
+        if another process wrote it since this one last read it"""
+        if not FileStorage.__options["shared"] or \
+                read_generation(FileStorage.__lock_path) == \
+                FileStorage.__generation:
+            return
+        with FileLock(FileStorage.__lock_path).hold(shared=True) as lock:
+            self.__merge_file(lock.generation())
+
+    def __merge_file(self, generation):
+        """This method updates the storage with file.json, written
+        by another process: the objects it changed are read again
+        and the objects it no longer has are removed, except the ones
+        this process modified and did not save yet
+
+        Args:
+            generation (int): the generation of file.json
+        """
+        put = self.__put()
+        objects = FileStorage.__objects
+        pending = FileStorage.__pending
+        saved = set()
         try:
-            from models.base_model import BaseModel
-            from models.user import User
-            from models.state import State
-            from models.city import City
-            from models.place import Place
-            from models.amenity import Amenity
-            from models.review import Review
+            with open_text(FileStorage.__file_path) as file:
+                for key, obj_dict in iter_items(file):
+                    saved.add(key)
+                    if key in pending:
+                        continue
+                    current = dict.get(objects, key)
+                    if current is not None:
+                        if current.to_dict() == obj_dict:
+                            continue
+                    elif obj_dict == objects.raw.get(
+                            key.split(".")[0], {}).get(key):
+                        continue
+                    self.__remove(key)
+                    FileStorage.__cache.pop(key, None)
+                    put(key, obj_dict)
+        except FileNotFoundError:
+            pass
+        gone = [key for key, obj in objects.loaded_items()
+                if key not in saved and key not in pending]
+        gone += [key for key, obj_dict in objects.raw_items()
+                 if key not in saved and key not in pending]
+        for key in gone:
+            self.__remove(key)
+            FileStorage.__cache.pop(key, None)
+        FileStorage.__generation = generation
+
+    def __entry(self, key, obj, job_id, copy=True):
+        """This method returns the json of an object not modified
+        since it was last written, or a copy of its dict to dump
+
+        Args:
+            copy (bool): False to return the model itself, to dump it
+            in a forked process that keeps its state at the fork
+        """
+        obj_json = FileStorage.__cache.get(key)
+        if obj_json is not None:
+            return key, obj_json
+        if isinstance(obj, str):
+            # the json of a saved dict still in the mapped file.json
+            return key, obj
+        FileStorage.__dumping[key] = job_id
+        if isinstance(obj, dict):
+            # the saved dict of a model not built yet is never modified
+            return key, obj
+        return key, obj.to_dict() if copy else obj
+
+    @staticmethod
+    def __serialize(entries):
+        """This method returns the json object parts of the entries
+        and the json of the dicts (or models) dumped, key -> json"""
+        parts = []
+        dumped = {}
+        for key, value in entries:
+            if not isinstance(value, str):
+                if not isinstance(value, dict):
+                    value = value.to_dict()
+                value = dumped[key] = dumps(value)
+            parts.append(f"{dumps(key)}: {value}")
+        return parts, dumped
+
+    def __merge(self, job_id, dumped):
+        """This method keeps the json dumped by a write for the next saves,
+        unless the object was modified or dumped again since"""
+        dumping = FileStorage.__dumping
+        for key, obj_json in dumped.items():
+            if dumping.get(key) == job_id:
+                del dumping[key]
+                if key not in FileStorage.__pending:
+                    FileStorage.__cache[key] = obj_json
+
+    def __collect(self):
+        """This method merges the results of the background writes"""
+        if FileStorage.__writer is not None:
+            for job_id, dumped in FileStorage.__writer.results():
+                self.__merge(job_id, dumped)
+
+    def __save_journal(self):
+        """This method returns the write that appends
+        the pending changes to the journal"""
+        records = []
+        for key, obj in FileStorage.__pending.items():
+            if obj is None:
+                records.append(["del", key])
+            else:
+                records.append(["put", key, obj.to_dict()])
+        durability = FileStorage.__options["durability"]
+        interval = FileStorage.__options["group_interval"]
+
+        def write():
+            with FileStorage.__lock:
+                Journal(FileStorage.__journal_path).append(
+                    records, durability, interval)
+            if self.__should_compact():
+                self.compact()
+            return {}
+        return write
+
+    def __save_snapshot(self, job_id):
+        """This method returns the write that rewrites file.json,
+        reusing the json of the objects not modified since the last save"""
+        options = FileStorage.__options
+        workers = options["workers"]
+        entries = [self.__entry(key, obj, job_id, workers is None)
+                   for key, obj in FileStorage.__objects.loaded_items()]
+        # the models never built are written back from their saved dict
+        entries += [self.__entry(key, obj_dict, job_id) for key, obj_dict
+                    in FileStorage.__objects.raw_json_items()]
+        # the models are dumped as they are now, even if the write
+        # runs later in the background
+        results = None if workers is None else \
+            serialize(entries, self.__serialize, workers)
+        # the workers split file.json at the offsets of the index
+        indexed = options["compression"] == "none" and \
+            (options["mapped"] or workers is not None)
+
+        def write():
+            # a running compaction would replace the file written here
+            self.wait_compaction()
+            parts = []
+            dumped = {}
+
+            def chunks():
+                for chunk_parts, chunk_dumped in \
+                        results or [self.__serialize(entries)]:
+                    parts.extend(chunk_parts)
+                    dumped.update(chunk_dumped)
+                    yield chunk_parts
+
+            # the parts are written as the processes give them
+            self.__write(FileStorage.__file_path, chunks())
+            if indexed:
+                write_parts_index(FileStorage.__file_path,
+                                  [key for key, value in entries], parts)
+            # the snapshot holds every change now, replaying them is wrong
+            self.__clear_journal()
+            return dumped
+        return write
+
+    def __save_binary(self):
+        """This method returns the write that rewrites file.hbnb"""
+        objects = FileStorage.__objects
+        entries = [(key, obj.to_dict()) for key, obj
+                   in objects.loaded_items()]
+        entries += list(objects.raw_items())
+
+        def write():
+            options = FileStorage.__options
+            write_atomic(FileStorage.__binary_path,
+                         binary_format.encode(entries),
+                         options["durability"], options["group_interval"],
+                         options["compression"],
+                         options["compression_level"])
+            self.__clear_journal()
+            return {}
+        return write
+
+    def __save_shards(self, job_id):
+        """This method returns the write that rewrites the shard files
+        of the objects created, modified or deleted since the last save"""
+        loaded = FileStorage.__loaded
+        dirty = FileStorage.__dirty
+        if not os.path.isdir(FileStorage.__shard_path):
+            # the first sharded save moves all of file.json to the shards
+            if loaded is not None:
+                self.__read(None, skip=loaded)
+                FileStorage.__loaded = loaded = None
+            objects = FileStorage.__objects
+            dirty.update(self.__shard(key) for key, obj in
+                         objects.loaded_items())
+            dirty.update(self.__shard(key) for key, obj in
+                         objects.raw_items())
+        dirty.update(self.__shard(key) for key in FileStorage.__pending)
+        names = {shard.split(".")[0] for shard in dirty}
+        if loaded is not None and names - loaded:
+            # the objects of a shard not read yet must be written back
+            self.__read(names - loaded)
+            loaded |= names
+        shards = {shard: [] for shard in dirty}
+        objects = FileStorage.__objects
+        for name in names:
+            for items in (FileStorage.__by_class.get(name, {}).items(),
+                          objects.raw.get(name, {}).items()):
+                for key, obj in items:
+                    entries = shards.get(self.__shard(key))
+                    if entries is not None:
+                        entries.append(self.__entry(key, obj, job_id))
+        dirty.clear()
+
+        def write():
+            os.makedirs(FileStorage.__shard_path, exist_ok=True)
+            dumped = {}
+            for shard, entries in shards.items():
+                path = os.path.join(FileStorage.__shard_path, shard)
+                if not entries:
+                    if os.path.exists(path):
+                        os.remove(path)
+                    continue
+                parts, shard_dumped = self.__serialize(entries)
+                self.__write(path, [parts])
+                dumped.update(shard_dumped)
+            self.__clear_journal()
+            self.__drop_snapshot()
+            return dumped
+        return write
+
+    @staticmethod
+    def __drop_snapshot():
+        """This method removes file.json and its index once the first
+        sharded save moved their objects to the shards, the next saves
+        only write the shards so it would be stale"""
+        path = FileStorage.__file_path
+        if not os.path.exists(path):
+            return
+        if FileStorage.__options["durability"] in ("fsync", "group"):
+            # the shards must outlive a crash before file.json goes
+            fsync_path(os.path.dirname(os.path.abspath(
+                FileStorage.__shard_path)))
+        for stale in (path, f"{path}.idx"):
+            if os.path.exists(stale):
+                os.remove(stale)
+
+    @staticmethod
+    def __clear_journal():
+        """This method removes the journals once a save holds their changes"""
+        journal = Journal(FileStorage.__journal_path)
+        journal.frozen().clear()
+        journal.clear()
+
+    def __write(self, path, groups):
+        """This method replaces a file with the json object of the parts
+        of groups so a crash in the middle never leaves it half written
+
+        Args:
+            path (str): the file to write
+            groups: lists of json object parts, written in order
+            as they come
+        """
+        def chunks():
+            # a few parts at a time, the whole text is never built
+            yield "{"
+            first = True
+            for parts in groups:
+                for start in range(0, len(parts), 1024):
+                    if not first:
+                        yield ", "
+                    first = False
+                    yield ", ".join(parts[start:start + 1024])
+            yield "}"
+
+        options = FileStorage.__options
+        write_atomic(path, chunks(), options["durability"],
+                     options["group_interval"], options["compression"],
+                     options["compression_level"])
+
+    def compact(self, wait=False):
+        """This method folds the journal into a new file.json
+
+        The journal is moved aside and new changes go to a fresh one,
+        then a background thread writes the new file.json so console
+        commands are not blocked while it runs
+
+        Args:
+            wait (bool): block until the compaction is done
+        """
+        with FileStorage.__lock:
+            running = FileStorage.__compactor
+            if running is None or not running.is_alive():
+                frozen = Journal(FileStorage.__journal_path).rotate()
+                if frozen is not None:
+                    options = FileStorage.__options
+                    running = Thread(target=compact,
+                                     args=(FileStorage.__file_path, frozen,
+                                           options["compression"],
+                                           options["compression_level"]))
+                    running.start()
+                    FileStorage.__compactor = running
+        if wait:
+            self.wait_compaction()
+
+    def wait_compaction(self):
+        """This method blocks until the running compaction is done"""
+        running = FileStorage.__compactor
+        if running is not None:
+            running.join()
+
+    def __should_compact(self):
+        """This method checks the journal against the compaction thresholds"""
+        size = Journal(FileStorage.__journal_path).size()
+        limit = FileStorage.__options["compact_size"]
+        if limit is not None and size >= limit:
+            return True
+        ratio = FileStorage.__options["compact_ratio"]
+        if ratio is None:
+            return False
+        try:
+            snapshot_size = os.path.getsize(FileStorage.__file_path)
+        except FileNotFoundError:
+            return False
+        return snapshot_size > 0 and size >= ratio * snapshot_size
+
+    def reload(self, only=None):
+        """This method reloads the objects from the file to storage
+        and replays the journal on top of them
+
+        In lazy mode the saved dicts are kept and the models
+        are only built the first time they are used
+
+        Args:
+            only (list): only read the objects of these classes
+            (classes or class names), with the shards option only
+        Raises:
+            ValueError: if only is given without the shards option
+        """
+        sharded = FileStorage.__options["shards"] is not None
+        if only is not None and not sharded:
+            raise ValueError("only sharded files can be read by class")
+        names = None if only is None else \
+            {class_name(cls) for cls in only}
+        with FileStorage.__saving:
+            self.__drain()
+            self.wait_compaction()
+            FileStorage.__cache.clear()
+            FileStorage.__objects.build = self.__build
+            put = self.__put()
             try:
-                with open(FileStorage.__file_path, "r") as file:
-                    obj_dict = load(file)
-                    for key, obj in obj_dict.items():
-                        cls_name = obj["__class__"]
-                        cls_obj = eval(cls_name)(**obj)
-                        FileStorage.__objects[key] = cls_obj
-            except FileNotFoundError:
+                from models.base_model import classes
+                FileStorage.__classes = classes
+                if sharded:
+                    self.__read(names)
+                else:
+                    with self.__hold(shared=True) as lock:
+                        try:
+                            # the first binary save moves file.json
+                            # to file.hbnb
+                            path = FileStorage.__binary_path
+                            if FileStorage.__options["format"] == \
+                                    "binary" and os.path.exists(path):
+                                for key, obj in binary_format.read(path):
+                                    put(key, obj)
+                            else:
+                                self.__read_snapshot(put)
+                        except FileNotFoundError:
+                            pass
+                        if lock is not None:
+                            FileStorage.__generation = lock.generation()
+                # a journal left by an unfinished compaction is older
+                journal = Journal(FileStorage.__journal_path)
+                for log in (journal.frozen(), journal):
+                    for op, key, obj in log.replay():
+                        if names is not None and \
+                                key.split(".")[0] not in names:
+                            continue
+                        if op == "put":
+                            put(key, obj)
+                        else:
+                            self.__remove(key)
+                        if sharded:
+                            FileStorage.__dirty.add(self.__shard(key))
+            except ImportError:
                 pass
-        except ImportError:
-            pass
+            if names is None:
+                FileStorage.__loaded = None
+            elif FileStorage.__loaded is not None:
+                FileStorage.__loaded |= names
+
+    def __read_snapshot(self, put):
+        """This method reads the objects of file.json: mapped,
+        built by the processes of the workers option, or one at a time
+
+        Args:
+            put (function): stores a saved dict, see __put()
+        Raises:
+            FileNotFoundError: if file.json does not exist
+        """
+        options = FileStorage.__options
+        # a compressed file.json cannot be mapped or split
+        plain = codec_of(FileStorage.__file_path) == "none"
+        if plain and options["mapped"]:
+            mapped = MappedFile(FileStorage.__file_path)
+            objects = FileStorage.__objects
+            for key in mapped.keys:
+                if key in objects:
+                    self.__remove(key)
+            objects.put_mapped(mapped)
+        elif plain and options["workers"] and can_fork():
+            mapped = MappedFile(FileStorage.__file_path)
+            for key, obj in read_mapped(mapped, options["workers"],
+                                        FileStorage.__classes):
+                self.__add(key, obj)
+        else:
+            with open_text(FileStorage.__file_path) as file:
+                # one object at a time, not the whole file
+                for key, obj in iter_items(file):
+                    put(key, obj)
+
+    def __put(self):
+        """This method returns the function that stores a saved dict,
+        as a model or as the dict itself in lazy mode"""
+        if FileStorage.__options["lazy"]:
+            return self.__stash
+        return self.__build
+
+    def __read(self, names, skip=()):
+        """This method reads the objects of some classes from the shards,
+        or from file.json before the first sharded save
+
+        The files that hold objects of another shard (like after
+        a change of the shards option) are rewritten on the next save
+
+        Args:
+            names (set): the class names to read, None for every class
+            skip (set): the class names not to read
+        """
+        put = self.__put()
+        shard_path = FileStorage.__shard_path
+        if os.path.isdir(shard_path):
+            paths = [os.path.join(shard_path, file_name)
+                     for file_name in sorted(os.listdir(shard_path))
+                     if file_name.endswith(".json")]
+        else:
+            paths = [FileStorage.__file_path]
+
+        def wanted(name):
+            return (names is None or name in names) and name not in skip
+
+        paths = [path for path in paths if path == FileStorage.__file_path
+                 or wanted(os.path.basename(path).split(".")[0])]
+        workers = FileStorage.__options["workers"]
+        if workers and can_fork():
+            # the processes give models, not saved dicts
+            put = self.__add
+            files = read_files(paths, workers, FileStorage.__classes)
+        else:
+            files = map(iter_file, paths)
+        for path, items in zip(paths, files):
+            file_name = os.path.basename(path)
+            is_shard = path != FileStorage.__file_path
+            for key, obj in items:
+                if not wanted(key.split(".")[0]):
+                    continue
+                put(key, obj)
+                shard = self.__shard(key)
+                if shard != file_name:
+                    FileStorage.__dirty.add(shard)
+                    if is_shard:
+                        FileStorage.__dirty.add(file_name)
+
+
+# the saves deferred by the group commit are written when the program ends
+atexit.register(FileStorage().flush)
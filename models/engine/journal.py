@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+"""This module contains the journal used by the file storage
+to record changes without rewriting the whole file.json"""
+import os
+from json import dumps, load, loads
+from models.engine.compression import open_text
+from models.engine.durable import sync_file, write_atomic
+
+
+class Journal:
+    """This class is an append-only log of storage changes
+
+    Every line of the log is one compact json record:
+        ["put", key, obj_dict] when an object is created or updated
+        ["del", key] when an object is destroyed
+        ["batch", [record, ...]] for the records of one save,
+        which are replayed all together or not at all
+
+    Attributes:
+        path (str): the path to the log file
+    """
+
+    def __init__(self, path: str) -> None:
+        """This method initializes the journal
+
+        Args:
+            path (str): the path to the log file
+        """
+        self.path = path
+
+    def append(self, records: list, durability: str = "flush",
+               interval: float = 1.0) -> None:
+        """This method appends records to the end of the log
+
+        Args:
+            records (list): the records to write, one per line
+            durability (str): the durability level, see models.engine.durable
+            interval (float): the seconds between two group syncs
+        """
+        if not records:
+            return
+        if len(records) > 1:
+            # one line is written whole or cut, so a crash
+            # never leaves a part of a save in the log
+            records = [["batch", records]]
+        lines = "".join(dumps(record, separators=(",", ":")) + "\n"
+                        for record in records)
+        with open(self.path, "a") as file:
+            file.write(lines)
+            sync_file(file, self.path, durability, interval)
+
+    def replay(self):
+        """This method yields the records of the log in order
+
+        A last line cut by a crash in the middle of a write
+        is not valid json, so it is skipped instead of failing the reload
+
+        Yields:
+            tuple: the operation, the key and the object dict (or None)
+        """
+        try:
+            with open(self.path, "r") as file:
+                for line in file:
+                    try:
+                        record = loads(line)
+                    except ValueError:
+                        continue
+                    if record[0] == "batch":
+                        records = record[1]
+                    else:
+                        records = [record]
+                    for record in records:
+                        if record[0] == "put":
+                            yield record[0], record[1], record[2]
+                        else:
+                            yield record[0], record[1], None
+        except FileNotFoundError:
+            return
+
+    def size(self) -> int:
+        """This method returns the size of the log in bytes"""
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def frozen(self):
+        """This method returns the log moved aside by rotate()"""
+        return Journal(f"{self.path}.compacting")
+
+    def rotate(self):
+        """This method moves the log aside so new records
+        go to a fresh log while the old one is being compacted
+
+        Returns:
+            Journal: the frozen log, or None if there is nothing to compact
+        """
+        frozen = self.frozen()
+        if os.path.exists(frozen.path):
+            # a previous compaction did not finish, fold that one first
+            return frozen
+        if self.size() == 0:
+            return None
+        os.replace(self.path, frozen.path)
+        return frozen
+
+    def clear(self) -> None:
+        """This method removes the log once its records are in the snapshot"""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+def compact(snapshot_path: str, journal: Journal,
+            compression: str = "none", level=None) -> None:
+    """This function folds a journal into a new snapshot
+
+    The new snapshot is written to a temporary file and swapped in
+    with an atomic rename, so a crash at any point leaves either the
+    old snapshot and the journal or the new snapshot on disk.
+    Replaying the journal over the new snapshot is harmless
+    because every record holds the whole state of its object.
+
+    Args:
+        snapshot_path (str): the path to file.json
+        journal (Journal): the frozen journal to fold
+        compression (str): the codec of the new snapshot,
+        see models.engine.compression
+        level (int): the compression level, None for the default
+    """
+    try:
+        with open_text(snapshot_path) as file:
+            obj_dict = load(file)
+    except FileNotFoundError:
+        obj_dict = {}
+    for op, key, obj in journal.replay():
+        if op == "put":
+            obj_dict[key] = obj
+        else:
+            obj_dict.pop(key, None)
+    # the journal is removed next, so the snapshot must be on disk first
+    write_atomic(snapshot_path, dumps(obj_dict), "fsync", 1.0,
+                 compression, level)
+    journal.clear()
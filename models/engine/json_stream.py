@@ -0,0 +1,112 @@
+#!/usr/bin/python3
+"""This module contains a streaming reader for file.json
+that decodes one object at a time instead of the whole file"""
+from json import JSONDecodeError, JSONDecoder
+
+_decoder = JSONDecoder()
+_WHITESPACE = " \t\n\r"
+
+
+class _Buffer:
+    """This class holds the part of the file not decoded yet
+
+    Attributes:
+        file: the text file being read
+        chunk_size (int): the number of characters read at a time
+        text (str): the characters read and not consumed
+        pos (int): the position of the next character in text
+        eof (bool): True once the whole file was read
+    """
+
+    def __init__(self, file, chunk_size: int) -> None:
+        """This method initializes the buffer"""
+        self.file = file
+        self.chunk_size = chunk_size
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        """This method reads the next chunk of the file
+
+        Returns:
+            bool: False if the end of the file was already reached
+        """
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        # drop what was consumed so the buffer stays about one chunk big
+        self.text = self.text[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """This method skips whitespace and returns the next character
+
+        Returns:
+            str: the next character, or "" at the end of the file
+        """
+        while True:
+            while self.pos < len(self.text) and \
+                    self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """This method consumes the next character, which must be char"""
+        found = self.peek()
+        if found != char:
+            raise JSONDecodeError(f"Expecting '{char}'", self.text, self.pos)
+        self.pos += 1
+
+    def value(self):
+        """This method decodes the next json value of the file"""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # a number may go on in the next chunk
+            if end == len(self.text) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_items(file, chunk_size: int = 1 << 16):
+    """This function yields the entries of a json object one at a time
+
+    Only the entry being decoded and one chunk of the file
+    are in memory, not the whole dict of the file
+
+    Args:
+        file: a text file holding a json object
+        chunk_size (int): the number of characters read at a time
+    Yields:
+        tuple: the key and the decoded value of each entry
+    Raises:
+        JSONDecodeError: if the file is not a json object
+    """
+    buffer = _Buffer(file, chunk_size)
+    buffer.expect("{")
+    if buffer.peek() == "}":
+        return
+    while True:
+        key = buffer.value()
+        if not isinstance(key, str):
+            raise JSONDecodeError("Expecting property name",
+                                  buffer.text, buffer.pos)
+        buffer.expect(":")
+        yield key, buffer.value()
+        if buffer.peek() == "}":
+            return
+        buffer.expect(",")
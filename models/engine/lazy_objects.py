@@ -0,0 +1,232 @@
+#!/usr/bin/python3
+"""This module contains the dict of the file storage objects
+that builds the models only when they are used"""
+
+
+class MappedGroup(dict):
+    """This class holds the saved dicts of one class not built yet,
+    most of them still in a mapped file
+
+    The value of an object of the file is its number in the file
+    and the dict is decoded from the file when it is read,
+    the other values are saved dicts like in a plain group
+
+    Attributes:
+        mapped (MappedFile): the file, see models.engine.mapped_file
+    """
+
+    def __init__(self, mapped, group=None) -> None:
+        """This method initializes the group
+
+        Args:
+            mapped (MappedFile): the file of the objects
+            group (dict): the saved dicts already waiting
+        """
+        super().__init__()
+        self.mapped = mapped
+        for key, obj_dict in (group or {}).items():
+            dict.__setitem__(self, key, obj_dict)
+
+    def __decode(self, value):
+        """This method returns the saved dict of a value"""
+        return self.mapped.value(value) if type(value) is int else value
+
+    def __getitem__(self, key):
+        """This method returns a saved dict, decoding it if needed"""
+        return self.__decode(dict.__getitem__(self, key))
+
+    def get(self, key, default=None):
+        """This method returns a saved dict, decoding it if needed"""
+        return self[key] if key in self else default
+
+    def pop(self, key, *default):
+        """This method removes and returns a saved dict"""
+        if key in self:
+            return self.__decode(dict.pop(self, key))
+        return dict.pop(self, key, *default)
+
+    def values(self):
+        """This method yields the saved dicts"""
+        for value in dict.values(self):
+            yield self.__decode(value)
+
+    def items(self):
+        """This method yields the keys and the saved dicts"""
+        for key, value in dict.items(self):
+            yield key, self.__decode(value)
+
+    def json_items(self):
+        """This method yields the keys and the saved dicts, the ones
+        still in the file as their json text, not decoded"""
+        for key, value in dict.items(self):
+            if type(value) is int:
+                value = self.mapped.text(value)
+            yield key, value
+
+
+class LazyObjects(dict):
+    """This class is the dict returned by FileStorage.all()
+
+    Objects reloaded in lazy mode are kept as their saved dict
+    and only turned into models the first time they are read,
+    through d[key], get(), iteration, keys(), values() or items().
+    len() and `in` do not build anything.
+
+    Attributes:
+        build (function): called as build(key, obj_dict) to make
+        the model of a saved dict, it must put the model in this dict
+        raw (dict): the saved dicts not built yet,
+        class name -> {key: obj_dict}
+        raw_count (int): the number of saved dicts not built yet
+    """
+
+    def __init__(self, build) -> None:
+        """This method initializes the dict
+
+        Args:
+            build (function): makes and stores the model of a saved dict
+        """
+        super().__init__()
+        self.build = build
+        self.raw = {}
+        self.raw_count = 0
+
+    def put_raw(self, key: str, obj_dict: dict) -> None:
+        """This method keeps a saved dict to build it when it is used"""
+        group = self.raw.setdefault(key.split(".")[0], {})
+        if key not in group:
+            self.raw_count += 1
+        group[key] = obj_dict
+
+    def put_mapped(self, mapped) -> None:
+        """This method keeps the objects of a mapped file
+        to decode and build them when they are used
+
+        Args:
+            mapped (MappedFile): the file, see models.engine.mapped_file
+        """
+        for i, key in enumerate(mapped.keys):
+            name = key.split(".")[0]
+            group = self.raw.get(name)
+            if type(group) is not MappedGroup or group.mapped is not mapped:
+                group = self.raw[name] = MappedGroup(mapped, group)
+            if not dict.__contains__(group, key):
+                self.raw_count += 1
+            dict.__setitem__(group, key, i)
+
+    def drop_raw(self, key: str):
+        """This method forgets a saved dict without building it
+
+        Returns:
+            dict: the saved dict, or None if the key was not waiting
+        """
+        group = self.raw.get(key.split(".")[0])
+        if not group or key not in group:
+            return None
+        self.raw_count -= 1
+        return group.pop(key)
+
+    def count_raw(self, name: str) -> int:
+        """This method returns the number of saved dicts
+        of a class not built yet"""
+        return len(self.raw.get(name, ()))
+
+    def raw_items(self):
+        """This method yields the keys and saved dicts not built yet"""
+        for group in self.raw.values():
+            yield from group.items()
+
+    def raw_json_items(self):
+        """This method yields the keys and saved dicts not built yet,
+        the ones still in a mapped file as their json text"""
+        for group in self.raw.values():
+            if type(group) is MappedGroup:
+                yield from group.json_items()
+            else:
+                yield from group.items()
+
+    def loaded_items(self):
+        """This method returns the keys and models already built"""
+        return dict.items(self)
+
+    def materialize(self, name: str = None) -> None:
+        """This method builds the waiting models
+
+        Args:
+            name (str): only build the models of this class
+        """
+        names = list(self.raw) if name is None else [name]
+        for name in names:
+            group = self.raw.pop(name, {})
+            self.raw_count -= len(group)
+            for key, obj_dict in group.items():
+                self.build(key, obj_dict)
+
+    def __missing__(self, key):
+        """This method builds a waiting model on first access"""
+        obj_dict = self.drop_raw(key) if isinstance(key, str) else None
+        if obj_dict is None:
+            raise KeyError(key)
+        return self.build(key, obj_dict)
+
+    def __contains__(self, key) -> bool:
+        """This method checks a key without building the model"""
+        if dict.__contains__(self, key):
+            return True
+        return isinstance(key, str) and \
+            key in self.raw.get(key.split(".")[0], ())
+
+    def __len__(self) -> int:
+        """This method counts the models, built or not"""
+        return dict.__len__(self) + self.raw_count
+
+    def __iter__(self):
+        """This method builds every model and iterates over the keys"""
+        self.materialize()
+        return dict.__iter__(self)
+
+    def __delitem__(self, key) -> None:
+        """This method deletes a model, built or not"""
+        if self.drop_raw(key) is None:
+            dict.__delitem__(self, key)
+
+    def get(self, key, default=None):
+        """This method returns a model, building it if needed"""
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def pop(self, key, *default):
+        """This method removes and returns a model, building it if needed"""
+        if key in self:
+            value = self[key]
+            dict.pop(self, key)
+            return value
+        return dict.pop(self, key, *default)
+
+    def keys(self):
+        """This method builds every model and returns the keys"""
+        self.materialize()
+        return dict.keys(self)
+
+    def values(self):
+        """This method builds every model and returns them"""
+        self.materialize()
+        return dict.values(self)
+
+    def items(self):
+        """This method builds every model and returns the items"""
+        self.materialize()
+        return dict.items(self)
+
+    def copy(self) -> dict:
+        """This method builds every model and returns a plain dict copy"""
+        self.materialize()
+        return dict(dict.items(self))
+
+    def clear(self) -> None:
+        """This method removes every model, built or not"""
+        self.raw.clear()
+        self.raw_count = 0
+        dict.clear(self)
@@ -0,0 +1,221 @@
+#!/usr/bin/python3
+"""This module contains the memory-mapped reader of file.json
+
+A mapped file.json is not read by reload(): the file is mapped in
+memory and only the offsets of each object in it are kept, so an object
+is decoded from the pages of the file the first time it is used
+and a console that shows a few objects never reads the others.
+
+The offsets come from an index file next to file.json (file.json.idx),
+written by FileStorage.save() along with the file:
+    the magic bytes HBIX, the version of the index (1 byte),
+    the size and modification time (ns) of the file it indexes (8 bytes
+    each) and the number of objects (4 bytes), then
+    the utf-8 length of each key (4 bytes each) and the keys,
+    the start and end offsets of each object (8 bytes each)
+An index that does not match the size and time of the file is stale,
+the file is then scanned for its objects and the index written again.
+"""
+import mmap
+import os
+import re
+from array import array
+from json import dumps, loads
+from struct import Struct
+from models.engine.durable import write_atomic
+
+MAGIC = b"HBIX"
+VERSION = 1
+
+_HEADER = Struct("<4sBQqI")
+# the loops are unrolled, a repeat of a single character class
+# is much faster than a repeat of alternatives
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# an entry whose object holds no other object, like every model saved,
+# is found by one match, the others by counting the brackets
+_ENTRY = re.compile(rb'(%s)\s*:\s*(\{[^{}"]*(?:%s[^{}"]*)*\})\s*([,}])\s*'
+                    % (_STRING, _STRING))
+_KEY = re.compile(rb'(%s)\s*:\s*(?=\{)' % _STRING)
+_SEPARATOR = re.compile(rb'\s*([,}])\s*')
+_TOKEN = re.compile(rb'%s|[{}\[\]]' % _STRING)
+_SPACE = re.compile(rb'\s*')
+
+
+def _value_end(data, start: int) -> int:
+    """This function returns the offset after the json object
+    or array that starts at start"""
+    depth = 0
+    for match in _TOKEN.finditer(data, start):
+        char = data[match.start()]
+        if char in b"{[":
+            depth += 1
+        elif char in b"}]":
+            depth -= 1
+            if depth == 0:
+                return match.end()
+    raise ValueError("not a json object of objects")
+
+
+def scan(data):
+    """This function finds the objects of a json object of objects,
+    like file.json
+
+    Args:
+        data (bytes or mmap): the content of the file
+    Returns:
+        tuple: the keys, and the start and end offsets of their objects
+    Raises:
+        ValueError: if data is not a json object of objects
+    """
+    keys = []
+    starts = array("Q")
+    ends = array("Q")
+    pos = _SPACE.match(data).end()
+    if data[pos:pos + 1] != b"{":
+        raise ValueError("not a json object of objects")
+    pos = _SPACE.match(data, pos + 1).end()
+    last = b"}" if data[pos:pos + 1] == b"}" else b","
+    if last == b"}":
+        pos += 1
+    while last == b",":
+        match = _ENTRY.match(data, pos)
+        if match is not None:
+            key, (start, end), last = match.group(1), match.span(2), \
+                match.group(3)
+        else:
+            match = _KEY.match(data, pos)
+            if match is None:
+                raise ValueError("not a json object of objects")
+            key, start = match.group(1), match.end()
+            end = _value_end(data, start)
+            match = _SEPARATOR.match(data, end)
+            if match is None:
+                raise ValueError("not a json object of objects")
+            last = match.group(1)
+        keys.append(loads(key))
+        starts.append(start)
+        ends.append(end)
+        pos = match.end()
+    if _SPACE.match(data, pos).end() != len(data):
+        raise ValueError("not a json object of objects")
+    return keys, starts, ends
+
+
+def write_index(path: str, keys: list, starts, ends) -> None:
+    """This function writes the index of a file
+
+    Args:
+        path (str): the file indexed, the index is path.idx
+        keys (list): the keys of the objects
+        starts (array): the offset of the first byte of each object
+        ends (array): the offset after the last byte of each object
+    """
+    stat = os.stat(path)
+    data = [key.encode() for key in keys]
+    chunks = [_HEADER.pack(MAGIC, VERSION, stat.st_size, stat.st_mtime_ns,
+                           len(keys)),
+              array("I", [len(key) for key in data]).tobytes(),
+              b"".join(data), array("Q", starts).tobytes(),
+              array("Q", ends).tobytes()]
+    # the index can always be made again from the file
+    write_atomic(f"{path}.idx", b"".join(chunks), "none")
+
+
+def write_parts_index(path: str, keys: list, parts: list) -> None:
+    """This function writes the index of a file written by FileStorage,
+    the json parts of its objects between braces and separated by ", "
+
+    Args:
+        path (str): the file indexed
+        keys (list): the keys of the objects
+        parts (list): the json part of each object, "key": {...}
+    """
+    starts = array("Q")
+    ends = array("Q")
+    pos = 1
+    for key, part in zip(keys, parts):
+        size = len(part) if part.isascii() else len(part.encode())
+        starts.append(pos + len(dumps(key)) + 2)
+        ends.append(pos + size)
+        pos += size + 2
+    write_index(path, keys, starts, ends)
+
+
+def read_index(path: str, stat):
+    """This function reads the index of a file
+
+    Args:
+        path (str): the file indexed
+        stat: the os.stat() of the file
+    Returns:
+        tuple: the keys, and the start and end offsets of their objects,
+        or None if there is no index or it is stale
+    """
+    try:
+        with open(f"{path}.idx", "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < _HEADER.size:
+        return None
+    magic, version, size, mtime, count = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or size != stat.st_size or \
+            mtime != stat.st_mtime_ns:
+        return None
+    pos = _HEADER.size
+    lengths = array("I")
+    lengths.frombytes(data[pos:pos + 4 * count])
+    pos += 4 * count
+    keys = []
+    for length in lengths:
+        keys.append(data[pos:pos + length].decode())
+        pos += length
+    starts = array("Q")
+    starts.frombytes(data[pos:pos + 8 * count])
+    ends = array("Q")
+    ends.frombytes(data[pos + 8 * count:pos + 16 * count])
+    return keys, starts, ends
+
+
+class MappedFile:
+    """This class is a json object of objects mapped in memory,
+    like file.json, whose objects are decoded one at a time
+
+    Attributes:
+        path (str): the path to the file
+        map (mmap): the content of the file, None if it is empty
+        keys (list): the keys of the objects
+        starts (array): the offset of the first byte of each object
+        ends (array): the offset after the last byte of each object
+    """
+
+    def __init__(self, path: str) -> None:
+        """This method maps a file and reads its index,
+        or scans the file when the index is missing or stale
+
+        Args:
+            path (str): the path to the file
+        Raises:
+            FileNotFoundError: if the file does not exist
+            ValueError: if the file is not a json object of objects
+        """
+        self.path = path
+        with open(path, "rb") as file:
+            stat = os.fstat(file.fileno())
+            # the map keeps the file open after it is closed here
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) \
+                if stat.st_size else None
+        index = read_index(path, stat)
+        if index is None:
+            index = scan(self.map) if self.map is not None else \
+                ([], array("Q"), array("Q"))
+            write_index(path, *index)
+        self.keys, self.starts, self.ends = index
+
+    def text(self, i: int) -> str:
+        """This method returns the json of the object number i"""
+        return self.map[self.starts[i]:self.ends[i]].decode()
+
+    def value(self, i: int) -> dict:
+        """This method decodes the object number i"""
+        return loads(self.map[self.starts[i]:self.ends[i]])
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+"""This module contains what the storage engines need to know
+about the model classes and their timestamps"""
+from datetime import datetime, timedelta
+
+# the attributes every model saves as a datetime
+TIMESTAMPS = ("created_at", "updated_at")
+# the timestamps are stored as microseconds since EPOCH
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def declared(cls: type) -> dict:
+    """This function returns the attributes declared by a model class
+    and its bases, like Place.number_rooms, and their class values
+
+    Returns:
+        dict: name -> class value, the bases first
+    """
+    attributes = {}
+    for base in reversed(cls.__mro__):
+        for name, value in vars(base).items():
+            if not name.startswith("_") and not callable(value):
+                attributes[name] = value
+    return attributes
+
+
+def class_name(cls) -> str:
+    """This function returns the name of a class or class name"""
+    return cls if isinstance(cls, str) else cls.__name__
@@ -0,0 +1,271 @@
+#!/usr/bin/python3
+"""This module contains the parallel reload and save of the file storage
+
+Building the models of a large file.json keeps one core busy: the json
+decoding, the timestamps and the setattr of every attribute. With the
+workers option, reload() hands parts of the files to a pool of
+processes instead: the objects of file.json are split by their offsets
+(see models.engine.mapped_file) and the shard files go one per task.
+The processes decode the objects and build the models, which come back
+pickled, so the storage only unpickles them and adds them to its dicts.
+
+A save with many objects to dump is split the same way: the processes
+are forked when save() is called, so they hold the objects as they are
+at that moment without copying them, and each one makes the dicts and
+the json of a part of the objects. The json parts come back in order
+and are written to the file as they arrive. Threads would not help,
+the json encoder holds the GIL.
+
+The processes are forked so they start with the model classes of this
+process and never import models again, which would reload the storage
+in each of them. Where fork does not exist nothing is parallel. The
+reload made by the import of models forks them while models is being
+imported, so nothing may wait for the import lock of models: the
+processes get the model classes from the readers instead of importing
+them, and only the thread that reads pickles (see _Pool).
+"""
+import os
+from json import loads
+from multiprocessing import get_all_start_methods, get_context
+from models.engine.compression import open_text
+from models.engine.json_stream import iter_items
+
+# a smaller task costs more to send to a process than to do here
+MIN_CHUNK = 2000
+# the bytes of a saved object, about, to count the objects of a file
+_OBJECT_SIZE = 256
+# the tasks per process, several so a slow one does not hold the others
+_TASKS_PER_WORKER = 4
+# the entries and the function of the running save, in its processes
+_job = None
+# the model classes by name of the running reload, see models.base_model
+_classes = {}
+
+
+def can_fork() -> bool:
+    """This function tells if the processes of the pool can be forked"""
+    return "fork" in get_all_start_methods()
+
+
+def iter_file(path: str):
+    """This function yields the entries of a json file,
+    nothing if the file does not exist"""
+    try:
+        with open_text(path) as file:
+            yield from iter_items(file)
+    except FileNotFoundError:
+        return
+
+
+def _model(obj_dict: dict):
+    """This function builds the model of a saved dict"""
+    return _classes[obj_dict["__class__"]](**obj_dict)
+
+
+def _build_range(path: str, keys: list, starts, ends) -> list:
+    """This function builds the models of a part of a file
+
+    Args:
+        path (str): the file
+        keys (list): the keys of the objects of the part
+        starts (array): the offset of the first byte of each object
+        ends (array): the offset after the last byte of each object
+    Returns:
+        list: the keys and the models
+    """
+    base = starts[0]
+    with open(path, "rb") as file:
+        file.seek(base)
+        data = file.read(ends[-1] - base)
+    return [(key, _model(loads(data[start - base:end - base])))
+            for key, start, end in zip(keys, starts, ends)]
+
+
+def _build_file(path: str) -> list:
+    """This function builds the models of a whole file
+
+    Returns:
+        list: the keys and the models, empty if the file does not exist
+    """
+    return [(key, _model(obj_dict)) for key, obj_dict in iter_file(path)]
+
+
+def _work(function, tasks: list, writer) -> None:
+    """This function runs the tasks of a process of a pool
+    and sends their results, or the error that stopped them"""
+    try:
+        for args in tasks:
+            writer.send((True, function(*args)))
+    except Exception as error:
+        writer.send((False, error))
+
+
+class _Pool:
+    """This class is a pool of forked processes, like ProcessPoolExecutor
+
+    The executor pickles the tasks and unpickles the results in its own
+    threads, which wait forever for the import lock of models when
+    the pool runs while models is being imported. Here the processes
+    get the function and the tasks through fork, and the results are
+    read from pipes by the thread that called map()
+    """
+
+    def __init__(self, workers: int) -> None:
+        """This method initializes a pool of at most workers processes"""
+        self.workers = workers
+        self.processes = []
+
+    def __enter__(self):
+        """This method returns the pool"""
+        return self
+
+    def __exit__(self, *error) -> None:
+        """This method stops the processes"""
+        for process in self.processes:
+            process.terminate()
+            process.join()
+
+    def map(self, function, *iterables):
+        """This method runs function on the items of iterables
+        in the processes, each process gets every workers-th task
+
+        Returns:
+            generator: the results, in order
+        Raises:
+            Exception: the error of a failed task, when its result is read
+        """
+        context = get_context("fork")
+        tasks = list(zip(*iterables))
+        readers = []
+        for worker in range(min(self.workers, len(tasks))):
+            reader, writer = context.Pipe(duplex=False)
+            process = context.Process(
+                target=_work, daemon=True,
+                args=(function, tasks[worker::self.workers], writer))
+            process.start()
+            writer.close()
+            self.processes.append(process)
+            readers.append(reader)
+        return self.__results(readers, len(tasks))
+
+    @staticmethod
+    def __results(readers: list, count: int):
+        """This method yields the results of the tasks in order"""
+        for task in range(count):
+            ok, result = readers[task % len(readers)].recv()
+            if not ok:
+                raise result
+            yield result
+
+
+def _pool(workers: int) -> _Pool:
+    """This function returns a pool of forked processes"""
+    return _Pool(workers)
+
+
+def read_mapped(mapped, workers: int, classes: dict):
+    """This function builds the models of a file with a pool of processes
+
+    Args:
+        mapped (MappedFile): the file and the offsets of its objects
+        workers (int): the number of processes
+        classes (dict): the model classes by name
+    Yields:
+        tuple: the key and the model of each object, in the file order
+    """
+    global _classes
+    _classes = classes
+    count = len(mapped.keys)
+    tasks = min(workers * _TASKS_PER_WORKER, count // MIN_CHUNK)
+    if tasks <= 1:
+        if count:
+            yield from _build_range(mapped.path, mapped.keys,
+                                    mapped.starts, mapped.ends)
+        return
+    bounds = [count * i // tasks for i in range(tasks + 1)]
+    parts = [(mapped.keys[start:end], mapped.starts[start:end],
+              mapped.ends[start:end])
+             for start, end in zip(bounds, bounds[1:])]
+    with _pool(workers) as pool:
+        for models in pool.map(_build_range, [mapped.path] * tasks,
+                               *zip(*parts)):
+            yield from models
+
+
+def _size(path: str) -> int:
+    """This function returns the size of a file, 0 if it does not exist"""
+    try:
+        return os.path.getsize(path)
+    except FileNotFoundError:
+        return 0
+
+
+def read_files(paths: list, workers: int, classes: dict):
+    """This function builds the models of files with a pool of processes,
+    one file per task, when they hold enough objects
+
+    Args:
+        paths (list): the files
+        workers (int): the number of processes
+        classes (dict): the model classes by name
+    Yields:
+        list: the keys and the models of each file, in the order of paths
+    """
+    global _classes
+    _classes = classes
+    objects = sum(map(_size, paths)) // _OBJECT_SIZE
+    if len(paths) <= 1 or objects // MIN_CHUNK <= 1:
+        yield from map(_build_file, paths)
+        return
+    with _pool(workers) as pool:
+        yield from pool.map(_build_file, paths)
+
+
+def _start_job(entries: list, serialize) -> None:
+    """This function keeps the job of a save in a process of its pool"""
+    global _job
+    _job = (entries, serialize)
+
+
+def _run_job(bounds: tuple):
+    """This function serializes a part of the entries of a save"""
+    entries, serialize = _job
+    start, end = bounds
+    return serialize(entries[start:end])
+
+
+def _results(pool, results):
+    """This function yields the results of a pool, then stops it"""
+    try:
+        yield from results
+    finally:
+        pool.terminate()
+
+
+def serialize(entries: list, function, workers: int):
+    """This function serializes the entries of a save,
+    in a pool of processes when there are enough objects to dump
+
+    The processes are forked before this function returns, so the work
+    done later is on the objects as they were when it was called
+
+    Args:
+        entries (list): the keys and the json or the objects to dump
+        function (function): serializes a list of entries,
+        returns its json parts and the json dumped
+        workers (int): the number of processes
+    Returns:
+        iterable: the results of function for parts of the entries,
+        in order
+    """
+    # the entries already json cost little, only the others are split
+    todo = [i for i, (key, value) in enumerate(entries)
+            if not isinstance(value, str)]
+    tasks = min(workers * _TASKS_PER_WORKER, len(todo) // MIN_CHUNK)
+    if tasks <= 1 or not can_fork():
+        return [function(entries)]
+    bounds = [0] + [todo[len(todo) * i // tasks]
+                    for i in range(1, tasks)] + [len(entries)]
+    pool = get_context("fork").Pool(workers, _start_job,
+                                    (entries, function))
+    return _results(pool, pool.imap(_run_job, zip(bounds, bounds[1:])))
@@ -0,0 +1,73 @@
+#!/usr/bin/python3
+"""This module contains the background writer of the file storage,
+which writes the saves in a thread so commands do not wait for them"""
+from collections import deque
+from queue import Queue
+from threading import Thread
+
+
+class Writer:
+    """This class runs the writes of the storage one after the other
+    in a thread
+
+    A write is a function made by save() from a snapshot of the objects,
+    so the objects can change while it runs. Its result is kept until
+    the storage collects it with results().
+
+    Attributes:
+        queue (Queue): the writes waiting, save() blocks when it is full
+        done (deque): the job ids and results of the finished writes
+        error (BaseException): the error of a failed write,
+        raised by the next put() or join()
+        thread (Thread): the thread running the writes
+    """
+
+    def __init__(self, size: int) -> None:
+        """This method starts the writer
+
+        Args:
+            size (int): the number of writes that can wait
+        """
+        self.queue = Queue(size)
+        self.done = deque()
+        self.error = None
+        self.thread = Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def run(self) -> None:
+        """This method runs the writes as they come"""
+        while True:
+            job_id, write = self.queue.get()
+            try:
+                self.done.append((job_id, write()))
+            except BaseException as error:
+                self.error = error
+            finally:
+                self.queue.task_done()
+
+    def check(self) -> None:
+        """This method raises the error of a failed write, once"""
+        error, self.error = self.error, None
+        if error is not None:
+            raise error
+
+    def put(self, job_id: int, write) -> None:
+        """This method queues a write, waiting while the queue is full
+
+        Args:
+            job_id (int): the id of the write
+            write (function): the write, returns its result
+        """
+        self.check()
+        self.queue.put((job_id, write))
+
+    def join(self) -> None:
+        """This method waits until every queued write is done"""
+        self.queue.join()
+        self.check()
+
+    def results(self):
+        """This method yields the job ids and results of the finished
+        writes in the order they were queued"""
+        while self.done:
+            yield self.done.popleft()
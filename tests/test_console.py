@@ -721,6 +721,52 @@ class TestConsole(unittest.TestCase):
             self.console.onecmd(f'BaseModel.update("123456", "name", "Betty")')
             self.assertEqual(f.getvalue(), "** no instance found **\n")
 
+    @unittest.skipUnless(isinstance(storage, FileStorage),
+                         "only FileStorage has the unique option")
+    def test_update_duplicate_email(self):
+        """This method tests updating a user with a used email."""
+        storage.configure(unique=True)
+        try:
+            user = User()
+            user.email = "console@mail.com"
+            other = User()
+            with patch('sys.stdout', new=StringIO()) as f:
+                self.console.onecmd(
+                    f"update User {other.id} email console@mail.com")
+                self.assertEqual(f.getvalue(),
+                                 "** email already exists **\n")
+            self.assertEqual(other.email, "")
+        finally:
+            storage.configure(unique=False)
+
+    @unittest.skipUnless(isinstance(storage, FileStorage),
+                         "only FileStorage has the unique option")
+    def test_update_dict_duplicate_email(self):
+        """This method tests that a dict update is all or nothing."""
+        storage.configure(unique=True)
+        try:
+            user = User()
+            user.email = "dict@mail.com"
+            other = User()
+            with patch('sys.stdout', new=StringIO()) as f:
+                self.console.onecmd(
+                    f'User.update("{other.id}", {{"first_name": "Betty", '
+                    f'"email": "dict@mail.com"}})')
+                self.assertEqual(f.getvalue(),
+                                 "** email already exists **\n")
+            self.assertEqual(other.first_name, "")
+            self.assertEqual(other.email, "")
+        finally:
+            storage.configure(unique=False)
+
+    def test_sync(self):
+        """This method tests that sync and quit flush the storage."""
+        with patch.object(storage, "flush") as flush:
+            self.assertFalse(self.console.onecmd("sync"))
+            self.assertTrue(self.console.onecmd("quit"))
+            self.assertTrue(self.console.onecmd("EOF"))
+        self.assertEqual(flush.call_count, 3)
+
 
 if __name__ == "__main__":
     unittest.main()
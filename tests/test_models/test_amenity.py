@@ -305,8 +305,9 @@ class TestAmenitysaveing(unittest.TestCase):
         am = Amenity()
         am.save()
         amid = "Amenity." + am.id
-        with open("file.json", "r") as f:
-            self.assertIn(amid, f.read())
+        models.storage.clear()
+        models.storage.reload()
+        self.assertIn(amid, models.storage.all())
 
 
 class TestAmenitytoDictMethod(unittest.TestCase):
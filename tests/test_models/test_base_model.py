@@ -4,8 +4,9 @@ import unittest
 from models.base_model import BaseModel
 from datetime import datetime
 from time import sleep
-import json
+from collections.abc import Mapping
 import os
+import pickle
 import models
 
 
@@ -210,7 +211,7 @@ class TestBaseModel(unittest.TestCase):
         self.assertDictEqual(models.storage.all()[
                              key].to_dict(), model.to_dict())
         # test the all method of the storage
-        self.assertIsInstance(models.storage.all(), dict)
+        self.assertIsInstance(models.storage.all(), Mapping)
         self.assertIn(f"BaseModel.{model.id}", models.storage.all())
         # test key and value of the dictionary
         key = f"BaseModel.{model.id}"
@@ -220,10 +221,11 @@ class TestBaseModel(unittest.TestCase):
         # test the save method of the storage
         model.save()
         models.storage.save()
-        with open("file.json", "r") as file:
-            obj_dict = json.load(file)
-            self.assertIn(key, obj_dict)
-            self.assertDictEqual(obj_dict[key], model.to_dict())
+        models.storage.clear()
+        models.storage.reload()
+        self.assertIn(key, models.storage.all())
+        self.assertDictEqual(models.storage.all()[key].to_dict(),
+                             model.to_dict())
         # test the reload method of the storage
         models.storage.reload()
         self.assertIn(key, models.storage.all())
@@ -259,7 +261,7 @@ class TestBaseModel(unittest.TestCase):
         self.assertDictEqual(models.storage.all()[
                              key].to_dict(), model.to_dict())
         # test the all method of the storage
-        self.assertIsInstance(models.storage.all(), dict)
+        self.assertIsInstance(models.storage.all(), Mapping)
         self.assertIn(f"BaseModel.{model.id}", models.storage.all())
         # test key and value of the dictionary
         key = f"BaseModel.{model.id}"
@@ -269,10 +271,11 @@ class TestBaseModel(unittest.TestCase):
         # test the save method of the storage
         model.save()
         models.storage.save()
-        with open("file.json", "r") as file:
-            obj_dict = json.load(file)
-            self.assertIn(key, obj_dict)
-            self.assertDictEqual(obj_dict[key], model.to_dict())
+        models.storage.clear()
+        models.storage.reload()
+        self.assertIn(key, models.storage.all())
+        self.assertDictEqual(models.storage.all()[key].to_dict(),
+                             model.to_dict())
         # test the reload method of the storage
         models.storage.reload()
         self.assertIn(key, models.storage.all())
@@ -320,5 +323,64 @@ class TestBaseModel(unittest.TestCase):
         self.assertEqual(model.created_at, datetime.strptime("2022-01-01T00:00:00.000000", "%Y-%m-%dT%H:%M:%S.%f"))
         self.assertEqual(model.updated_at, datetime.strptime("2022-01-01T00:00:00.000000", "%Y-%m-%dT%H:%M:%S.%f"))
 
+    def test_base_model_kwargs_without_microseconds(self):
+        """This method tests reloading a time saved without microseconds"""
+        created_at = datetime(2022, 1, 1, 10, 30, 5)
+        model = BaseModel(id="123", created_at=created_at.isoformat(),
+                          updated_at="2022-01-01T10:30:05.000012")
+        self.assertEqual(model.created_at, created_at)
+        self.assertEqual(model.updated_at,
+                         datetime(2022, 1, 1, 10, 30, 5, 12))
+        self.assertEqual(model.to_dict()["created_at"],
+                         "2022-01-01T10:30:05")
+
+    def test_model_classes_are_registered(self):
+        """This method tests that model classes register themselves"""
+        from models.base_model import classes
+        from models.user import User
+        from models.review import Review
+        self.assertIs(classes["BaseModel"], BaseModel)
+        self.assertIs(classes["User"], User)
+        self.assertIs(classes["Review"], Review)
+
+        class Booking(BaseModel):
+            """a model defined outside of the models package"""
+        try:
+            self.assertIs(classes["Booking"], Booking)
+            booking = Booking()
+            self.assertIs(models.storage.all()[
+                f"Booking.{booking.id}"].__class__, Booking)
+        finally:
+            models.storage.delete(booking)
+            del classes["Booking"]
+
+    def test_to_dict_kept(self):
+        """This method tests that to_dict is kept until
+        an attribute changes"""
+        model = self.base_model1
+        model.tags = ["a"]
+        first = model.to_dict()
+        first["name"] = "John"
+        self.assertEqual(model.to_dict(), {
+            "id": model.id, "__class__": "BaseModel", "tags": ["a"],
+            "created_at": model.created_at.isoformat(),
+            "updated_at": model.updated_at.isoformat()})
+        self.assertIsNot(model.to_dict(), model.to_dict())
+        model.tags.append("b")
+        self.assertEqual(model.to_dict()["tags"], ["a", "b"])
+        model.name = "Betty"
+        self.assertEqual(model.to_dict()["name"], "Betty")
+        del model.name
+        self.assertNotIn("name", model.to_dict())
+        sleep(0.01)
+        model.save()
+        self.assertEqual(model.to_dict()["updated_at"],
+                         model.updated_at.isoformat())
+        self.assertNotIn("_BaseModel__dict_cache", model.__dict__)
+        self.assertNotIn("_BaseModel__dict_cache", str(model))
+        copy = pickle.loads(pickle.dumps(model))
+        self.assertEqual(copy.to_dict(), model.to_dict())
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+"""This module contains the tests for the binary format of the storage"""
+import unittest
+import os
+import json
+import shutil
+import subprocess
+import sys
+import tempfile
+from datetime import datetime
+from models.engine import binary_format
+from models.engine.binary_format import (binary_to_json, decode, encode,
+                                         json_to_binary)
+
+
+class TestBinaryFormat(unittest.TestCase):
+    """This class contains the tests for the binary format"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.objects = {
+            "User.1": {"id": "1", "__class__": "User",
+                       "created_at": "2024-03-11T12:00:00.123456",
+                       "updated_at": "2024-03-11T12:00:00",
+                       "email": "airbnb@mail.com", "first_name": "Zoé"},
+            "User.2": {"id": "2", "__class__": "User",
+                       "created_at": "2024-03-11T12:00:01.000001",
+                       "updated_at": "2024-03-11T12:00:02.000002",
+                       "pets": True},
+            "Place.3": {"id": "3", "__class__": "Place",
+                        "created_at": "1969-12-31T23:59:59.999999",
+                        "updated_at": "2024-03-11T12:00:00.000001",
+                        "number_rooms": 3, "latitude": 37.77,
+                        "amenity_ids": ["a", "b"], "price_by_night": 2 ** 70,
+                        "description": None},
+        }
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        for path in ("test_binary.json", "test_binary.hbnb"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def expected(self):
+        """This method returns the objects with datetime timestamps"""
+        expected = {}
+        for key, obj_dict in self.objects.items():
+            obj_dict = dict(obj_dict)
+            for field in binary_format.TIMESTAMPS:
+                obj_dict[field] = datetime.fromisoformat(obj_dict[field])
+            expected[key] = obj_dict
+        return expected
+
+    def test_round_trip(self):
+        """This method tests decoding what was encoded"""
+        data = encode(self.objects.items())
+        self.assertEqual(data[:4], b"HBNB")
+        self.assertEqual(dict(decode(data)), self.expected())
+
+    def test_datetime_input(self):
+        """This method tests encoding timestamps given as datetime"""
+        data = encode(self.expected().items())
+        self.assertEqual(dict(decode(data)), self.expected())
+
+    def test_keys(self):
+        """This method tests that the keys are kept as they were saved,
+        even when they are not the class name and the id"""
+        objects = {
+            "User.1": {"id": "1", "__class__": "User"},
+            "User.old": {"id": "1", "__class__": "User"},
+            "User.none": {"__class__": "User", "first_name": "Zoé"},
+        }
+        self.assertEqual(dict(decode(encode(objects.items()))), objects)
+
+    def test_empty(self):
+        """This method tests a storage without objects"""
+        self.assertEqual(list(decode(encode([]))), [])
+
+    def test_smaller(self):
+        """This method tests that field names are not repeated"""
+        objects = {f"User.{i}": {"id": str(i), "__class__": "User",
+                                 "created_at": "2024-03-11T12:00:00.123456",
+                                 "updated_at": "2024-03-11T12:00:00.123456",
+                                 "first_name": "Betty", "number": i}
+                   for i in range(100)}
+        self.assertLess(len(encode(objects.items())),
+                        len(json.dumps(objects)) / 2)
+
+    def test_bad_file(self):
+        """This method tests refusing what is not a binary storage file"""
+        data = encode(self.objects.items())
+        with self.assertRaises(ValueError):
+            list(decode(b'{"User.1": {}}'))
+        with self.assertRaises(ValueError):
+            list(decode(data[:4] + b"\2" + data[5:]))
+        with self.assertRaises(ValueError):
+            list(decode(data[:-10]))
+
+    def test_converters(self):
+        """This method tests converting file.json and back"""
+        with open("test_binary.json", "w") as file:
+            json.dump(self.objects, file)
+        json_to_binary("test_binary.json", "test_binary.hbnb")
+        os.remove("test_binary.json")
+        binary_to_json("test_binary.hbnb", "test_binary.json")
+        with open("test_binary.json", "r") as file:
+            self.assertEqual(json.load(file), self.objects)
+
+    def test_script(self):
+        """This method tests converting with convert_storage.py
+        without reloading the storage of the directory"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        with open(os.path.join(directory, "in.json"), "w") as file:
+            json.dump(self.objects, file)
+        # the import of models would fail reading it
+        with open(os.path.join(directory, "file.json"), "w") as file:
+            file.write("not json")
+        script = os.path.abspath("convert_storage.py")
+        for args in (("to-binary", "in.json", "out.hbnb"),
+                     ("to-json", "out.hbnb", "out.json")):
+            process = subprocess.run([sys.executable, script, *args],
+                                     cwd=directory, capture_output=True,
+                                     text=True, timeout=60)
+            self.assertEqual((process.returncode, process.stderr), (0, ""))
+        with open(os.path.join(directory, "out.json"), "r") as file:
+            self.assertEqual(json.load(file), self.objects)
+        process = subprocess.run([sys.executable, script, "to-xml"],
+                                 capture_output=True, text=True, timeout=60)
+        self.assertEqual(process.returncode, 1)
+        self.assertIn("to-binary", process.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
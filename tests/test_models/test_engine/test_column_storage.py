@@ -0,0 +1,152 @@
+#!/usr/bin/python3
+"""This module contains the tests for the columnar storage engine"""
+import unittest
+import os
+import json
+from array import array
+from datetime import datetime
+from models.engine.column_storage import ColumnStorage, Row, Table
+from models.place import Place
+from models.user import User
+
+
+class TestTable(unittest.TestCase):
+    """This class contains the tests for the table of a model class"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.table = Table(Place)
+        self.now = datetime(2024, 3, 11, 12, 0, 0, 123456)
+        self.table.append("1", {"created_at": self.now, "name": "a",
+                                "number_rooms": 3, "latitude": 1.5})
+        self.table.append("2", {"pets": True})
+
+    def test_columns(self):
+        """This method tests that numbers and times go to arrays"""
+        self.assertIsInstance(self.table.columns["number_rooms"], array)
+        self.assertIsInstance(self.table.columns["latitude"], array)
+        self.assertIsInstance(self.table.columns["created_at"], array)
+        self.assertIsInstance(self.table.columns["name"], list)
+        self.assertEqual(list(self.table.columns["number_rooms"]), [3, 0])
+
+    def test_get(self):
+        """This method tests reading set, unset and extra attributes"""
+        self.assertEqual(self.table.get(0, "created_at"), self.now)
+        self.assertEqual(self.table.get(0, "name"), "a")
+        self.assertEqual(self.table.get(1, "name"), "")
+        self.assertEqual(self.table.get(1, "amenity_ids"), [])
+        self.assertTrue(self.table.get(1, "pets"))
+        with self.assertRaises(AttributeError):
+            self.table.get(0, "pets")
+        with self.assertRaises(AttributeError):
+            self.table.get(1, "created_at")
+
+    def test_attributes(self):
+        """This method tests the attributes set on a row"""
+        self.assertEqual(self.table.attributes(0), {
+            "id": "1", "created_at": self.now, "name": "a",
+            "number_rooms": 3, "latitude": 1.5})
+        self.assertEqual(self.table.attributes(1), {"id": "2", "pets": True})
+
+    def test_other_type(self):
+        """This method tests that a column takes a value of another type"""
+        self.table.set(1, "number_rooms", "many")
+        self.assertEqual(self.table.get(1, "number_rooms"), "many")
+        self.assertEqual(self.table.get(0, "number_rooms"), 3)
+        self.assertIsInstance(self.table.columns["number_rooms"], list)
+
+    def test_remove(self):
+        """This method tests that the last row takes the removed place"""
+        self.table.remove(0)
+        self.assertEqual(len(self.table), 1)
+        self.assertEqual(self.table.rows, {"2": 0})
+        self.assertEqual(self.table.attributes(0), {"id": "2", "pets": True})
+        self.table.remove(0)
+        self.assertEqual(len(self.table), 0)
+        self.assertEqual(self.table.extra, {})
+
+
+class TestColumnStorage(unittest.TestCase):
+    """This class contains the tests for the columnar storage engine"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = ColumnStorage()
+        self.place = Place()
+        self.place.name = "home"
+        self.place.price_by_night = 100
+        self.storage.new(self.place)
+        self.user = User()
+        self.storage.new(self.user)
+        self.key = f"Place.{self.place.id}"
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        if os.path.exists("file.json"):
+            os.remove("file.json")
+
+    def test_all(self):
+        """This method tests the proxies handed out by all()"""
+        self.assertEqual(len(self.storage.all()), 2)
+        self.assertIn(self.key, self.storage.all())
+        self.assertEqual(list(self.storage.all(Place)), [self.key])
+        row = self.storage.all()[self.key]
+        self.assertIs(type(row), Row)
+        self.assertIsInstance(row, Place)
+        self.assertEqual(row.__class__.__name__, "Place")
+        self.assertEqual(row, self.place)
+        self.assertEqual(row.to_dict(), self.place.to_dict())
+        self.assertEqual(str(row), str(self.place))
+
+    def test_count(self):
+        """This method tests counting the objects"""
+        self.assertEqual(self.storage.count(), 2)
+        self.assertEqual(self.storage.count(Place), 1)
+        self.assertEqual(self.storage.count("State"), 0)
+
+    def test_setattr_on_proxy(self):
+        """This method tests writing through a proxy"""
+        row = self.storage.all()[self.key]
+        row.number_rooms = 4
+        row.pets = True
+        self.assertEqual(self.storage.all()[self.key].number_rooms, 4)
+        self.assertTrue(self.storage.all()[self.key].pets)
+
+    def test_touch(self):
+        """This method tests copying the assignments of a model object"""
+        self.place.price_by_night = 120
+        self.storage.touch(self.place)
+        self.assertEqual(self.storage.all()[self.key].price_by_night, 120)
+
+    def test_column(self):
+        """This method tests aggregating a column"""
+        other = Place()
+        other.price_by_night = 50
+        self.storage.new(other)
+        prices = self.storage.column(Place, "price_by_night")
+        self.assertIsInstance(prices, array)
+        self.assertEqual(sum(prices), 150)
+        self.assertEqual(set(self.storage.column(Place, "id")),
+                         {self.place.id, other.id})
+
+    def test_delete(self):
+        """This method tests deleting through a proxy"""
+        self.storage.delete(self.storage.all()[self.key])
+        self.assertNotIn(self.key, self.storage.all())
+        self.assertEqual(self.storage.count(), 1)
+
+    def test_save_reload(self):
+        """This method tests that the file is the same as FileStorage's"""
+        self.storage.save()
+        with open("file.json", "r") as file:
+            obj_dict = json.load(file)
+        self.assertEqual(obj_dict[self.key], self.place.to_dict())
+        storage = ColumnStorage()
+        storage.reload()
+        self.assertEqual(storage.all()[self.key].to_dict(),
+                         self.place.to_dict())
+        self.assertEqual(storage.count(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+#!/usr/bin/python3
+"""This module contains the tests for the compression of the storage files"""
+import unittest
+import os
+import json
+from models.engine import compression
+from models.engine.compression import (check_compression, compress, detect,
+                                       open_binary, open_text)
+from models.engine.durable import write_atomic
+
+
+class TestCompression(unittest.TestCase):
+    """This class contains the tests for the compression"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.path = "test_compression.json"
+        self.objects = {f"User.{i}": {"id": str(i), "first_name": "Zoé",
+                                      "created_at": "2024-03-11T12:00:00"}
+                        for i in range(2000)}
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_round_trip(self):
+        """This method tests reading back a file written with every codec"""
+        text = json.dumps(self.objects, ensure_ascii=False)
+        for codec in compression.CODECS:
+            write_atomic(self.path, text, compression=codec)
+            with open(self.path, "rb") as file:
+                self.assertEqual(detect(file.read(6)), codec)
+            with open_text(self.path) as file:
+                self.assertEqual(file.read(), text)
+
+    def test_chunks(self):
+        """This method tests compressing a text given in chunks"""
+        chunks = ["{", '"a": 1', ", ", '"b": 2', "}"]
+        for codec in compression.CODECS:
+            write_atomic(self.path, iter(chunks), compression=codec,
+                         level=1)
+            with open_text(self.path) as file:
+                self.assertEqual(json.load(file), {"a": 1, "b": 2})
+
+    def test_smaller(self):
+        """This method tests that the compressed files are smaller"""
+        text = json.dumps(self.objects)
+        for codec in ("gzip", "zlib", "lzma"):
+            data = b"".join(compress([text], codec))
+            self.assertLess(len(data), len(text) / 10)
+
+    def test_plain(self):
+        """This method tests that a file not compressed is read as it is"""
+        for text in ("{}", " {}", ""):
+            with open(self.path, "w") as file:
+                file.write(text)
+            self.assertEqual(detect(text.encode()), "none")
+            with open_binary(self.path) as file:
+                self.assertEqual(file.read(), text.encode())
+
+    def test_truncated(self):
+        """This method tests reading a compressed file cut short"""
+        data = b"".join(compress([json.dumps(self.objects)], "gzip"))
+        with open(self.path, "wb") as file:
+            file.write(data[:len(data) // 2])
+        with self.assertRaises(EOFError):
+            with open_text(self.path) as file:
+                file.read()
+
+    def test_check_compression(self):
+        """This method tests refusing an unknown codec or level"""
+        check_compression("gzip", 9)
+        check_compression("none")
+        with self.assertRaises(ValueError):
+            check_compression("zstd")
+        with self.assertRaises(ValueError):
+            check_compression("gzip", 10)
+        with self.assertRaises(ValueError):
+            check_compression("lzma", "1")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+"""This module contains the tests for the sqlite storage engine"""
+import unittest
+import os
+import sqlite3
+from models.engine.db_storage import DBStorage
+from models.city import City
+from models.place import Place
+from models.state import State
+from models.user import User
+
+
+class TestDBStorage(unittest.TestCase):
+    """This class contains the tests for the sqlite storage engine"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = DBStorage()
+        # with HBNB_TYPE_STORAGE=db it holds the objects of the other tests
+        self.storage.clear()
+        self.state = State()
+        self.state.name = "California"
+        self.storage.new(self.state)
+        self.city = City()
+        self.city.state_id = self.state.id
+        self.storage.new(self.city)
+        self.user = User()
+        self.user.email = "airbnb@mail.com"
+        self.storage.new(self.user)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.clear()
+        self.storage.close()
+        if os.path.exists("file.db"):
+            os.remove("file.db")
+
+    def reloaded(self):
+        """This method returns the objects read back from the database"""
+        self.storage.clear()
+        self.storage.close()
+        self.storage.reload()
+        return self.storage.all()
+
+    def test_all(self):
+        """This method tests the objects in storage"""
+        self.assertEqual(self.storage.count(), 3)
+        self.assertEqual(self.storage.count(City), 1)
+        self.assertEqual(self.storage.all("State"),
+                         {f"State.{self.state.id}": self.state})
+
+    def test_save_reload(self):
+        """This method tests that the objects come back from the database"""
+        self.storage.save()
+        objects = self.reloaded()
+        self.assertEqual(len(objects), 3)
+        city = objects[f"City.{self.city.id}"]
+        self.assertIsNot(city, self.city)
+        self.assertEqual(city.to_dict(), self.city.to_dict())
+
+    def test_tables(self):
+        """This method tests the tables and indexes of the database"""
+        self.storage.save()
+        connection = sqlite3.connect("file.db")
+        tables = {name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'")}
+        indexes = {name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index'")}
+        row = connection.execute('SELECT state_id FROM "City"').fetchone()
+        connection.close()
+        self.assertTrue({"BaseModel", "User", "City", "Place"} <= tables)
+        self.assertTrue({"City_state_id", "Place_city_id",
+                         "User_email"} <= indexes)
+        self.assertEqual(row, (self.state.id,))
+
+    def test_extra_attributes(self):
+        """This method tests the values kept in the extra column"""
+        place = Place()
+        place.amenity_ids = ["a", "b"]
+        place.number_rooms = "many"
+        place.pets = True
+        self.storage.new(place)
+        self.storage.save()
+        reloaded = self.reloaded()[f"Place.{place.id}"]
+        self.assertEqual(reloaded.amenity_ids, ["a", "b"])
+        self.assertEqual(reloaded.number_rooms, "many")
+        self.assertIs(reloaded.pets, True)
+        self.assertEqual(reloaded.to_dict(), place.to_dict())
+
+    def test_save_changes(self):
+        """This method tests saving updates and deletions"""
+        self.storage.save()
+        self.state.name = "Nevada"
+        self.storage.touch(self.state)
+        self.storage.delete(self.user)
+        self.storage.save()
+        objects = self.reloaded()
+        self.assertEqual(objects[f"State.{self.state.id}"].name, "Nevada")
+        self.assertNotIn(f"User.{self.user.id}", objects)
+
+    def test_failed_save(self):
+        """This method tests that a failed save writes nothing"""
+        self.storage.save()
+        self.state.name = "Nevada"
+        self.storage.touch(self.state)
+        place = Place()
+        place.number_rooms = 2 ** 64
+        self.storage.new(place)
+        with self.assertRaises(OverflowError):
+            self.storage.save()
+        self.storage.delete(place)
+        objects = self.reloaded()
+        self.assertEqual(objects[f"State.{self.state.id}"].name,
+                         "California")
+
+    def test_children(self):
+        """This method tests finding the children of an object"""
+        key = f"City.{self.city.id}"
+        self.assertEqual(list(self.storage.children(
+            State, self.state.id, City)), [key])
+        self.storage.save()
+        other = City()
+        other.state_id = self.state.id
+        self.storage.new(other)
+        self.city.state_id = "another"
+        self.storage.touch(self.city)
+        self.assertEqual(list(self.storage.children(
+            State, self.state.id, City)), [f"City.{other.id}"])
+        with self.assertRaises(ValueError):
+            self.storage.children(State, self.state.id, User)
+
+    def test_get_by(self):
+        """This method tests finding an object by a unique field"""
+        self.storage.save()
+        self.assertIs(self.storage.get_by(User, email="airbnb@mail.com"),
+                      self.user)
+        self.assertIsNone(self.storage.get_by(User, email="none@mail.com"))
+        with self.assertRaises(ValueError):
+            self.storage.get_by(User, first_name="Betty")
+
+
+if __name__ == "__main__":
+    unittest.main()
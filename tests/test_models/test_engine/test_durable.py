@@ -0,0 +1,92 @@
+#!/usr/bin/python3
+"""This module contains the tests for the crash-safe writes"""
+import unittest
+import os
+from unittest.mock import patch
+from models.engine import durable
+from models.engine.durable import GroupSync, check_durability, write_atomic
+
+
+class TestWriteAtomic(unittest.TestCase):
+    """This class contains the tests for the atomic writes"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.path = "test_durable.json"
+        with open(self.path, "w") as file:
+            file.write("{}")
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        for file_name in os.listdir("."):
+            if file_name.startswith(self.path):
+                os.remove(file_name)
+
+    def leftovers(self):
+        """This method returns the temporary files left behind"""
+        return [file_name for file_name in os.listdir(".")
+                if file_name.startswith(f"{self.path}.")]
+
+    def test_write(self):
+        """This method tests replacing a file at every durability"""
+        for durability in durable.DURABILITY:
+            write_atomic(self.path, f'{{"{durability}": 1}}', durability)
+            with open(self.path, "r") as file:
+                self.assertEqual(file.read(), f'{{"{durability}": 1}}')
+            self.assertEqual(self.leftovers(), [])
+        durable.group.sync()
+
+    def test_failed_write(self):
+        """This method tests that a failed write keeps the old file"""
+        with self.assertRaises(TypeError):
+            write_atomic(self.path, 42)
+        with open(self.path, "r") as file:
+            self.assertEqual(file.read(), "{}")
+        self.assertEqual(self.leftovers(), [])
+
+    def test_fsync(self):
+        """This method tests that the fsync durability syncs the file"""
+        with patch("models.engine.durable.os.fsync") as fsync:
+            write_atomic(self.path, "{}", "flush")
+            self.assertFalse(fsync.called)
+            write_atomic(self.path, "{}", "fsync")
+            self.assertTrue(fsync.called)
+
+    def test_check_durability(self):
+        """This method tests refusing an unknown durability"""
+        check_durability("group")
+        with self.assertRaises(ValueError):
+            check_durability("always")
+
+
+class TestGroupSync(unittest.TestCase):
+    """This class contains the tests for the group fsync"""
+
+    def test_schedule_sync(self):
+        """This method tests that the scheduled files are synced together"""
+        group = GroupSync()
+        with patch("models.engine.durable.fsync_path") as fsync_path:
+            group.schedule("a.json", 60)
+            group.schedule("b.json", 60)
+            timer = group.timer
+            self.assertIsNotNone(timer)
+            self.assertFalse(fsync_path.called)
+            group.sync()
+        self.assertTrue(timer.finished.is_set())
+        self.assertIsNone(group.timer)
+        self.assertEqual(group.paths, set())
+        synced = {call.args[0] for call in fsync_path.call_args_list}
+        self.assertEqual(synced, {".", "a.json", "b.json"})
+
+    def test_timer(self):
+        """This method tests that the timer runs the sync"""
+        group = GroupSync()
+        with patch("models.engine.durable.fsync_path") as fsync_path:
+            group.schedule("a.json", 0)
+            group.timer.join()
+        fsync_path.assert_any_call("a.json")
+        self.assertIsNone(group.timer)
+
+
+if __name__ == "__main__":
+    unittest.main()
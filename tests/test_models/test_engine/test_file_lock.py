@@ -0,0 +1,35 @@
+#!/usr/bin/python3
+"""This module contains the tests for the lock of a shared file storage"""
+import unittest
+import os
+from models.engine.file_lock import FileLock, read_generation
+
+
+class TestFileLock(unittest.TestCase):
+    """This class contains the tests for the file lock"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.path = "test_file_lock.lock"
+        self.lock = FileLock(self.path)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+    def test_generation(self):
+        """This method tests counting the generations"""
+        self.assertEqual(read_generation(self.path), 0)
+        with self.lock.hold() as lock:
+            self.assertEqual(lock.generation(), 0)
+            self.assertEqual(lock.bump(), 1)
+            self.assertEqual(lock.bump(), 2)
+        self.assertIsNone(self.lock.file)
+        self.assertEqual(read_generation(self.path), 2)
+        with self.lock.hold(shared=True) as lock:
+            self.assertEqual(lock.generation(), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,10 +2,35 @@
 """This module contains the test for the file storage class"""
 import unittest
 from models.engine.file_storage import FileStorage
+from models.engine.durable import write_atomic
+from models.engine.compression import detect
+from models.engine import parallel
+from models.engine.mapped_file import MappedFile
 from models.base_model import BaseModel
+from models.user import User
+from models.state import State
+from models.city import City
+from models.place import Place
+from models.review import Review
 from datetime import datetime
+from time import sleep
 import os
 import json
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+from unittest.mock import patch
+from zlib import crc32
+import models
+
+
+def setUpModule():
+    """This function skips these tests when models uses another engine,
+    the models report their changes to models.storage"""
+    if not isinstance(models.storage, FileStorage):
+        raise unittest.SkipTest("models.storage is not a FileStorage")
 
 
 class TestFileStorage(unittest.TestCase):
@@ -223,6 +248,1206 @@ class TestFileStorage(unittest.TestCase):
         self.assertIn(key, self.storage.all())
         self.assertDictEqual(self.storage.all()[key].to_dict(), model.to_dict())
 
+    def test_save_deleted_attribute(self):
+        """This method tests that deleting an attribute rewrites
+        the json of the object"""
+        model = BaseModel()
+        model.nick = "x"
+        model.save()
+        del model.nick
+        self.storage.save()
+        with open("file.json", "r") as file:
+            self.assertNotIn("nick", json.load(file)[
+                f"BaseModel.{model.id}"])
+
+    def test_save_serializes_only_modified_objects(self):
+        """This method tests that clean objects reuse their saved json"""
+        clean = BaseModel()
+        dirty = BaseModel()
+        self.storage.save()
+        dirty.name = "dirty"
+        with patch.object(BaseModel, "to_dict", autospec=True,
+                          side_effect=BaseModel.to_dict) as to_dict:
+            self.storage.save()
+        self.assertEqual([call.args[0] for call in to_dict.call_args_list],
+                         [dirty])
+        with open("file.json", "r") as file:
+            obj_dict = json.load(file)
+        self.assertDictEqual(obj_dict[f"BaseModel.{clean.id}"],
+                             clean.to_dict())
+        self.assertEqual(obj_dict[f"BaseModel.{dirty.id}"]["name"], "dirty")
+
+    def test_all_by_class(self):
+        """This method tests getting the objects of one class"""
+        user = User()
+        self.assertIn(f"User.{user.id}", self.storage.all(User))
+        self.assertIn(f"User.{user.id}", self.storage.all("User"))
+        self.assertNotIn(f"BaseModel.{self.model.id}", self.storage.all(User))
+        self.assertEqual(self.storage.all("NoClass"), {})
+        self.assertTrue(all(type(obj) is User
+                            for obj in self.storage.all(User).values()))
+
+    def test_count(self):
+        """This method tests counting the objects of a class"""
+        count = self.storage.count(User)
+        total = self.storage.count()
+        user = User()
+        self.assertEqual(self.storage.count(User), count + 1)
+        self.assertEqual(self.storage.count("User"), count + 1)
+        self.assertEqual(self.storage.count(), total + 1)
+        self.storage.delete(user)
+        self.assertEqual(self.storage.count(User), count)
+        self.assertEqual(self.storage.count(), total)
+        self.assertEqual(self.storage.count("NoClass"), 0)
+
+    def test_index_after_reload(self):
+        """This method tests that reload fills the class index"""
+        user = User()
+        self.storage.save()
+        self.storage.clear()
+        self.assertEqual(self.storage.count(User), 0)
+        self.storage.reload()
+        self.assertIn(f"User.{user.id}", self.storage.all(User))
+        self.assertEqual(self.storage.count(User), len(
+            [obj for obj in self.storage.all().values()
+             if type(obj) is User]))
+
+    def test_children(self):
+        """This method tests finding objects through their foreign keys"""
+        state = State()
+        city = City()
+        city.state_id = state.id
+        other = City()
+        self.assertEqual(self.storage.children(State, state.id, City),
+                         {f"City.{city.id}": city})
+        self.assertEqual(self.storage.children("State", "nope", "City"), {})
+        with self.assertRaises(ValueError):
+            self.storage.children(State, state.id, Review)
+
+    def test_children_follow_updates(self):
+        """This method tests that the index follows updates and deletes"""
+        user = User()
+        place = Place()
+        review = Review()
+        review.place_id = place.id
+        review.user_id = user.id
+        self.assertIn(f"Review.{review.id}",
+                      self.storage.children(Place, place.id, Review))
+        self.assertIn(f"Review.{review.id}",
+                      self.storage.children(User, user.id, Review))
+        review.place_id = "another"
+        self.assertEqual(self.storage.children(Place, place.id, Review), {})
+        self.assertIn(f"Review.{review.id}",
+                      self.storage.children(Place, "another", Review))
+        self.storage.delete(review)
+        self.assertEqual(self.storage.children(User, user.id, Review), {})
+
+    def test_children_after_reload(self):
+        """This method tests that reload fills the foreign key indexes"""
+        state = State()
+        city = City()
+        city.state_id = state.id
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        self.assertEqual(list(self.storage.children(State, state.id, City)),
+                         [f"City.{city.id}"])
+
+    def test_children_unhashable(self):
+        """This method tests that a foreign key holding a list
+        is left out of the index"""
+        state = State()
+        city = City()
+        city.state_id = state.id
+        city.state_id = ["a"]
+        self.assertEqual(self.storage.children(State, state.id, City), {})
+        self.assertEqual(self.storage.children(State, ["a"], City), {})
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        self.assertIn(f"City.{city.id}", self.storage.all(City))
+        city = self.storage.all(City)[f"City.{city.id}"]
+        city.state_id = state.id
+        self.assertEqual(list(self.storage.children(State, state.id, City)),
+                         [f"City.{city.id}"])
+
+    def test_get_by(self):
+        """This method tests finding a user by email"""
+        user = User()
+        user.email = "get_by@mail.com"
+        self.assertIs(self.storage.get_by(User, email="get_by@mail.com"),
+                      user)
+        user.email = "changed@mail.com"
+        self.assertIsNone(self.storage.get_by(User, email="get_by@mail.com"))
+        self.assertIs(self.storage.get_by("User", email="changed@mail.com"),
+                      user)
+        self.storage.delete(user)
+        self.assertIsNone(self.storage.get_by(User, email="changed@mail.com"))
+        with self.assertRaises(ValueError):
+            self.storage.get_by(User, first_name="Betty")
+
+    def test_unique_email(self):
+        """This method tests refusing two users with the same email"""
+        self.storage.configure(unique=True)
+        try:
+            user = User()
+            user.email = "unique@mail.com"
+            user.email = "unique@mail.com"
+            other = User()
+            with self.assertRaises(ValueError):
+                other.email = "unique@mail.com"
+            self.assertEqual(other.email, "")
+            copy = User(**user.to_dict())
+            copy.id = "another id"
+            with self.assertRaises(ValueError):
+                self.storage.new(copy)
+            copy.email = ["unique@mail.com"]
+            self.storage.new(copy)
+            self.assertIsNone(self.storage.get_by(
+                User, email=["unique@mail.com"]))
+        finally:
+            self.storage.configure(unique=False)
+        other.email = "unique@mail.com"
+        self.assertEqual(other.email, "unique@mail.com")
+
+    def test_durability(self):
+        """This method tests the durability option of the saves"""
+        with self.assertRaises(ValueError):
+            self.storage.configure(durability="always")
+        self.storage.configure(durability="fsync")
+        try:
+            with patch("models.engine.durable.os.fsync") as fsync:
+                self.storage.save()
+            self.assertTrue(fsync.called)
+        finally:
+            self.storage.configure(durability="flush")
+        self.assertFalse(any(file_name.endswith(".tmp")
+                             for file_name in os.listdir(".")))
+
+
+class TestFileStorageJournal(unittest.TestCase):
+    """This class contains the tests for the journal mode of the storage"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.storage.configure(journal=True, compact_ratio=None)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(journal=False, compact_ratio=1.0)
+        self.storage.save()
+        for path in ("file.json", "file.json.journal"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_appends_to_journal(self):
+        """This method tests that save only appends the changed object"""
+        model = BaseModel()
+        model.save()
+        with open("file.json.journal", "r") as file:
+            lines = file.readlines()
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(json.loads(lines[0]),
+                         ["put", f"BaseModel.{model.id}", model.to_dict()])
+
+    def test_reload_replays_journal(self):
+        """This method tests that reload applies the journal"""
+        model = BaseModel()
+        model.save()
+        model.name = "model"
+        model.save()
+        gone = BaseModel()
+        gone.save()
+        self.storage.delete(gone)
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        key = f"BaseModel.{model.id}"
+        self.assertIn(key, self.storage.all())
+        self.assertEqual(self.storage.all()[key].name, "model")
+        self.assertNotIn(f"BaseModel.{gone.id}", self.storage.all())
+
+    def test_delete_attribute(self):
+        """This method tests that deleting an attribute is journaled"""
+        model = BaseModel()
+        model.nick = "x"
+        model.save()
+        del model.nick
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        self.assertNotIn("nick", self.storage.all()[
+            f"BaseModel.{model.id}"].to_dict())
+
+    def test_full_save_clears_journal(self):
+        """This method tests that rewriting file.json drops the journal"""
+        model = BaseModel()
+        model.save()
+        self.storage.configure(journal=False)
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json.journal"))
+        with open("file.json", "r") as file:
+            self.assertIn(f"BaseModel.{model.id}", json.load(file))
+
+    def test_compact(self):
+        """This method tests folding the journal into file.json"""
+        model = BaseModel()
+        model.save()
+        gone = BaseModel()
+        gone.save()
+        self.storage.delete(gone)
+        self.storage.save()
+        self.storage.compact(wait=True)
+        self.assertFalse(os.path.exists("file.json.journal"))
+        self.assertFalse(os.path.exists("file.json.journal.compacting"))
+        with open("file.json", "r") as file:
+            obj_dict = json.load(file)
+        self.assertDictEqual(obj_dict[f"BaseModel.{model.id}"],
+                             model.to_dict())
+        self.assertNotIn(f"BaseModel.{gone.id}", obj_dict)
+
+    def test_compact_size_threshold(self):
+        """This method tests that a big journal starts a compaction"""
+        self.storage.configure(compact_size=1)
+        try:
+            model = BaseModel()
+            model.save()
+            self.storage.wait_compaction()
+        finally:
+            self.storage.configure(compact_size=16 * 1024 * 1024)
+        self.assertFalse(os.path.exists("file.json.journal"))
+        with open("file.json", "r") as file:
+            self.assertIn(f"BaseModel.{model.id}", json.load(file))
+
+    def test_reload_after_interrupted_compaction(self):
+        """This method tests that a frozen journal is still replayed"""
+        model = BaseModel()
+        model.save()
+        os.replace("file.json.journal", "file.json.journal.compacting")
+        self.storage.clear()
+        self.storage.reload()
+        self.assertIn(f"BaseModel.{model.id}", self.storage.all())
+
+    def test_setattr_is_journaled(self):
+        """This method tests that assigning an attribute marks the model"""
+        model = BaseModel()
+        model.save()
+        model.name = "model"
+        self.storage.save()
+        with open("file.json.journal", "r") as file:
+            record = json.loads(file.readlines()[-1])
+        self.assertEqual(record[2]["name"], "model")
+
+    def test_unknown_option(self):
+        """This method tests that unknown options are rejected"""
+        with self.assertRaises(ValueError):
+            self.storage.configure(journaling=True)
+
+
+class TestFileStorageLazy(unittest.TestCase):
+    """This class contains the tests for the lazy mode of the storage"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.user = User()
+        self.user.email = f"{self.user.id}@mail.com"
+        self.model = BaseModel()
+        self.storage.save()
+        self.total = self.storage.count()
+        self.storage.clear()
+        self.storage.configure(lazy=True)
+        self.storage.reload()
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(lazy=False)
+        self.storage.all().materialize()
+        if os.path.exists("file.json"):
+            os.remove("file.json")
+
+    def test_reload_builds_nothing(self):
+        """This method tests that reload keeps the saved dicts"""
+        objects = self.storage.all()
+        self.assertEqual(dict.__len__(objects), 0)
+        self.assertEqual(len(objects), self.total)
+        self.assertEqual(self.storage.count(), self.total)
+        self.assertGreaterEqual(self.storage.count(User), 1)
+        self.assertIn(f"User.{self.user.id}", objects)
+
+    def test_access_builds_one(self):
+        """This method tests that reading a key builds only its model"""
+        key = f"BaseModel.{self.model.id}"
+        model = self.storage.all()[key]
+        self.assertIsInstance(model, BaseModel)
+        self.assertDictEqual(model.to_dict(), self.model.to_dict())
+        self.assertIs(self.storage.all()[key], model)
+        self.assertEqual(dict.__len__(self.storage.all()), 1)
+        self.assertEqual(len(self.storage.all()), self.total)
+
+    def test_iteration_builds_all(self):
+        """This method tests that iterating builds every model"""
+        keys = list(self.storage.all().values())
+        self.assertEqual(len(keys), self.total)
+        self.assertEqual(dict.__len__(self.storage.all()), self.total)
+
+    def test_indexes(self):
+        """This method tests the indexes in lazy mode"""
+        self.assertIn(f"User.{self.user.id}", self.storage.all(User))
+        found = self.storage.get_by(User, email=f"{self.user.id}@mail.com")
+        self.assertEqual(found.id, self.user.id)
+
+    def test_save_keeps_unbuilt_objects(self):
+        """This method tests that saving writes back the saved dicts"""
+        self.storage.save()
+        with open("file.json", "r") as file:
+            obj_dict = json.load(file)
+        self.assertEqual(len(obj_dict), self.total)
+        self.assertDictEqual(obj_dict[f"User.{self.user.id}"],
+                             self.user.to_dict())
+
+    def test_delete(self):
+        """This method tests deleting an object in lazy mode"""
+        key = f"BaseModel.{self.model.id}"
+        self.storage.delete(self.storage.all()[key])
+        self.assertNotIn(key, self.storage.all())
+        self.assertEqual(self.storage.count(), self.total - 1)
+
+
+class TestFileStorageShards(unittest.TestCase):
+    """This class contains the tests for the per class files of the storage"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.users = [User() for i in range(4)]
+        self.place = Place()
+        self.storage.save()
+        self.storage.configure(shards=2)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(shards=None)
+        shutil.rmtree("file.json.d", ignore_errors=True)
+        if os.path.exists("file.json"):
+            os.remove("file.json")
+
+    def shard_files(self, name):
+        """This method returns the shard files of a class name"""
+        return sorted(file_name for file_name in os.listdir("file.json.d")
+                      if file_name.split(".")[0] == name)
+
+    def test_save_writes_shards(self):
+        """This method tests that every class has its own files"""
+        self.storage.save()
+        for user in self.users:
+            shard = crc32(user.id.encode()) % 2
+            with open(f"file.json.d/User.{shard}.json", "r") as file:
+                obj_dict = json.load(file)
+            self.assertEqual(obj_dict[f"User.{user.id}"], user.to_dict())
+        saved = {}
+        for file_name in os.listdir("file.json.d"):
+            with open(f"file.json.d/{file_name}", "r") as file:
+                saved.update(json.load(file))
+        self.assertEqual(len(saved), self.storage.count())
+
+    def test_first_save_removes_file(self):
+        """This method tests that the first sharded save removes
+        file.json once its objects are in the shards"""
+        self.assertTrue(os.path.exists("file.json"))
+        self.storage.save()
+        self.assertFalse(os.path.exists("file.json"))
+        self.assertFalse(os.path.exists("file.json.idx"))
+        self.storage.clear()
+        self.storage.reload()
+        self.assertIn(f"Place.{self.place.id}", self.storage.all())
+
+    def test_save_rewrites_dirty_shards(self):
+        """This method tests that only the modified shards are written"""
+        self.storage.save()
+        for file_name in self.shard_files("Place"):
+            os.remove(f"file.json.d/{file_name}")
+        self.users[0].first_name = "Betty"
+        self.storage.save()
+        self.assertEqual(self.shard_files("Place"), [])
+        shard = crc32(self.users[0].id.encode()) % 2
+        with open(f"file.json.d/User.{shard}.json", "r") as file:
+            obj_dict = json.load(file)
+        self.assertEqual(obj_dict[f"User.{self.users[0].id}"]["first_name"],
+                         "Betty")
+
+    def test_reload_selected_classes(self):
+        """This method tests reading the files of some classes only"""
+        self.storage.save()
+        users = self.storage.count(User)
+        places = self.storage.count(Place)
+        self.storage.clear()
+        self.storage.reload([User])
+        self.assertEqual(self.storage.count(User), users)
+        self.assertEqual(self.storage.count(Place), 0)
+        self.assertEqual(self.storage.count(), users)
+        # saving a class not read yet keeps its saved objects
+        Place()
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        self.assertIn(f"Place.{self.place.id}", self.storage.all())
+        self.assertEqual(self.storage.count(Place), places + 1)
+
+    def test_change_shards(self):
+        """This method tests that the files follow the shards option"""
+        self.storage.save()
+        self.storage.configure(shards=1)
+        self.storage.clear()
+        self.storage.reload()
+        self.storage.save()
+        self.assertEqual(self.shard_files("User"), ["User.json"])
+        with open("file.json.d/User.json", "r") as file:
+            self.assertEqual(len(json.load(file)), self.storage.count(User))
+
+    def test_options(self):
+        """This method tests the options the shards cannot be used with"""
+        self.storage.configure(shards=None)
+        with self.assertRaises(ValueError):
+            self.storage.reload([User])
+        with self.assertRaises(ValueError):
+            self.storage.configure(journal=True, shards=2)
+
+
+class TestFileStorageBatch(unittest.TestCase):
+    """This class contains the tests for the deferred saves of the storage"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.storage.save()
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(commit_size=None, commit_delay=None)
+        self.storage.flush()
+        if os.path.exists("file.json"):
+            os.remove("file.json")
+
+    def writes(self):
+        """This method counts the writes of the storage files"""
+        return patch("models.engine.file_storage.write_atomic",
+                     wraps=write_atomic)
+
+    def test_batch(self):
+        """This method tests that a batch writes the file once"""
+        with self.writes() as write:
+            with self.storage.batch():
+                users = [User() for i in range(50)]
+                for user in users:
+                    user.save()
+                self.assertFalse(write.called)
+            self.assertEqual(write.call_count, 1)
+        with open("file.json", "r") as file:
+            obj_dict = json.load(file)
+        for user in users:
+            self.assertIn(f"User.{user.id}", obj_dict)
+
+    def test_nested_batch(self):
+        """This method tests that the outermost batch writes the file"""
+        with self.writes() as write:
+            with self.storage.batch():
+                with self.storage.batch():
+                    User().save()
+                self.assertFalse(write.called)
+                User().save()
+            self.assertEqual(write.call_count, 1)
+
+    def test_batch_error(self):
+        """This method tests that a failed batch writes what was saved"""
+        with self.assertRaises(KeyError):
+            with self.storage.batch():
+                user = User()
+                user.save()
+                raise KeyError("User")
+        with open("file.json", "r") as file:
+            self.assertIn(f"User.{user.id}", json.load(file))
+
+    def test_batch_without_save(self):
+        """This method tests that a batch without save writes nothing"""
+        with self.writes() as write:
+            with self.storage.batch():
+                pass
+        self.assertFalse(write.called)
+
+    def test_commit_size(self):
+        """This method tests writing once enough objects changed"""
+        self.storage.configure(commit_size=10)
+        with self.writes() as write:
+            for i in range(25):
+                User().save()
+            self.assertEqual(write.call_count, 2)
+            self.storage.flush()
+            self.assertEqual(write.call_count, 3)
+
+    def test_commit_delay(self):
+        """This method tests writing once enough time passed"""
+        self.storage.configure(commit_delay=3600)
+        with self.writes() as write:
+            User().save()
+            User().save()
+            self.assertFalse(write.called)
+            self.storage.configure(commit_delay=0)
+            User().save()
+            self.assertEqual(write.call_count, 1)
+
+    def test_commit_delay_timer(self):
+        """This method tests that the deferred saves are written
+        after the delay without another save"""
+        self.storage.configure(commit_delay=0.05)
+        user = User()
+        user.save()
+        with open("file.json", "r") as file:
+            self.assertNotIn(f"User.{user.id}", json.load(file))
+        sleep(0.3)
+        with open("file.json", "r") as file:
+            self.assertIn(f"User.{user.id}", json.load(file))
+
+    def test_commit_delay_flush(self):
+        """This method tests that a flush stops the timer"""
+        self.storage.configure(commit_delay=0.05)
+        User().save()
+        with self.writes() as write:
+            self.storage.flush()
+            sleep(0.3)
+        self.assertEqual(write.call_count, 1)
+
+    def test_commit_delay_timer_lock(self):
+        """This method tests that a new object waits for the write
+        the timer is making from its thread"""
+        self.storage.configure(commit_delay=0.05)
+        User().save()
+        started = threading.Event()
+        events = []
+
+        def slow_write(*args, **kwargs):
+            """This function writes the file after a while"""
+            started.set()
+            sleep(0.2)
+            write_atomic(*args, **kwargs)
+            events.append("written")
+
+        with patch("models.engine.file_storage.write_atomic",
+                   side_effect=slow_write):
+            self.assertTrue(started.wait(5))
+            user = User()
+            events.append("new")
+            user.save()
+            self.storage.flush()
+        self.assertEqual(events[:2], ["written", "new"])
+        with open("file.json", "r") as file:
+            self.assertIn(f"User.{user.id}", json.load(file))
+
+
+class TestFileStorageTransaction(unittest.TestCase):
+    """This class contains the tests for the transactions of the storage"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.place = Place()
+        self.place.name = "Home"
+        self.review = Review()
+        self.review.place_id = self.place.id
+        self.storage.save()
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        if os.path.exists("file.json"):
+            os.remove("file.json")
+
+    def saved(self):
+        """This method returns the content of file.json"""
+        with open("file.json", "r") as file:
+            return json.load(file)
+
+    def test_commit(self):
+        """This method tests that a transaction is written once"""
+        with patch("models.engine.file_storage.write_atomic",
+                   wraps=write_atomic) as write:
+            with self.storage.transaction():
+                place = Place()
+                review = Review()
+                review.place_id = place.id
+                review.save()
+                self.place.name = "House"
+                self.assertFalse(write.called)
+            self.assertEqual(write.call_count, 1)
+        saved = self.saved()
+        self.assertIn(f"Place.{place.id}", saved)
+        self.assertEqual(saved[f"Review.{review.id}"]["place_id"], place.id)
+        self.assertEqual(saved[f"Place.{self.place.id}"]["name"], "House")
+
+    def test_rollback_deleted_attribute(self):
+        """This method tests that a deleted attribute is put back"""
+        with self.assertRaises(KeyError):
+            with self.storage.transaction():
+                del self.place.name
+                raise KeyError("Place")
+        self.assertEqual(self.place.to_dict()["name"], "Home")
+
+    def test_rollback(self):
+        """This method tests that a failed transaction changes nothing"""
+        count = self.storage.count()
+        with self.assertRaises(KeyError):
+            with self.storage.transaction():
+                place = Place()
+                self.place.name = "House"
+                self.place.pets = True
+                self.review.place_id = place.id
+                self.storage.delete(self.review)
+                self.storage.save()
+                raise KeyError("Place")
+        self.assertEqual(self.storage.count(), count)
+        self.assertNotIn(f"Place.{place.id}", self.storage.all())
+        self.assertEqual(self.place.name, "Home")
+        self.assertFalse(hasattr(self.place, "pets"))
+        self.assertIs(self.storage.all()[f"Review.{self.review.id}"],
+                      self.review)
+        self.assertEqual(self.review.place_id, self.place.id)
+        self.assertEqual(list(self.storage.children(
+            Place, self.place.id, Review)), [f"Review.{self.review.id}"])
+        self.assertNotIn(f"Place.{place.id}", self.saved())
+        # nothing is left to write for the rolled back changes
+        self.storage.save()
+        self.assertEqual(self.saved()[f"Place.{self.place.id}"]["name"],
+                         "Home")
+
+    def test_nested(self):
+        """This method tests that an inner transaction joins the outer one"""
+        with self.assertRaises(KeyError):
+            with self.storage.transaction():
+                with self.storage.transaction():
+                    self.place.name = "House"
+                raise KeyError("Place")
+        self.assertEqual(self.place.name, "Home")
+
+    def test_rollback_unique(self):
+        """This method tests a rollback of swapped unique values"""
+        self.storage.configure(unique=True)
+        try:
+            user = User()
+            user.email = f"{user.id}@mail.com"
+            other = User()
+            other.email = f"{other.id}@mail.com"
+            emails = (user.email, other.email)
+            with self.assertRaises(ValueError):
+                with self.storage.transaction():
+                    user.email = "swap@mail.com"
+                    other.email = emails[0]
+                    user.email = emails[1]
+                    User().email = emails[1]
+            self.assertEqual((user.email, other.email), emails)
+            self.assertIs(self.storage.get_by(User, email=emails[0]), user)
+            self.assertIsNone(self.storage.get_by(User,
+                                                  email="swap@mail.com"))
+        finally:
+            self.storage.configure(unique=False)
+
+
+class TestFileStorageBackground(unittest.TestCase):
+    """This class contains the tests for the background writes"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.storage.configure(background=True)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.flush()
+        self.storage.configure(background=False)
+        if os.path.exists("file.json"):
+            os.remove("file.json")
+
+    def saved(self):
+        """This method returns the content of file.json"""
+        with open("file.json", "r") as file:
+            return json.load(file)
+
+    def test_flush(self):
+        """This method tests that flush waits for the writes"""
+        users = []
+        for i in range(20):
+            users.append(User())
+            users[-1].save()
+        self.storage.flush()
+        saved = self.saved()
+        for user in users:
+            self.assertEqual(saved[f"User.{user.id}"], user.to_dict())
+
+    def test_snapshot(self):
+        """This method tests that a write holds the state at save()"""
+        user = User()
+        user.first_name = "Betty"
+        with patch("models.engine.file_storage.write_atomic") as write:
+            self.storage.save()
+            user.first_name = "John"
+            self.storage.flush()
+        text = "".join(write.call_args.args[1])
+        self.assertEqual(json.loads(text)[f"User.{user.id}"]["first_name"],
+                         "Betty")
+        self.storage.save()
+        self.storage.flush()
+        self.assertEqual(self.saved()[f"User.{user.id}"]["first_name"],
+                         "John")
+
+    def test_cache(self):
+        """This method tests that an older write does not hide a change"""
+        user = User()
+        self.storage.save()
+        user.first_name = "Betty"
+        self.storage.save()
+        self.storage.flush()
+        # user is not modified, its json comes from the cache
+        self.storage.save()
+        self.storage.flush()
+        self.assertEqual(self.saved()[f"User.{user.id}"]["first_name"],
+                         "Betty")
+
+    def test_error(self):
+        """This method tests that flush raises the error of a write"""
+        User().save()
+        with patch("models.engine.file_storage.write_atomic",
+                   side_effect=OSError("disk full")):
+            self.storage.save()
+            with self.assertRaises(OSError):
+                self.storage.flush()
+
+
+class TestFileStorageShared(unittest.TestCase):
+    """This class contains the tests for a file.json shared by processes"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.storage.save()
+        self.storage.configure(shared=True)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(shared=False)
+        for path in ("file.json", "file.json.lock"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def other(self, code, wait=True):
+        """This method runs code in another process sharing file.json"""
+        env = dict(os.environ, HBNB_FILE_SHARED="1")
+        script = "from models import storage\n" \
+            "from models.user import User\n" + code
+        process = subprocess.Popen([sys.executable, "-c", script], env=env,
+                                   stdout=subprocess.PIPE, text=True)
+        if wait:
+            return process.communicate()[0].strip()
+        return process
+
+    def test_refresh(self):
+        """This method tests seeing the saves of another process"""
+        self.storage.all()
+        obj_id = self.other("user = User()\nuser.first_name = 'Betty'\n"
+                            "user.save()\nprint(user.id)")
+        user = self.storage.all()[f"User.{obj_id}"]
+        self.assertEqual(user.first_name, "Betty")
+        self.other(f"user = storage.all()['User.{obj_id}']\n"
+                   "user.first_name = 'John'\nuser.save()")
+        self.assertEqual(self.storage.all()[f"User.{obj_id}"].first_name,
+                         "John")
+        self.other(f"storage.delete(storage.all()['User.{obj_id}'])\n"
+                   "storage.save()")
+        self.assertNotIn(f"User.{obj_id}", self.storage.all())
+
+    def test_no_change(self):
+        """This method tests that file.json is read only when it changed"""
+        self.storage.all()
+        with patch("models.engine.file_storage.iter_items") as items:
+            self.storage.all()
+            self.storage.count(User)
+        self.assertFalse(items.called)
+
+    def test_save_merges(self):
+        """This method tests that a save keeps the saves of another process"""
+        self.storage.all()
+        user = User()
+        obj_id = self.other("user = User()\nuser.save()\nprint(user.id)")
+        self.storage.save()
+        with open("file.json", "r") as file:
+            saved = json.load(file)
+        self.assertIn(f"User.{user.id}", saved)
+        self.assertIn(f"User.{obj_id}", saved)
+
+    def test_concurrent_saves(self):
+        """This method tests processes saving at the same time"""
+        code = "for i in range(20):\n    User().save()\n"
+        processes = [self.other(code, wait=False) for i in range(3)]
+        for process in processes:
+            process.communicate()
+        count = self.storage.count(User)
+        with open("file.json", "r") as file:
+            saved = json.load(file)
+        self.assertEqual(len([key for key in saved
+                              if key.startswith("User.")]), count)
+        self.assertGreaterEqual(count, 60)
+
+    def test_options(self):
+        """This method tests the options shared cannot be used with"""
+        with self.assertRaises(ValueError):
+            self.storage.configure(journal=True)
+        with self.assertRaises(ValueError):
+            self.storage.configure(background=True)
+
+
+class TestFileStorageBinary(unittest.TestCase):
+    """This class contains the tests for the binary format of the storage"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.storage.configure(format="binary")
+        self.place = Place()
+        self.place.number_rooms = 3
+        self.place.amenity_ids = ["a", "b"]
+        self.storage.save()
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(format="json")
+        self.storage.save()
+        for path in ("file.json", "file.hbnb"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_save_reload(self):
+        """This method tests that the objects come back from file.hbnb"""
+        self.assertTrue(os.path.exists("file.hbnb"))
+        expected = {key: obj.to_dict() for key, obj
+                    in self.storage.all().items()}
+        self.storage.clear()
+        self.storage.reload()
+        self.assertEqual({key: obj.to_dict() for key, obj
+                          in self.storage.all().items()}, expected)
+        place = self.storage.all()[f"Place.{self.place.id}"]
+        self.assertIsNot(place, self.place)
+        self.assertEqual(place.to_dict(), self.place.to_dict())
+        self.assertIsInstance(place.created_at, datetime)
+
+    def test_keys(self):
+        """This method tests that objects whose id changed after they
+        were added keep their key, even when they share an id"""
+        users = {}
+        for i in range(2):
+            user = User()
+            users[f"User.{user.id}"] = user
+            user.id = self.place.id
+        self.storage.save()
+        self.storage.clear()
+        self.storage.reload()
+        for key, user in users.items():
+            self.assertEqual(self.storage.all()[key].to_dict(),
+                             user.to_dict())
+
+    def test_from_json(self):
+        """This method tests that file.json is read until the first
+        binary save"""
+        self.storage.configure(format="json")
+        self.storage.save()
+        os.remove("file.hbnb")
+        self.storage.configure(format="binary")
+        count = self.storage.count()
+        self.storage.clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(), count)
+
+    def test_options(self):
+        """This method tests the options the binary format cannot be used
+        with"""
+        with self.assertRaises(ValueError):
+            self.storage.configure(format="xml")
+        with self.assertRaises(ValueError):
+            self.storage.configure(journal=True)
+
+
+class TestFileStorageCompression(unittest.TestCase):
+    """This class contains the tests for the compressed storage files"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.user = User()
+        self.user.first_name = "Zoé"
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(compression="none", compression_level=None,
+                               format="json")
+        self.storage.save()
+        for path in ("file.json", "file.hbnb"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def reloaded(self):
+        """This method returns the objects read back from the file"""
+        self.storage.clear()
+        self.storage.reload()
+        return {key: obj.to_dict() for key, obj in self.storage.all().items()}
+
+    def test_save_reload(self):
+        """This method tests that a compressed file.json is read back"""
+        expected = {key: obj.to_dict() for key, obj
+                    in self.storage.all().items()}
+        for codec in ("gzip", "zlib", "lzma"):
+            self.storage.configure(compression=codec, compression_level=1)
+            self.storage.save()
+            with open("file.json", "rb") as file:
+                self.assertEqual(detect(file.read(6)), codec)
+            self.assertEqual(self.reloaded(), expected)
+
+    def test_change_codec(self):
+        """This method tests that the codec is found from the file"""
+        self.storage.configure(compression="gzip")
+        self.storage.save()
+        self.storage.configure(compression="none")
+        self.assertIn(f"User.{self.user.id}", self.reloaded())
+
+    def test_binary(self):
+        """This method tests compressing the binary format"""
+        self.storage.configure(format="binary", compression="lzma")
+        self.storage.save()
+        with open("file.hbnb", "rb") as file:
+            self.assertEqual(detect(file.read(6)), "lzma")
+        reloaded = self.reloaded()
+        self.assertEqual(reloaded[f"User.{self.user.id}"],
+                         self.user.to_dict())
+
+    def test_options(self):
+        """This method tests refusing an unknown codec or level"""
+        with self.assertRaises(ValueError):
+            self.storage.configure(compression="zstd")
+        with self.assertRaises(ValueError):
+            self.storage.configure(compression_level=11)
+
+
+class TestFileStorageMapped(unittest.TestCase):
+    """This class contains the tests for the mapped file.json"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.storage.configure(mapped=True)
+        self.user = User()
+        self.user.first_name = "Zoé"
+        self.place = Place()
+        self.place.amenity_ids = ["a", "b"]
+        self.storage.save()
+        self.saved = {key: obj.to_dict() for key, obj
+                      in self.storage.all().items()}
+        self.storage.clear()
+        self.storage.reload()
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(mapped=False)
+        self.storage.all().materialize()
+        for path in ("file.json", "file.json.idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def test_reload_builds_nothing(self):
+        """This method tests that reload only maps file.json"""
+        objects = self.storage.all()
+        self.assertTrue(os.path.exists("file.json.idx"))
+        self.assertEqual(dict.__len__(objects), 0)
+        self.assertEqual(len(objects), len(self.saved))
+        self.assertEqual(self.storage.count(Place), sum(
+            key.startswith("Place.") for key in self.saved))
+
+    def test_show_one(self):
+        """This method tests that one object is built from the file"""
+        key = f"User.{self.user.id}"
+        user = self.storage.all()[key]
+        self.assertEqual(user.to_dict(), self.saved[key])
+        self.assertEqual(dict.__len__(self.storage.all()), 1)
+
+    def test_save_reload(self):
+        """This method tests saving objects still in the mapped file"""
+        key = f"Place.{self.place.id}"
+        self.storage.all()[key].number_rooms = 3
+        self.saved[key] = self.storage.all()[key].to_dict()
+        self.storage.save()
+        with open("file.json", "r") as file:
+            self.assertEqual(json.load(file), self.saved)
+        self.storage.clear()
+        self.storage.reload()
+        self.assertEqual({key: obj.to_dict() for key, obj
+                          in self.storage.all().items()}, self.saved)
+
+    def test_stale_index(self):
+        """This method tests reloading a file.json written without
+        its index"""
+        self.storage.configure(mapped=False)
+        User().save()
+        self.storage.configure(mapped=True)
+        count = self.storage.count()
+        self.storage.clear()
+        self.storage.reload()
+        self.assertEqual(self.storage.count(), count)
+
+    def test_options(self):
+        """This method tests the options a mapped file.json cannot be
+        used with"""
+        with self.assertRaises(ValueError):
+            self.storage.configure(compression="gzip")
+        with self.assertRaises(ValueError):
+            self.storage.configure(shards=2)
+
+
+class TestFileStorageWorkers(unittest.TestCase):
+    """This class contains the tests for the parallel reload and save"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.storage = FileStorage()
+        self.storage.configure(workers=2)
+        self.users = [User() for i in range(10)]
+        self.users[0].first_name = "Zoé"
+        self.place = Place()
+        self.place.amenity_ids = ["a", "b"]
+        self.storage.save()
+        self.saved = {key: obj.to_dict() for key, obj
+                      in self.storage.all().items()}
+        self.storage.clear()
+        patcher = patch("models.engine.parallel.MIN_CHUNK", 1)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.storage.configure(workers=None, shards=None)
+        self.storage.save()
+        for path in ("file.json", "file.json.idx"):
+            if os.path.exists(path):
+                os.remove(path)
+        shutil.rmtree("file.json.d", ignore_errors=True)
+
+    def reloaded(self):
+        """This method returns the objects read back from the files"""
+        self.storage.clear()
+        self.storage.reload()
+        return {key: obj.to_dict() for key, obj in self.storage.all().items()}
+
+    @unittest.skipUnless(parallel.can_fork(), "the pool needs fork")
+    def test_reload(self):
+        """This method tests building the models in processes"""
+        self.assertTrue(os.path.exists("file.json.idx"))
+        with patch("models.engine.parallel._pool",
+                   wraps=parallel._pool) as pool:
+            self.assertEqual(self.reloaded(), self.saved)
+        pool.assert_called_once_with(2)
+        self.assertEqual(list(self.storage.all()), list(self.saved))
+        user = self.storage.all()[f"User.{self.users[0].id}"]
+        self.assertIsInstance(user, User)
+        self.assertIsInstance(user.created_at, datetime)
+        self.assertEqual(self.storage.count(User), sum(
+            key.startswith("User.") for key in self.saved))
+
+    def test_reload_shards(self):
+        """This method tests building the models of each shard
+        in a process"""
+        self.storage.reload()
+        self.storage.configure(shards=2)
+        self.storage.save()
+        self.assertEqual(self.reloaded(), self.saved)
+
+    def test_compressed(self):
+        """This method tests reading a compressed file.json
+        in this process"""
+        self.storage.reload()
+        self.storage.configure(compression="gzip")
+        self.storage.save()
+        self.storage.configure(compression="none")
+        with patch("models.engine.parallel._pool") as pool:
+            self.assertEqual(self.reloaded(), self.saved)
+        pool.assert_not_called()
+
+    @unittest.skipUnless(parallel.can_fork(), "the pool needs fork")
+    def test_save(self):
+        """This method tests dumping the models in processes"""
+        self.storage.reload()
+        objects = self.storage.all()
+        for key in list(objects)[:6]:
+            objects[key].last_name = "Doe"
+        User().first_name = "Betty"
+        expected = {key: obj.to_dict() for key, obj in objects.items()}
+        with patch("models.engine.parallel.get_context",
+                   wraps=parallel.get_context) as context:
+            self.storage.save()
+        context.assert_called_once_with("fork")
+        with open("file.json", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), expected)
+        self.assertEqual(list(MappedFile("file.json").keys), list(expected))
+        self.assertEqual(self.reloaded(), expected)
+
+    @unittest.skipUnless(parallel.can_fork(), "the pool needs fork")
+    def test_save_background(self):
+        """This method tests that a save dumps the models
+        as they are when it is called"""
+        self.storage.reload()
+        self.storage.configure(background=True)
+        user = self.storage.all()[f"User.{self.users[0].id}"]
+        expected = {key: obj.to_dict() for key, obj
+                    in self.storage.all().items()}
+        try:
+            self.storage.save()
+            user.first_name = "Betty"
+            self.storage.flush()
+        finally:
+            self.storage.configure(background=False)
+        with open("file.json", encoding="utf-8") as file:
+            self.assertEqual(json.load(file), expected)
+
+    @unittest.skipUnless(parallel.can_fork(), "the pool needs fork")
+    def test_import(self):
+        """This method tests that importing models with the workers option
+        builds a large file.json in the processes of the pool"""
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        # enough objects for a pool of 2 processes with the real MIN_CHUNK
+        count = 10000
+        objects = {f"User.{i}": {"id": str(i), "__class__": "User",
+                                 "created_at": "2024-03-11T12:00:00",
+                                 "updated_at": "2024-03-11T12:00:00"}
+                   for i in range(count)}
+        with open(os.path.join(directory, "file.json"), "w") as file:
+            json.dump(objects, file)
+        env = dict(os.environ, HBNB_FILE_WORKERS="2",
+                   PYTHONPATH=os.getcwd())
+        # the processes of the pool are waited for, so their time counts
+        script = "import os\n" \
+            "import models\n" \
+            "print(models.storage.count())\n" \
+            "print(sum(os.times()[2:4]) > 0)\n" \
+            "models.storage.reload()\n" \
+            "print(models.storage.count())"
+        process = subprocess.run([sys.executable, "-c", script], env=env,
+                                 cwd=directory, capture_output=True,
+                                 text=True, timeout=60)
+        self.assertEqual(process.stdout.split(),
+                         [str(count), "True", str(count)])
+
+    def test_options(self):
+        """This method tests refusing the options the workers
+        do not support"""
+        for options in ({"workers": 0}, {"workers": "2"}, {"lazy": True},
+                        {"mapped": True}, {"format": "binary"}):
+            with self.assertRaises(ValueError):
+                self.storage.configure(**options)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+"""This module contains the tests for the journal of the file storage"""
+import unittest
+import os
+import json
+from models.engine.compression import detect
+from models.engine.journal import Journal, compact
+
+
+class TestJournal(unittest.TestCase):
+    """This class contains the tests for the journal class"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.journal = Journal("test_journal.journal")
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        self.journal.clear()
+        self.journal.frozen().clear()
+        if os.path.exists("test_journal.json"):
+            os.remove("test_journal.json")
+
+    def test_replay_empty(self):
+        """This method tests replaying a journal that does not exist"""
+        self.assertEqual(list(self.journal.replay()), [])
+        self.assertEqual(self.journal.size(), 0)
+
+    def test_append_replay(self):
+        """This method tests that records are replayed in order"""
+        self.journal.append([["put", "User.1", {"id": "1"}]])
+        self.journal.append([["del", "User.1"], ["put", "User.2", {}]])
+        self.assertEqual(list(self.journal.replay()), [
+            ("put", "User.1", {"id": "1"}),
+            ("del", "User.1", None),
+            ("put", "User.2", {})])
+        self.assertGreater(self.journal.size(), 0)
+
+    def test_torn_last_line(self):
+        """This method tests that a half written record is skipped"""
+        self.journal.append([["put", "User.1", {"id": "1"}]])
+        with open(self.journal.path, "a") as file:
+            file.write('["put","User.2",{"id"')
+        self.assertEqual(list(self.journal.replay()),
+                         [("put", "User.1", {"id": "1"})])
+
+    def test_clear(self):
+        """This method tests removing the journal"""
+        self.journal.append([["del", "User.1"]])
+        self.journal.clear()
+        self.assertFalse(os.path.exists(self.journal.path))
+
+    def test_rotate(self):
+        """This method tests moving the journal aside"""
+        self.assertIsNone(self.journal.rotate())
+        self.journal.append([["del", "User.1"]])
+        frozen = self.journal.rotate()
+        self.assertEqual(frozen.path, self.journal.frozen().path)
+        self.assertEqual(self.journal.size(), 0)
+        self.assertEqual(list(frozen.replay()), [("del", "User.1", None)])
+
+    def test_compact(self):
+        """This method tests folding a journal into a snapshot"""
+        with open("test_journal.json", "w") as file:
+            json.dump({"User.1": {"id": "1"}, "User.2": {"id": "2"}}, file)
+        self.journal.append([["del", "User.1"],
+                             ["put", "User.3", {"id": "3"}]])
+        compact("test_journal.json", self.journal)
+        with open("test_journal.json", "r") as file:
+            self.assertEqual(json.load(file), {"User.2": {"id": "2"},
+                                               "User.3": {"id": "3"}})
+        self.assertFalse(os.path.exists(self.journal.path))
+
+    def test_compact_compressed(self):
+        """This method tests folding a journal into a compressed snapshot"""
+        self.journal.append([["put", "User.1", {"id": "1"}]])
+        compact("test_journal.json", self.journal, "gzip", 1)
+        with open("test_journal.json", "rb") as file:
+            self.assertEqual(detect(file.read(2)), "gzip")
+        self.journal.append([["put", "User.2", {"id": "2"}]])
+        compact("test_journal.json", self.journal)
+        with open("test_journal.json", "r") as file:
+            self.assertEqual(json.load(file), {"User.1": {"id": "1"},
+                                               "User.2": {"id": "2"}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""This module contains the tests for the streaming json reader"""
+import unittest
+import json
+from io import StringIO
+from models.engine.json_stream import iter_items
+
+
+class TestIterItems(unittest.TestCase):
+    """This class contains the tests for the iter_items function"""
+
+    def test_same_as_json_load(self):
+        """This method tests that every entry is decoded like json.load"""
+        obj_dict = {f"User.{i}": {"id": str(i), "number": i * 1000,
+                                  "price": i / 3, "name": "é \"x\" {}",
+                                  "ids": [i, None, True]}
+                    for i in range(200)}
+        text = json.dumps(obj_dict)
+        for chunk_size in (1, 7, 64, 1 << 16):
+            items = dict(iter_items(StringIO(text), chunk_size))
+            self.assertEqual(items, obj_dict)
+
+    def test_number_split_across_chunks(self):
+        """This method tests a number cut by the end of a chunk"""
+        self.assertEqual(list(iter_items(StringIO('{"a": 12345}'), 8)),
+                         [("a", 12345)])
+
+    def test_empty_object(self):
+        """This method tests an empty json object"""
+        self.assertEqual(list(iter_items(StringIO(" { } "))), [])
+
+    def test_invalid(self):
+        """This method tests that a broken file is an error"""
+        for text in ("", "[]", '{"a": 1', '{"a" 1}', '{1: 2}'):
+            with self.assertRaises(json.JSONDecodeError):
+                list(iter_items(StringIO(text), 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
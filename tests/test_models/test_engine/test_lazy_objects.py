@@ -0,0 +1,113 @@
+#!/usr/bin/python3
+"""This module contains the tests for the lazy objects dict"""
+import unittest
+import json
+from models.engine.lazy_objects import LazyObjects
+
+
+class TestLazyObjects(unittest.TestCase):
+    """This class contains the tests for the LazyObjects class"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.built = []
+        self.objects = LazyObjects(self.build)
+        self.objects.put_raw("User.1", {"id": "1"})
+        self.objects.put_raw("User.2", {"id": "2"})
+        self.objects.put_raw("State.3", {"id": "3"})
+
+    def build(self, key, obj_dict):
+        """This method stands for the storage building a model"""
+        self.built.append(key)
+        obj = ("built", obj_dict["id"])
+        self.objects[key] = obj
+        return obj
+
+    def test_len_and_contains(self):
+        """This method tests that len and in do not build"""
+        self.assertEqual(len(self.objects), 3)
+        self.assertIn("User.1", self.objects)
+        self.assertNotIn("User.4", self.objects)
+        self.assertEqual(self.objects.count_raw("User"), 2)
+        self.assertEqual(self.built, [])
+
+    def test_getitem(self):
+        """This method tests building on first access"""
+        self.assertEqual(self.objects["User.1"], ("built", "1"))
+        self.assertEqual(self.objects["User.1"], ("built", "1"))
+        self.assertEqual(self.built, ["User.1"])
+        self.assertEqual(len(self.objects), 3)
+        self.assertIsNone(self.objects.get("User.4"))
+        with self.assertRaises(KeyError):
+            self.objects["User.4"]
+
+    def test_materialize_class(self):
+        """This method tests building the models of one class"""
+        self.objects.materialize("User")
+        self.assertEqual(sorted(self.built), ["User.1", "User.2"])
+        self.assertEqual(self.objects.count_raw("User"), 0)
+        self.assertEqual(len(self.objects), 3)
+
+    def test_iteration(self):
+        """This method tests that iterating builds everything"""
+        self.assertEqual(sorted(self.objects), ["State.3", "User.1", "User.2"])
+        self.assertEqual(len(self.built), 3)
+        self.assertEqual(list(self.objects.raw_items()), [])
+
+    def test_delete(self):
+        """This method tests deleting without building"""
+        del self.objects["User.1"]
+        self.assertEqual(self.objects.pop("User.2"), ("built", "2"))
+        self.assertEqual(self.objects.drop_raw("State.3"), {"id": "3"})
+        self.assertEqual(len(self.objects), 0)
+        self.assertEqual(self.built, ["User.2"])
+
+    def test_clear(self):
+        """This method tests removing everything"""
+        self.objects["User.1"]
+        self.objects.clear()
+        self.assertEqual(len(self.objects), 0)
+        self.assertEqual(list(self.objects.raw_items()), [])
+
+    def test_mapped(self):
+        """This method tests the objects of a mapped file"""
+        mapped = _Mapped(["User.2", "User.5", "Place.6"])
+        self.objects.put_mapped(mapped)
+        self.assertEqual(len(self.objects), 5)
+        self.assertEqual(self.objects.count_raw("User"), 3)
+        self.assertEqual(mapped.decoded, [])
+        self.assertEqual(dict(self.objects.raw_json_items()), {
+            "User.1": {"id": "1"}, "User.2": '{"id": "User.2"}',
+            "User.5": '{"id": "User.5"}', "State.3": {"id": "3"},
+            "Place.6": '{"id": "Place.6"}'})
+        self.assertEqual(self.objects["User.5"], ("built", "User.5"))
+        self.assertEqual(self.objects.drop_raw("User.2"), {"id": "User.2"})
+        self.assertEqual(mapped.decoded, [1, 0])
+        self.assertEqual(self.objects.raw["User"].get("User.1"), {"id": "1"})
+        self.objects.materialize()
+        self.assertEqual(len(self.objects), 4)
+        self.assertEqual(self.built, ["User.5", "User.1", "State.3",
+                                      "Place.6"])
+
+
+class _Mapped:
+    """This class stands for a mapped file whose object number i
+    is {"id": key}"""
+
+    def __init__(self, keys):
+        """This method initializes the file"""
+        self.keys = keys
+        self.decoded = []
+
+    def text(self, i):
+        """This method returns the json of an object"""
+        return json.dumps({"id": self.keys[i]})
+
+    def value(self, i):
+        """This method decodes an object"""
+        self.decoded.append(i)
+        return {"id": self.keys[i]}
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/python3
+"""This module contains the tests for the memory-mapped file.json"""
+import unittest
+import os
+import json
+from models.engine.mapped_file import (MappedFile, read_index, scan,
+                                       write_parts_index)
+
+
+class TestMappedFile(unittest.TestCase):
+    """This class contains the tests for the MappedFile class"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.path = "test_mapped.json"
+        self.objects = {
+            "User.1": {"id": "1", "first_name": "Zoé", "tags": ["a", "}"]},
+            "User.2": {"id": "2", "bio": "a \"quoted\" {brace}"},
+            "Place.3": {"id": "3", "amenity_ids": [], "nested": {"a": [1]}},
+        }
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        for path in (self.path, f"{self.path}.idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def write(self, text):
+        """This method writes the file mapped by the tests"""
+        with open(self.path, "w", encoding="utf-8") as file:
+            file.write(text)
+
+    def test_scan(self):
+        """This method tests finding the objects of a json text"""
+        data = json.dumps(self.objects, ensure_ascii=False,
+                          indent=2).encode()
+        keys, starts, ends = scan(data)
+        self.assertEqual(keys, list(self.objects))
+        for key, start, end in zip(keys, starts, ends):
+            self.assertEqual(json.loads(data[start:end]), self.objects[key])
+        self.assertEqual(scan(b" { } ")[0], [])
+
+    def test_scan_invalid(self):
+        """This method tests refusing what is not a json object
+        of objects"""
+        for data in (b'{"User.1": "1", "User.2": {}}', b'{"User.1": {}',
+                     b'[{}]'):
+            with self.assertRaises(ValueError):
+                scan(data)
+
+    def test_index(self):
+        """This method tests the index written from the parts of a save"""
+        parts = [f"{json.dumps(key)}: {json.dumps(value, ensure_ascii=False)}"
+                 for key, value in self.objects.items()]
+        self.write("{" + ", ".join(parts) + "}")
+        write_parts_index(self.path, list(self.objects), parts)
+        mapped = MappedFile(self.path)
+        self.assertEqual(mapped.keys, list(self.objects))
+        for i, key in enumerate(mapped.keys):
+            self.assertEqual(mapped.value(i), self.objects[key])
+            self.assertEqual(json.loads(mapped.text(i)), self.objects[key])
+
+    def test_stale_index(self):
+        """This method tests scanning a file changed since its index"""
+        self.write(json.dumps(self.objects))
+        MappedFile(self.path)
+        self.assertIsNotNone(read_index(self.path, os.stat(self.path)))
+        del self.objects["User.2"]
+        self.write(json.dumps(self.objects))
+        self.assertIsNone(read_index(self.path, os.stat(self.path)))
+        mapped = MappedFile(self.path)
+        self.assertEqual(mapped.keys, list(self.objects))
+        self.assertEqual(mapped.value(1), self.objects["Place.3"])
+
+    def test_empty(self):
+        """This method tests mapping an empty file"""
+        self.write("")
+        self.assertEqual(MappedFile(self.path).keys, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+"""This module contains the tests for the helpers about the model classes"""
+import unittest
+from datetime import datetime
+from models.base_model import BaseModel
+from models.engine.model_info import (EPOCH, MICROSECOND, class_name,
+                                      declared)
+from models.place import Place
+from models.user import User
+
+
+class TestModelInfo(unittest.TestCase):
+    """This class contains the tests for the model_info helpers"""
+
+    def test_declared(self):
+        """This method tests the attributes declared by a class
+        and its bases"""
+        self.assertEqual(declared(BaseModel), {})
+        attributes = declared(Place)
+        self.assertEqual(attributes["number_rooms"], 0)
+        self.assertEqual(attributes["amenity_ids"], [])
+        self.assertNotIn("save", attributes)
+        self.assertNotIn("to_dict", attributes)
+
+        class Villa(Place):
+            """a model overriding a value of its base"""
+            number_rooms = 10
+            pool = True
+        attributes = declared(Villa)
+        self.assertEqual(list(attributes)[:len(declared(Place))],
+                         list(declared(Place)))
+        self.assertEqual(attributes["number_rooms"], 10)
+        self.assertIs(attributes["pool"], True)
+
+    def test_class_name(self):
+        """This method tests the name of a class or class name"""
+        self.assertEqual(class_name(User), "User")
+        self.assertEqual(class_name("User"), "User")
+
+    def test_epoch(self):
+        """This method tests the microseconds since the epoch"""
+        moment = datetime(2024, 3, 11, 12, 0, 0, 1)
+        micros = (moment - EPOCH) // MICROSECOND
+        self.assertEqual(micros, 1710158400000001)
+        self.assertEqual(EPOCH + micros * MICROSECOND, moment)
+
+
+if __name__ == "__main__":
+    unittest.main()
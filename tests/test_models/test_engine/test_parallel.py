@@ -0,0 +1,119 @@
+#!/usr/bin/python3
+"""This module contains the tests for the parallel reload and save"""
+import unittest
+import os
+import json
+from unittest.mock import patch
+from models.base_model import classes
+from models.engine import parallel
+from models.engine.mapped_file import MappedFile
+from models.engine.parallel import (iter_file, read_files, read_mapped,
+                                    serialize)
+from models.place import Place
+from models.user import User
+
+
+def dump(entries):
+    """This function serializes entries like FileStorage does"""
+    return [f"{key}: {value}" for key, value in entries], \
+        {key: json.dumps(value.to_dict()) for key, value in entries
+         if not isinstance(value, str)}
+
+
+class TestParallel(unittest.TestCase):
+    """This class contains the tests for the parallel reload and save"""
+
+    def setUp(self):
+        """This method sets up the tests"""
+        self.path = "test_parallel.json"
+        self.objects = {
+            f"User.{i}": {"id": str(i), "__class__": "User",
+                          "created_at": "2024-03-11T12:00:00.000001",
+                          "updated_at": "2024-03-11T12:00:00",
+                          "first_name": f"Zoé {i}"} for i in range(7)}
+        self.objects["Place.7"] = {
+            "id": "7", "__class__": "Place", "amenity_ids": ["a"],
+            "created_at": "2024-03-11T12:00:00",
+            "updated_at": "2024-03-11T12:00:00"}
+        with open(self.path, "w", encoding="utf-8") as file:
+            json.dump(self.objects, file, ensure_ascii=False)
+
+    def tearDown(self):
+        """This method tears down the tests"""
+        for path in (self.path, f"{self.path}.idx"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def check(self, items):
+        """This method checks the keys and models built from the file"""
+        items = list(items)
+        self.assertEqual([key for key, obj in items], list(self.objects))
+        for key, obj in items:
+            self.assertIsInstance(obj, Place if key == "Place.7" else User)
+            self.assertEqual(obj.to_dict(), self.objects[key])
+
+    @unittest.skipUnless(parallel.can_fork(), "the pool needs fork")
+    def test_read_mapped(self):
+        """This method tests building the models of a split file"""
+        with patch("models.engine.parallel.MIN_CHUNK", 1):
+            self.check(read_mapped(MappedFile(self.path), 3, classes))
+
+    def test_read_mapped_small(self):
+        """This method tests that a small file is built in this process"""
+        with patch("models.engine.parallel._pool") as pool:
+            self.check(read_mapped(MappedFile(self.path), 3, classes))
+        pool.assert_not_called()
+
+    @unittest.skipUnless(parallel.can_fork(), "the pool needs fork")
+    def test_read_files(self):
+        """This method tests building the models of files, one per task"""
+        with patch("models.engine.parallel.MIN_CHUNK", 1), \
+                patch("models.engine.parallel._pool",
+                      wraps=parallel._pool) as pool:
+            files = list(read_files([self.path, "test_parallel.missing"], 2,
+                                    classes))
+        pool.assert_called_once_with(2)
+        self.assertEqual(len(files), 2)
+        self.check(files[0])
+        self.assertEqual(files[1], [])
+
+    def test_read_files_small(self):
+        """This method tests that small files are built in this process"""
+        with patch("models.engine.parallel._pool") as pool:
+            files = list(read_files([self.path, self.path], 2, classes))
+        pool.assert_not_called()
+        self.check(files[1])
+
+    def test_iter_file(self):
+        """This method tests reading the entries of a file"""
+        self.assertEqual(dict(iter_file(self.path)), self.objects)
+        self.assertEqual(list(iter_file("test_parallel.missing")), [])
+
+    @unittest.skipUnless(parallel.can_fork(), "the pool needs fork")
+    def test_serialize(self):
+        """This method tests dumping the entries in processes,
+        as they were when serialize was called"""
+        users = [User() for i in range(9)]
+        entries = [(f"User.{i}", user) for i, user in enumerate(users)]
+        entries.insert(3, ("User.json", "{}"))
+        expected = dump(entries)
+        with patch("models.engine.parallel.MIN_CHUNK", 1):
+            results = serialize(entries, dump, 2)
+        users[0].first_name = "Zoé"
+        results = list(results)
+        self.assertGreater(len(results), 1)
+        self.assertEqual([part for parts, dumped in results
+                          for part in parts], expected[0])
+        self.assertEqual({key: value for parts, dumped in results
+                          for key, value in dumped.items()}, expected[1])
+
+    def test_serialize_small(self):
+        """This method tests that few entries are dumped in this process"""
+        entries = [(f"User.{i}", User()) for i in range(3)]
+        with patch("models.engine.parallel.get_context") as context:
+            self.assertEqual(serialize(entries, dump, 2), [dump(entries)])
+        context.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
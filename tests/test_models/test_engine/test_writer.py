@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+"""This module contains the tests for the background writer"""
+import unittest
+from threading import Event
+from models.engine.writer import Writer
+
+
+class TestWriter(unittest.TestCase):
+    """This class contains the tests for the background writer"""
+
+    def test_order(self):
+        """This method tests that the writes run in order"""
+        writer = Writer(2)
+        runs = []
+        for job_id in range(10):
+            writer.put(job_id, lambda job_id=job_id: runs.append(job_id))
+        writer.join()
+        self.assertEqual(runs, list(range(10)))
+        self.assertEqual([job_id for job_id, result in writer.results()],
+                         list(range(10)))
+        self.assertEqual(list(writer.results()), [])
+
+    def test_backpressure(self):
+        """This method tests that a full queue is not filled more"""
+        writer = Writer(1)
+        started = Event()
+        release = Event()
+
+        def slow():
+            started.set()
+            release.wait()
+
+        writer.put(1, slow)
+        started.wait()
+        writer.put(2, dict)
+        self.assertTrue(writer.queue.full())
+        release.set()
+        writer.join()
+        self.assertEqual(list(writer.results()), [(1, None), (2, {})])
+
+    def test_error(self):
+        """This method tests that the error of a write is raised once"""
+        writer = Writer(1)
+        writer.put(1, lambda: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            writer.join()
+        writer.join()
+        writer.put(2, dict)
+        writer.join()
+        self.assertEqual(list(writer.results()), [(2, {})])
+
+
+if __name__ == "__main__":
+    unittest.main()
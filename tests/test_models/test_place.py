@@ -205,8 +205,9 @@ class TestPlacesaveMehtodClassTest(unittest.TestCase):
         pl = Place()
         pl.save()
         plid = "Place." + pl.id
-        with open("file.json", "r") as f:
-            self.assertIn(plid, f.read())
+        models.storage.clear()
+        models.storage.reload()
+        self.assertIn(plid, models.storage.all())
 
 
 class TestPlace_to_dict(unittest.TestCase):
@@ -178,8 +178,9 @@ class TestReviewsave(unittest.TestCase):
         rv = Review()
         rv.save()
         rvid = "Review." + rv.id
-        with open("file.json", "r") as f:
-            self.assertIn(rvid, f.read())
+        models.storage.clear()
+        models.storage.reload()
+        self.assertIn(rvid, models.storage.all())
 
 
 class TestReviewdictMethond(unittest.TestCase):
@@ -137,8 +137,9 @@ class TestStte_saving(unittest.TestCase):
         st = State()
         st.save()
         stid = "State." + st.id
-        with open("file.json", "r") as f:
-            self.assertIn(stid, f.read())
+        models.storage.clear()
+        models.storage.reload()
+        self.assertIn(stid, models.storage.all())
 
 
 class TestState_to_dictMethond(unittest.TestCase):
@@ -309,8 +309,9 @@ class TestUser_save(unittest.TestCase):
         us = User()
         us.save()
         usid = "User." + us.id
-        with open("file.json", "r") as f:
-            self.assertIn(usid, f.read())
+        models.storage.clear()
+        models.storage.reload()
+        self.assertIn(usid, models.storage.all())
     class TestUser_to_dict(unittest.TestCase): """Unittests for testing to_dict method of the User class."""
 
     def test_to_dict_type(self):